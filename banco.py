@@ -0,0 +1,1904 @@
+# 🗄️ Acesso ao banco do TrendX
+# Consultas e carregadores do trendx_bot.db, sem dependência do Streamlit
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_log = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    # Sem pyarrow não há snapshot colunar; tudo continua vindo do SQLite
+    pa = None
+    _log.warning("pyarrow não está instalado: snapshots Arrow desativados, os frames serão lidos do SQLite")
+
+from metricas import (
+    ESQUEMA_USUARIOS,
+    ESQUEMA_VIDEOS,
+    atribuir_linhas,
+    calcular_engajamento_por_plataforma,
+    calcular_metricas_usuarios,
+    calcular_metricas_videos,
+    compactar_frame,
+    concatenar_compacto,
+    converter_para_numerico_seguro,
+)
+
+# ========== CONSULTAS ==========
+COLUNAS_CONTADORES_VIDEO = ['views', 'likes', 'comments', 'shares']
+
+# Colunas sempre lidas no frame principal; o resto só entra se for numérico
+COLUNAS_CHAVE_VIDEO = ['id', 'user_id', 'platform'] + COLUNAS_CONTADORES_VIDEO
+
+# Textos longos ficam fora do frame e são buscados por id só para as linhas exibidas
+COLUNAS_TEXTO_VIDEO = ['title', 'url']
+
+QUERY_VIDEOS = """
+SELECT
+    {colunas},
+    cs.discord_username
+FROM valid_videos v
+LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+WHERE cs.discord_username IS NOT NULL
+{filtro}
+ORDER BY v.id DESC
+"""
+
+# Assinatura do conjunto de criadores: muda quando usuários entram ou saem do join
+QUERY_ASSINATURA_USUARIOS = """
+SELECT COUNT(*), COALESCE(MAX(user_id), 0), COALESCE(SUM(user_id), 0)
+FROM cached_stats
+WHERE discord_username IS NOT NULL
+"""
+
+# Soma de verificação dos contadores até a marca d'água (pesos por id pegam trocas entre linhas).
+# Calculada sempre pelo SQLite na mesma ordem: igual à anterior = nenhum contador mudou.
+QUERY_SOMA_CONTADORES = """
+SELECT TOTAL(views), TOTAL(likes), TOTAL(comments), TOTAL(shares),
+       TOTAL((id % 997 + 1) * (COALESCE(views, 0) + 3 * COALESCE(likes, 0)
+                               + 7 * COALESCE(comments, 0) + 11 * COALESCE(shares, 0)))
+FROM valid_videos
+WHERE id <= ?
+"""
+
+def colunas_da_tabela(conn, tabela):
+    """Lista as colunas de uma tabela do SQLite"""
+    return [linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})").fetchall()]
+
+def tabelas_do_banco(conn):
+    """Nomes das tabelas existentes no banco"""
+    return {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+def _tipo_numerico(tipo_declarado):
+    """Afinidade numérica do SQLite a partir do tipo declarado da coluna"""
+    tipo = (tipo_declarado or '').upper()
+    return any(parte in tipo for parte in ('INT', 'REAL', 'FLOA', 'DOUB', 'NUM', 'DEC', 'BOOL'))
+
+def projecao_videos(conn):
+    """Colunas de valid_videos para o frame principal: chaves, contadores e numéricas
+    
+    Retorna (lista SQL do SELECT, colunas de texto adiadas). tem_link é calculado no
+    banco para que a URL não precise vir junto.
+    """
+    colunas = conn.execute("PRAGMA table_info(valid_videos)").fetchall()
+    selecionadas = [
+        f"v.{nome}" for _, nome, tipo, *_ in colunas
+        if nome in COLUNAS_CHAVE_VIDEO or (nome not in COLUNAS_TEXTO_VIDEO and _tipo_numerico(tipo))
+    ]
+    nomes = [linha[1] for linha in colunas]
+    if 'url' in nomes:
+        selecionadas.append("COALESCE(length(v.url) > 10, 0) AS tem_link")
+    adiadas = [nome for nome in COLUNAS_TEXTO_VIDEO if nome in nomes]
+    return ', '.join(selecionadas), adiadas
+
+# ========== CONEXÕES ==========
+# O dashboard só lê: nada de disputar o lock de escrita com o bot
+PRAGMAS_LEITURA = {
+    'query_only': 'ON',
+    'mmap_size': 256 * 1024 * 1024,  # 256 MB mapeados em memória
+    'cache_size': -64 * 1024,  # negativo = KiB -> 64 MB de cache de páginas
+}
+TIMEOUT_OCUPADO = 5.0  # segundos esperando um lock do bot antes de desistir
+
+def abrir_conexao_leitura(caminho, factory=sqlite3.Connection):
+    """Abre o banco só para leitura (mode=ro + query_only) com mmap, cache e busy timeout"""
+    uri = f"{Path(caminho).resolve().as_uri()}?mode=ro"
+    try:
+        conn = sqlite3.connect(uri, uri=True, timeout=TIMEOUT_OCUPADO, check_same_thread=False, factory=factory)
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        # mode=ro não abre um banco em WAL sem o -shm (bot parado); query_only ainda protege
+        conn = sqlite3.connect(caminho, timeout=TIMEOUT_OCUPADO, check_same_thread=False, factory=factory)
+    
+    for pragma, valor in PRAGMAS_LEITURA.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+def query_maximos(tabela, colunas):
+    """SELECT dos MAX das colunas, um por subconsulta
+    
+    Agregados juntos no mesmo SELECT impedem o atalho pelo índice e varrem a tabela.
+    """
+    maximos = ', '.join(f"(SELECT MAX({c}) FROM {tabela})" for c in colunas) or "NULL"
+    return f"SELECT {maximos}"
+
+def _identidade_arquivo(caminho):
+    """(dispositivo, inode) do arquivo: muda quando o banco é substituído"""
+    try:
+        info = os.stat(caminho)
+        return info.st_dev, info.st_ino
+    except OSError:
+        return None
+
+class _ConexaoDoPool(sqlite3.Connection):
+    """Conexão cujo close() devolve ao pool em vez de fechar"""
+    
+    pool = None
+    identidade = None
+    emprestada = False
+    
+    def close(self):
+        if self.pool is not None:
+            self.pool.devolver(self)
+        else:
+            super().close()
+    
+    def fechar(self):
+        self.pool = None
+        super().close()
+
+class PoolConexoesLeitura:
+    """Pool pequeno de conexões só-leitura reaproveitadas entre reruns e sessões
+    
+    Cada conexão é usada por uma thread de script por vez: emprestar() tira do pool e
+    close() devolve. Até `tamanho` conexões ociosas ficam abertas (com o cache de páginas
+    e o mmap já quentes); as demais são fechadas. Se o arquivo do banco for substituído,
+    as conexões antigas são descartadas.
+    """
+    
+    def __init__(self, caminho, tamanho=4):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self._livres = []
+        self._identidade = None
+        self._lock = threading.Lock()
+    
+    def emprestar(self):
+        """Conexão pronta para uso; devolva com conn.close()"""
+        identidade = _identidade_arquivo(self.caminho)
+        descartadas = []
+        with self._lock:
+            if identidade != self._identidade:
+                descartadas, self._livres = self._livres, []
+                self._identidade = identidade
+            conn = self._livres.pop() if self._livres else None
+        
+        for antiga in descartadas:
+            antiga.fechar()
+        
+        if conn is None:
+            conn = abrir_conexao_leitura(self.caminho, factory=_ConexaoDoPool)
+            conn.pool = self
+            conn.identidade = identidade
+        conn.emprestada = True
+        return conn
+    
+    def devolver(self, conn):
+        """Volta a conexão para o pool (ou fecha, se o pool está cheio ou o banco mudou)"""
+        if not conn.emprestada:
+            return  # close() repetido
+        conn.emprestada = False
+        if conn.in_transaction:
+            conn.rollback()
+        
+        with self._lock:
+            if conn.identidade == self._identidade and len(self._livres) < self.tamanho:
+                self._livres.append(conn)
+                return
+        conn.fechar()
+    
+    def fechar(self):
+        """Fecha todas as conexões ociosas"""
+        with self._lock:
+            livres, self._livres = self._livres, []
+        for conn in livres:
+            conn.fechar()
+    
+    def conexoes_livres(self):
+        """Quantas conexões ociosas estão abertas no pool"""
+        return len(self._livres)
+
+# ========== VERSÃO DOS DADOS ==========
+def _assinatura_arquivo(caminho):
+    """(mtime em ns, tamanho) do arquivo, ou zeros quando não existe"""
+    try:
+        info = os.stat(caminho)
+        return info.st_mtime_ns, info.st_size
+    except OSError:
+        return 0, 0
+
+class MonitorVersaoDados:
+    """Impressão digital do trendx_bot.db para decidir quando os frames em cache são refeitos
+    
+    A sondagem barata (PRAGMA data_version de uma conexão persistente + mtime/tamanho do
+    banco e do -wal) roda a cada rerun. Só quando ela muda é que os max(id)/max(updated_at)
+    das tabelas são consultados para compor a nova versão.
+    """
+    
+    # Tabela -> colunas cujo máximo entra na versão
+    MARCAS_TABELAS = {
+        'cached_stats': ['user_id'],
+        'valid_videos': ['id'],
+    }
+    
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._conn = None
+        self._sondagem = None
+        self._versao = None
+        self._identidade = None
+        self._lock = threading.Lock()
+    
+    def versao(self):
+        """Versão atual dos dados (tupla hashável); None se o banco não existe"""
+        if not os.path.exists(self.caminho):
+            return None
+        
+        with self._lock:
+            # Banco substituído: a conexão persistente continuaria lendo o arquivo antigo
+            identidade = _identidade_arquivo(self.caminho)
+            if identidade != self._identidade:
+                self._fechar()
+                self._identidade = identidade
+            try:
+                sondagem = self._sondar()
+                if sondagem != self._sondagem or self._versao is None:
+                    self._versao = sondagem + self._marcas_tabelas()
+                    self._sondagem = sondagem
+            except sqlite3.Error:
+                # Conexão pode ter ficado inválida (ex: arquivo substituído); reabre na próxima
+                self._fechar()
+                self._sondagem = None
+                self._versao = (_assinatura_arquivo(self.caminho),)
+            return self._versao
+    
+    def _conexao(self):
+        if self._conn is None:
+            self._conn = abrir_conexao_leitura(self.caminho)
+        return self._conn
+    
+    def _fechar(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _sondar(self):
+        data_version = self._conexao().execute("PRAGMA data_version").fetchone()[0]
+        return (
+            data_version,
+            _assinatura_arquivo(self.caminho),
+            _assinatura_arquivo(self.caminho + '-wal'),
+        )
+    
+    def _marcas_tabelas(self):
+        conn = self._conexao()
+        existentes = {linha[0] for linha in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'"
+        ).fetchall()}
+        
+        marcas = []
+        for tabela, colunas in self.MARCAS_TABELAS.items():
+            if tabela not in existentes:
+                marcas.append((tabela, None))
+                continue
+            
+            # updated_at entra sempre que a tabela tiver essa coluna
+            da_tabela = colunas_da_tabela(conn, tabela)
+            monitoradas = [c for c in dict.fromkeys(colunas + ['updated_at']) if c in da_tabela]
+            marcas.append((tabela,) + tuple(conn.execute(query_maximos(tabela, monitoradas)).fetchone()))
+        return tuple(marcas)
+
+# ========== USUÁRIOS ==========
+QUERY_USUARIOS = """
+SELECT 
+    user_id,
+    discord_username,
+    COALESCE(total_videos, 0) as total_videos,
+    COALESCE(total_views, 0) as total_views,
+    COALESCE(total_likes, 0) as total_likes,
+    COALESCE(total_comments, 0) as total_comments,
+    COALESCE(total_shares, 0) as total_shares,
+    COALESCE(tiktok_views, 0) as tiktok_views,
+    COALESCE(tiktok_videos, 0) as tiktok_videos,
+    COALESCE(youtube_views, 0) as youtube_views,
+    COALESCE(youtube_videos, 0) as youtube_videos,
+    COALESCE(instagram_views, 0) as instagram_views,
+    COALESCE(instagram_videos, 0) as instagram_videos,
+    updated_at
+FROM cached_stats 
+WHERE discord_username IS NOT NULL 
+AND discord_username != ''
+ORDER BY total_views DESC
+"""
+
+COLUNAS_NUMERICAS_USUARIOS = [
+    'total_videos', 'total_views', 'total_likes', 'total_comments', 'total_shares',
+    'tiktok_views', 'tiktok_videos', 'youtube_views', 'youtube_videos',
+    'instagram_views', 'instagram_videos',
+]
+
+# Impressão digital do conteúdo de cached_stats (rankings e quantis dependem de todas as linhas).
+# Cada coluna entra também numa soma ponderada por um peso derivado do user_id (mesma ideia
+# de QUERY_SOMA_CONTADORES): trocar valores entre usuários, ou um subir e outro descer o
+# mesmo tanto, muda a soma mesmo sem updated_at. Módulo um primo de 31 bits os produtos
+# cabem no int64, e o SUM inteiro é exato (o TOTAL em float perderia +1 em somas grandes).
+PRIMO_VERSAO_USUARIOS = 2147483647
+PESO_VERSAO_USUARIOS = f"((user_id % {PRIMO_VERSAO_USUARIOS}) * 48271 + 11) % {PRIMO_VERSAO_USUARIOS}"
+
+def _soma_ponderada_usuarios(expressao):
+    return (f"SUM((COALESCE({expressao}, 0) % {PRIMO_VERSAO_USUARIOS}) * ({PESO_VERSAO_USUARIOS})"
+            f" % {PRIMO_VERSAO_USUARIOS})")
+
+# Nome resumido em comprimento + primeiro e último caractere
+_RESUMO_NOME_USUARIO = (
+    "(length(discord_username) * 1114112 + unicode(discord_username)) * 1114112"
+    " + unicode(substr(discord_username, -1))"
+)
+
+QUERY_VERSAO_USUARIOS = f"""
+SELECT COUNT(*), COALESCE(MAX(user_id), 0), TOTAL(user_id), COALESCE(MAX(updated_at), ''),
+       {_soma_ponderada_usuarios(_RESUMO_NOME_USUARIO)},
+       {', '.join(f'TOTAL({c}), {_soma_ponderada_usuarios(c)}' for c in COLUNAS_NUMERICAS_USUARIOS)}
+FROM cached_stats
+WHERE discord_username IS NOT NULL AND discord_username != ''
+"""
+
+def versao_usuarios(conn):
+    """Versão do conteúdo de cached_stats, comparável entre processos"""
+    return '|'.join(str(valor) for valor in conn.execute(QUERY_VERSAO_USUARIOS).fetchone())
+
+def preparar_usuarios(df):
+    """Converte os contadores e calcula todas as métricas derivadas por usuário"""
+    if df.empty:
+        return df
+    
+    # Converter todas as colunas numéricas de forma segura
+    for col in COLUNAS_NUMERICAS_USUARIOS:
+        if col in df.columns:
+            df[col] = converter_para_numerico_seguro(df[col], 0)
+    
+    # Calcular métricas avançadas
+    df['total_interactions'] = df['total_likes'] + df['total_comments'] + df['total_shares']
+    
+    # Garantir que não há divisão por zero e converter para float
+    df['total_views'] = pd.to_numeric(df['total_views'], errors='coerce').fillna(0)
+    df['total_videos'] = pd.to_numeric(df['total_videos'], errors='coerce').fillna(0)
+    df['total_interactions'] = pd.to_numeric(df['total_interactions'], errors='coerce').fillna(0)
+    
+    # Plataforma principal, engajamento (fórmulas reais), score e categoria de uma vez
+    metricas = calcular_metricas_usuarios(df)
+    df['plataforma_principal'] = metricas['plataforma_principal']
+    df['taxa_engajamento'] = metricas['taxa_engajamento']
+    df['score_performance'] = metricas['score_performance']
+    
+    # Métricas complementares
+    df['media_views_por_video'] = (df['total_views'] / df['total_videos'].replace(0, 1)).round(0)
+    df['media_likes_por_video'] = (df['total_likes'] / df['total_videos'].replace(0, 1)).round(0)
+    df['media_comments_por_video'] = (df['total_comments'] / df['total_videos'].replace(0, 1)).round(2)
+    
+    # Categoria de performance
+    df['categoria_performance'] = metricas['categoria_performance']
+    df['cor_categoria'] = metricas['cor_categoria']
+    
+    # Rankings (só para usuários com dados)
+    df_ativo = df[df['total_views'] > 0]
+    if not df_ativo.empty:
+        df.loc[df['total_views'] > 0, 'rank_views'] = df_ativo['total_views'].rank(ascending=False, method='min').astype(int)
+        df.loc[df['total_likes'] > 0, 'rank_likes'] = df_ativo['total_likes'].rank(ascending=False, method='min').astype(int)
+        df.loc[df['taxa_engajamento'] > 0, 'rank_engajamento'] = df_ativo['taxa_engajamento'].rank(ascending=False, method='min').astype(int)
+        df.loc[df['score_performance'] > 0, 'rank_performance'] = df_ativo['score_performance'].rank(ascending=False, method='min').astype(int)
+    
+    # Preencher NaN dos rankings com 0
+    df[['rank_views', 'rank_likes', 'rank_engajamento', 'rank_performance']] = df[['rank_views', 'rank_likes', 'rank_engajamento', 'rank_performance']].fillna(0).astype(int)
+    
+    # Análise de consistência
+    df['consistencia'] = np.where(
+        df['total_videos'] > 5,
+        np.where(df['taxa_engajamento'] > df['taxa_engajamento'].median(), "Alta", "Média"),
+        np.where(df['total_videos'] > 0, "Baixa", "Sem dados")
+    )
+    
+    # Status do usuário
+    df['status_usuario'] = np.where(
+        df['total_views'] == 0,
+        "🔴 Inativo",
+        np.where(
+            df['total_views'] >= df['total_views'].quantile(0.75),
+            "🟢 Muito Ativo",
+            np.where(
+                df['total_views'] >= df['total_views'].median(),
+                "🟡 Ativo",
+                "🟠 Pouco Ativo"
+            )
+        )
+    )
+    
+    # Potencial de crescimento
+    df['potencial_crescimento'] = np.where(
+        df['total_views'] == 0,
+        "Sem dados",
+        np.where(
+            (df['taxa_engajamento'] > df['taxa_engajamento'].quantile(0.75)) & 
+            (df['total_videos'] < df['total_videos'].quantile(0.5)),
+            "Alto", 
+            np.where(df['taxa_engajamento'] > df['taxa_engajamento'].median(), "Médio", "Baixo")
+        )
+    )
+    
+    return df
+
+# ========== MÉTRICAS PERSISTIDAS ==========
+# Arquivo irmão do banco, escrito por `python script.py metricas`. O dashboard só lê;
+# o bot continua sendo o único escritor do trendx_bot.db.
+# Guardado por coluna (uma linha por coluna do frame, com os valores num BLOB): ler
+# 30 colunas linha a linha pelo sqlite3 custa mais do que recalcular as métricas.
+TABELA_METRICAS_USUARIOS = 'metricas_usuarios'
+
+def caminho_metricas(caminho_banco):
+    """Arquivo irmão com as métricas derivadas (trendx_bot.db -> trendx_bot_metricas.db)"""
+    base, extensao = os.path.splitext(caminho_banco)
+    return f"{base}_metricas{extensao or '.db'}"
+
+def _serializar_coluna(serie):
+    """(tipo, bytes) de uma coluna: array NumPy cru para números, JSON para o resto"""
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        valores = serie.to_numpy()
+        return valores.dtype.str, valores.tobytes()
+    valores = serie.astype(object).where(serie.notna(), None).tolist()
+    return 'json', json.dumps(valores, ensure_ascii=False).encode('utf-8')
+
+def _desserializar_coluna(tipo, dados):
+    if tipo == 'json':
+        return np.array(json.loads(dados.decode('utf-8')), dtype=object)
+    return np.frombuffer(dados, dtype=np.dtype(tipo)).copy()
+
+def gravar_metricas_usuarios(caminho_banco):
+    """Recalcula as métricas por usuário e grava no arquivo irmão; retorna (versão, linhas)
+    
+    O arquivo novo é montado ao lado e trocado com os.replace, então leitores veem a
+    versão anterior inteira ou a nova inteira.
+    """
+    conn = abrir_conexao_leitura(caminho_banco)
+    try:
+        # Versão e dados lidos na mesma transação de leitura
+        conn.execute("BEGIN")
+        versao = versao_usuarios(conn)
+        df = preparar_usuarios(pd.read_sql_query(QUERY_USUARIOS, conn))
+    finally:
+        conn.close()
+    
+    destino = caminho_metricas(caminho_banco)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    saida = sqlite3.connect(temporario)
+    try:
+        saida.execute(
+            f"CREATE TABLE {TABELA_METRICAS_USUARIOS} ("
+            "versao TEXT, posicao INTEGER, coluna TEXT, tipo TEXT, dados BLOB, "
+            "PRIMARY KEY (versao, posicao))"
+        )
+        saida.executemany(
+            f"INSERT INTO {TABELA_METRICAS_USUARIOS} VALUES (?, ?, ?, ?, ?)",
+            [(versao, posicao, coluna, *_serializar_coluna(df[coluna])) for posicao, coluna in enumerate(df.columns)]
+        )
+        saida.commit()
+    finally:
+        saida.close()
+    os.replace(temporario, destino)
+    return versao, len(df)
+
+def ler_metricas_usuarios(caminho_banco, versao):
+    """Métricas pré-calculadas da versão pedida; None se o arquivo não existe ou está defasado"""
+    destino = caminho_metricas(caminho_banco)
+    if not os.path.exists(destino):
+        return None
+    
+    conn = abrir_conexao_leitura(destino)
+    try:
+        linhas = conn.execute(
+            f"SELECT coluna, tipo, dados FROM {TABELA_METRICAS_USUARIOS} WHERE versao = ? ORDER BY posicao",
+            (versao,)
+        ).fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    
+    if not linhas:
+        return None
+    return pd.DataFrame({coluna: _desserializar_coluna(tipo, dados) for coluna, tipo, dados in linhas})
+
+# ========== VÍDEOS ==========
+TAMANHO_LOTE_VIDEOS = 50_000
+
+class LimiteMemoriaExcedido(Exception):
+    """O frame de vídeos passaria do teto de memória configurado"""
+    
+    def __init__(self, projetado_mb, limite_mb):
+        super().__init__(f"{projetado_mb:,.1f} MB projetados para os vídeos (limite {limite_mb:,.1f} MB)")
+        self.projetado_mb = projetado_mb
+        self.limite_mb = limite_mb
+
+def preparar_videos(df):
+    """Converte os contadores e calcula as colunas derivadas de um lote de vídeos"""
+    if df.empty:
+        return df
+    
+    for col in COLUNAS_CONTADORES_VIDEO:
+        if col in df.columns:
+            df[col] = converter_para_numerico_seguro(df[col], 0)
+    
+    if 'views' in df.columns and 'likes' in df.columns:
+        metricas = calcular_metricas_videos(df)
+        for coluna in metricas.columns:
+            df[coluna] = metricas[coluna]
+    
+    return df
+
+class CarregadorVideosIncremental:
+    """Mantém o frame de vídeos e aplica só as mudanças desde a última leitura
+    
+    Vídeos novos sempre chegam com id maior, então a marca d'água é o maior id lido.
+    Contadores alterados são detectados por updated_at quando a tabela tem essa coluna;
+    sem ela, por uma leitura estreita (id + contadores) comparada em NumPy, pulada
+    quando a soma de verificação dos contadores não mudou. Exclusões
+    ou mudanças no conjunto de criadores forçam uma recarga completa.
+    
+    Com `caminho_snapshot`, a primeira leitura do processo parte do snapshot Arrow (ver
+    gravar_snapshots) e só busca no banco o que mudou depois dele.
+    
+    A carga completa lê a tabela em lotes de TAMANHO_LOTE_VIDEOS, já compactando e
+    enriquecendo cada lote antes do próximo. Com `limite_memoria_mb`, ela para assim que
+    a projeção (bytes por linha dos lotes lidos × total da tabela) passa do teto e levanta
+    LimiteMemoriaExcedido.
+    """
+    
+    def __init__(self, caminho_snapshot=None, limite_memoria_mb=None):
+        self.caminho_snapshot = caminho_snapshot
+        self.limite_memoria_mb = limite_memoria_mb
+        self.df = None
+        self.max_id = 0
+        self.total_ate_max_id = 0
+        self.max_updated_at = None
+        self.tem_updated_at = False
+        self.soma_contadores = None
+        self.assinatura_usuarios = None
+        self.projecao = None
+        self.colunas_adiadas = []
+        self.ultima_atualizacao = None
+        self._lock = threading.Lock()
+    
+    def invalidar(self):
+        """Descarta o estado para que a próxima leitura seja completa (direto do banco)"""
+        with self._lock:
+            self.df = None
+            self.caminho_snapshot = None
+    
+    def carregar(self, conn, progresso=None):
+        """Retorna o frame atualizado; completo na primeira vez, incremental depois
+        
+        `progresso(linhas_lidas, total)` é chamado a cada lote da carga completa.
+        """
+        with self._lock:
+            try:
+                if self.df is None:
+                    if self._restaurar_snapshot() and self._atualizar_incremental(conn):
+                        self.ultima_atualizacao = f"snapshot + {self.ultima_atualizacao}"
+                    else:
+                        self._carga_completa(conn, progresso)
+                elif not self._atualizar_incremental(conn):
+                    self._carga_completa(conn, progresso)
+                
+                # Snapshot e atualizações incrementais também respeitam o teto
+                memoria_mb = self.df.memory_usage(deep=True).sum() / (1024 * 1024)
+                if self.limite_memoria_mb and memoria_mb > self.limite_memoria_mb:
+                    raise LimiteMemoriaExcedido(memoria_mb, self.limite_memoria_mb)
+            except Exception:
+                # Estado pode ter ficado pela metade; a próxima leitura recomeça do zero
+                self.df = None
+                raise
+            return self.df
+    
+    def estado(self):
+        """Marcas d'água da última leitura, serializáveis em JSON (cabeçalho do snapshot)"""
+        return {
+            'max_id': self.max_id,
+            'total_ate_max_id': self.total_ate_max_id,
+            'max_updated_at': self.max_updated_at,
+            'tem_updated_at': self.tem_updated_at,
+            'soma_contadores': self.soma_contadores,
+            'assinatura_usuarios': list(self.assinatura_usuarios),
+            'projecao': self.projecao,
+            'colunas_adiadas': self.colunas_adiadas,
+        }
+    
+    def _restaurar_snapshot(self):
+        """Assume o frame e as marcas d'água do snapshot (só na primeira leitura do processo)"""
+        caminho, self.caminho_snapshot = self.caminho_snapshot, None
+        lido = ler_snapshot(caminho) if caminho else None
+        if lido is None:
+            return False
+        
+        df, cabecalho = lido
+        estado = cabecalho['estado']
+        self.df = df
+        self.max_id = estado['max_id']
+        self.total_ate_max_id = estado['total_ate_max_id']
+        self.max_updated_at = estado['max_updated_at']
+        self.tem_updated_at = estado['tem_updated_at']
+        self.soma_contadores = estado['soma_contadores']
+        self.assinatura_usuarios = tuple(estado['assinatura_usuarios'])
+        self.projecao = estado['projecao']
+        self.colunas_adiadas = estado['colunas_adiadas']
+        return True
+    
+    def _estado_tabela(self, conn):
+        max_id, total = conn.execute(
+            "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM valid_videos"
+        ).fetchone()
+        return max_id, total
+    
+    def _soma_contadores(self, conn, max_id):
+        """Soma de verificação (lista, para caber no JSON do snapshot); None com updated_at"""
+        if self.tem_updated_at:
+            return None
+        return list(conn.execute(QUERY_SOMA_CONTADORES, (max_id,)).fetchone())
+    
+    def _carga_completa(self, conn, progresso=None):
+        self.tem_updated_at = 'updated_at' in colunas_da_tabela(conn, 'valid_videos')
+        self.projecao, self.colunas_adiadas = projecao_videos(conn)
+        self.max_id, self.total_ate_max_id = self._estado_tabela(conn)
+        self.assinatura_usuarios = conn.execute(QUERY_ASSINATURA_USUARIOS).fetchone()
+        if self.tem_updated_at:
+            self.max_updated_at = conn.execute("SELECT MAX(updated_at) FROM valid_videos").fetchone()[0]
+        # Antes da leitura: uma mudança no meio dela só pode causar uma varredura a mais
+        self.soma_contadores = self._soma_contadores(conn, self.max_id)
+        
+        # Limitado à marca d'água para que inserções durante a leitura entrem na próxima rodada.
+        # Em lotes: cada um já sai compacto, sem um frame cru da tabela inteira na memória
+        lotes = []
+        lidas = 0
+        bytes_lidos = 0
+        for lote in pd.read_sql_query(
+            QUERY_VIDEOS.format(colunas=self.projecao, filtro="AND v.id <= ?"), conn,
+            params=(self.max_id,), chunksize=TAMANHO_LOTE_VIDEOS
+        ):
+            lote = compactar_frame(preparar_videos(lote), ESQUEMA_VIDEOS)
+            lotes.append(lote)
+            lidas += len(lote)
+            bytes_lidos += lote.memory_usage(deep=True).sum()
+            
+            if self.limite_memoria_mb and lidas:
+                projetado_mb = bytes_lidos / lidas * max(self.total_ate_max_id, lidas) / (1024 * 1024)
+                if projetado_mb > self.limite_memoria_mb:
+                    raise LimiteMemoriaExcedido(projetado_mb, self.limite_memoria_mb)
+            if progresso:
+                progresso(lidas, self.total_ate_max_id)
+        
+        # Lotes podem ter reduzido inteiros para tipos diferentes; a compactação final iguala
+        self.df = compactar_frame(concatenar_compacto(lotes), ESQUEMA_VIDEOS)
+        self.ultima_atualizacao = 'completa'
+    
+    def _atualizar_incremental(self, conn):
+        """Aplica novos vídeos e contadores alterados; False quando precisa recarregar tudo"""
+        if conn.execute(QUERY_ASSINATURA_USUARIOS).fetchone() != self.assinatura_usuarios:
+            return False
+        if projecao_videos(conn)[0] != self.projecao:
+            return False
+        
+        max_id_atual, total_atual = self._estado_tabela(conn)
+        
+        # Exclusões: menos linhas até a marca d'água do que havia na última leitura
+        total_ate_max_id = conn.execute(
+            "SELECT COUNT(*) FROM valid_videos WHERE id <= ?", (self.max_id,)
+        ).fetchone()[0]
+        if total_ate_max_id < self.total_ate_max_id:
+            return False
+        
+        # Soma da nova faixa tirada antes das leituras (ver _carga_completa)
+        soma_atual = self._soma_contadores(conn, self.max_id)
+        soma_nova = soma_atual if max_id_atual == self.max_id else self._soma_contadores(conn, max_id_atual)
+        
+        novos = pd.read_sql_query(
+            QUERY_VIDEOS.format(colunas=self.projecao, filtro="AND v.id > ? AND v.id <= ?"), conn,
+            params=(self.max_id, max_id_atual)
+        )
+        alterados = self._linhas_alteradas(conn, soma_atual)
+        
+        df = self.df
+        if not alterados.empty:
+            # Cópia na escrita: o frame já entregue a quem está lendo não muda por baixo
+            df = df.copy()
+            posicoes = pd.Index(df['id']).get_indexer(alterados['id'])
+            encontrados = posicoes >= 0
+            
+            # Só as linhas alteradas passam de novo pelas métricas
+            alterados = preparar_videos(alterados[encontrados].reset_index(drop=True))
+            df = atribuir_linhas(df, posicoes[encontrados], alterados)
+        
+        if not novos.empty:
+            novos = compactar_frame(preparar_videos(novos), ESQUEMA_VIDEOS)
+            df = concatenar_compacto([novos, df])
+        
+        self.df = df
+        self.max_id, self.total_ate_max_id = max_id_atual, total_atual
+        self.soma_contadores = soma_nova
+        self.ultima_atualizacao = f"incremental (+{len(novos)} novos, {len(alterados)} alterados)"
+        return True
+    
+    def _linhas_alteradas(self, conn, soma_atual=None):
+        """Linhas já carregadas cujos contadores mudaram, lidas de novo com o join completo"""
+        if self.tem_updated_at:
+            novo_max = conn.execute("SELECT MAX(updated_at) FROM valid_videos").fetchone()[0]
+            # Coluna ainda toda NULL na última leitura: qualquer valor preenchido é alteração
+            desde = "v.updated_at > ?" if self.max_updated_at is not None else "v.updated_at IS NOT NULL"
+            parametros = [self.max_id] + ([self.max_updated_at] if self.max_updated_at is not None else []) + [novo_max]
+            alterados = pd.read_sql_query(
+                QUERY_VIDEOS.format(colunas=self.projecao, filtro=f"AND v.id <= ? AND {desde} AND v.updated_at <= ?"),
+                conn, params=parametros
+            )
+            if novo_max is not None:
+                self.max_updated_at = novo_max
+            return alterados
+        
+        if soma_atual is not None and soma_atual == self.soma_contadores:
+            return pd.DataFrame(columns=['id'])
+        
+        colunas = ', '.join(['id'] + COLUNAS_CONTADORES_VIDEO)
+        atuais = pd.read_sql_query(
+            f"SELECT {colunas} FROM valid_videos WHERE id <= ?", conn, params=(self.max_id,)
+        )
+        for col in COLUNAS_CONTADORES_VIDEO:
+            atuais[col] = converter_para_numerico_seguro(atuais[col], 0)
+        
+        carregados = self.df[['id'] + COLUNAS_CONTADORES_VIDEO].set_index('id')
+        atuais = atuais.set_index('id')
+        comuns = atuais.index.intersection(carregados.index)
+        antes = carregados.loc[comuns].to_numpy(dtype=np.float64)
+        depois = atuais.loc[comuns].to_numpy(dtype=np.float64)
+        ids_alterados = comuns[(antes != depois).any(axis=1)].tolist()
+        
+        # Lotes abaixo do limite de parâmetros do SQLite
+        lotes = []
+        for inicio in range(0, len(ids_alterados), 500):
+            ids = ids_alterados[inicio:inicio + 500]
+            marcadores = ', '.join('?' * len(ids))
+            lotes.append(pd.read_sql_query(
+                QUERY_VIDEOS.format(colunas=self.projecao, filtro=f"AND v.id IN ({marcadores})"), conn, params=ids
+            ))
+        return pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame(columns=['id'])
+
+# ========== SNAPSHOT COLUNAR (ARROW) ==========
+# Frames já enriquecidos em Arrow IPC sem compressão, abertos por memory-map: nada de
+# conversão linha a linha do sqlite3, e as páginas ficam no cache do SO, compartilhadas
+# entre os workers da mesma máquina. Gerados por `python script.py snapshot`.
+FORMATO_SNAPSHOT = 1
+CHAVE_CABECALHO_SNAPSHOT = b'trendx_snapshot'
+
+def caminho_snapshot(caminho_banco, nome):
+    """Arquivo do snapshot ao lado do banco (trendx_bot.db -> trendx_bot_snapshot_videos.arrow)"""
+    base, _ = os.path.splitext(caminho_banco)
+    return f"{base}_snapshot_{nome}.arrow"
+
+def gravar_snapshot(caminho, df, cabecalho):
+    """Grava o frame em Arrow IPC com o cabeçalho de versão nos metadados do schema"""
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_CABECALHO_SNAPSHOT] = json.dumps({'formato': FORMATO_SNAPSHOT, **cabecalho}).encode('utf-8')
+    tabela = tabela.replace_schema_metadata(metadados)
+    
+    # Escrito ao lado e trocado de uma vez: leitores nunca veem um arquivo pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with pa.OSFile(temporario, 'wb') as destino:
+        with pa_ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(temporario, caminho)
+
+def ler_snapshot(caminho, versao=None):
+    """(frame, cabeçalho) do snapshot via memory-map; None se ausente, de outra versão ou ilegível"""
+    if not os.path.exists(caminho):
+        return None
+    if pa is None:
+        _log.warning("Snapshot %s ignorado: pyarrow não está instalado", caminho)
+        return None
+    
+    try:
+        with pa.memory_map(caminho, 'r') as fonte:
+            leitor = pa_ipc.open_file(fonte)
+            cabecalho = json.loads(leitor.schema.metadata[CHAVE_CABECALHO_SNAPSHOT])
+            # O cabeçalho é conferido antes de tocar nos dados
+            if cabecalho.get('formato') != FORMATO_SNAPSHOT:
+                return None
+            if versao is not None and cabecalho.get('versao') != versao:
+                return None
+            # split_blocks evita consolidar as colunas num bloco 2D: as numéricas sem nulos
+            # continuam apontando para o mapa (somente leitura, páginas compartilhadas entre
+            # processos). Quem altera o frame trabalha numa cópia (ver _atualizar_incremental)
+            df = leitor.read_all().to_pandas(split_blocks=True, self_destruct=False)
+    except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+        return None
+    return df, cabecalho
+
+def gravar_snapshots(caminho_banco):
+    """Exporta os frames de usuários e vídeos do banco; retorna {nome: linhas}"""
+    if pa is None:
+        raise RuntimeError("pyarrow não está instalado (pip install -r requirements.txt)")
+    
+    conn = abrir_conexao_leitura(caminho_banco)
+    try:
+        # Usuários e vídeos lidos na mesma transação de leitura
+        conn.execute("BEGIN")
+        versao = versao_usuarios(conn)
+        usuarios = compactar_frame(preparar_usuarios(pd.read_sql_query(QUERY_USUARIOS, conn)), ESQUEMA_USUARIOS)
+        carregador = CarregadorVideosIncremental()
+        videos = carregador.carregar(conn) if 'valid_videos' in tabelas_do_banco(conn) else None
+    finally:
+        conn.close()
+    
+    gravar_snapshot(caminho_snapshot(caminho_banco, 'usuarios'), usuarios, {'tipo': 'usuarios', 'versao': versao})
+    gravados = {'usuarios': len(usuarios)}
+    if videos is not None:
+        gravar_snapshot(caminho_snapshot(caminho_banco, 'videos'), videos, {'tipo': 'videos', 'estado': carregador.estado()})
+        gravados['videos'] = len(videos)
+    return gravados
+
+# ========== CARGA DOS FRAMES ==========
+def carregar_usuarios(conn, caminho_banco):
+    """Frame de usuários: snapshot ou métricas gravadas desta versão de cached_stats; senão calculado"""
+    versao = versao_usuarios(conn)
+    snapshot = ler_snapshot(caminho_snapshot(caminho_banco, 'usuarios'), versao)
+    df = snapshot[0] if snapshot is not None else ler_metricas_usuarios(caminho_banco, versao)
+    if df is None:
+        df = preparar_usuarios(pd.read_sql_query(QUERY_USUARIOS, conn))
+    return compactar_frame(df, ESQUEMA_USUARIOS)
+
+def carregar_videos(conn, carregador, progresso=None):
+    """(frame de vídeos, total de linhas em valid_videos); frame vazio se a tabela não existe"""
+    if 'valid_videos' not in tabelas_do_banco(conn):
+        return pd.DataFrame(), 0
+    total = conn.execute("SELECT COUNT(*) FROM valid_videos").fetchone()[0]
+    return carregador.carregar(conn, progresso), total
+
+def carregar_frames(conn, caminho_banco, carregador, progresso=None):
+    """Usuários e vídeos para o dashboard; acima do teto de memória os vídeos ficam no banco
+    
+    Com LimiteMemoriaExcedido o frame de vídeos sai vazio e `limite_videos` traz o motivo:
+    a página de vídeos passa para o modo consulta.
+    """
+    limite_videos = None
+    df_usuarios = carregar_usuarios(conn, caminho_banco)
+    try:
+        # Só aplica o que mudou desde a última leitura (completa na primeira vez ou após exclusões)
+        df_videos, total_videos = carregar_videos(conn, carregador, progresso)
+    except LimiteMemoriaExcedido as e:
+        df_videos, limite_videos = pd.DataFrame(), str(e)
+        total_videos = conn.execute("SELECT COUNT(*) FROM valid_videos").fetchone()[0]
+    return {
+        'usuarios': df_usuarios,
+        'videos': df_videos,
+        'total_videos_banco': total_videos,
+        'limite_videos': limite_videos,
+    }
+
+def sincronizar_arquivos_auxiliares(caminho_banco):
+    """Atualiza os arquivos ao lado do banco que já foram criados; retorna os sincronizados
+    
+    Roda na atualização em segundo plano, depois dos frames: uma falha (banco ocupado,
+    arquivo corrompido) só é registrada, e as páginas continuam no caminho sem o arquivo.
+    """
+    sincronizados = []
+    if os.path.exists(caminho_busca(caminho_banco)):
+        try:
+            # Fora das páginas dá para pagar a contagem que detecta exclusões (e reconstruir)
+            sincronizar_busca_titulos(caminho_banco)
+            sincronizados.append('busca')
+        except sqlite3.Error as erro:
+            _log.warning("Índice de busca não sincronizado: %s", erro)
+    if os.path.exists(caminho_chaves_ordenacao(caminho_banco)):
+        try:
+            sincronizar_chaves_ordenacao(caminho_banco)
+            sincronizados.append('ordenacao')
+        except sqlite3.Error as erro:
+            _log.warning("Chaves de ordenação não sincronizadas: %s", erro)
+    return sincronizados
+
+def opcoes_filtros_videos(conn):
+    """(plataformas, criadores) para os filtros quando os vídeos não estão em memória"""
+    plataformas = [linha[0] for linha in conn.execute(
+        "SELECT DISTINCT platform FROM valid_videos WHERE platform IS NOT NULL ORDER BY platform"
+    )]
+    criadores = [linha[0] for linha in conn.execute(
+        "SELECT DISTINCT discord_username FROM cached_stats WHERE discord_username IS NOT NULL ORDER BY discord_username"
+    )]
+    return plataformas, criadores
+
+# ========== ATUALIZAÇÃO EM SEGUNDO PLANO ==========
+CopiaDados = namedtuple('CopiaDados', ['versao', 'dados', 'construida_em'])
+
+class AtualizadorEmSegundoPlano:
+    """Stale-while-revalidate: quem pede os dados recebe a última cópia boa, sem esperar
+    
+    obter() compara a versão atual dos dados com a da cópia; se mudou, dispara a
+    reconstrução numa thread e devolve a cópia anterior. A cópia nova entra com uma
+    única atribuição (troca atômica). Só a primeira carga do processo, quando ainda não
+    há cópia nenhuma, espera a construção.
+    """
+    
+    def __init__(self, obter_versao, construir):
+        self._obter_versao = obter_versao
+        self._construir = construir
+        self.copia = None
+        self.ultimo_erro = None
+        self._forcar = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._lock_inicial = threading.Lock()
+    
+    @property
+    def atualizando(self):
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+    
+    def idade(self):
+        """Segundos desde que a cópia atual foi construída; None antes da primeira"""
+        copia = self.copia
+        return None if copia is None else time.time() - copia.construida_em
+    
+    def obter(self, progresso=None):
+        """Cópia atual; na primeira chamada do processo, constrói e espera (com `progresso`)"""
+        copia = self.copia
+        if copia is None:
+            with self._lock_inicial:
+                if self.copia is None:
+                    versao = self._obter_versao()
+                    self.copia = CopiaDados(versao, self._construir(progresso), time.time())
+            return self.copia
+        
+        if self._forcar or self._obter_versao() != copia.versao:
+            self._disparar()
+        return copia
+    
+    def forcar(self):
+        """Reconstrói em segundo plano mesmo sem mudança de versão"""
+        self._forcar = True
+        self._disparar()
+    
+    def _disparar(self):
+        with self._lock:
+            # Uma thread por vez; ela confere a versão de novo antes de terminar
+            if self.atualizando or self.copia is None:
+                return
+            self._thread = threading.Thread(target=self._atualizar, name='trendx-atualizacao', daemon=True)
+            self._thread.start()
+    
+    def _atualizar(self):
+        while True:
+            versao = self._obter_versao()
+            with self._lock:
+                if not self._forcar and versao == self.copia.versao:
+                    return
+                self._forcar = False
+            
+            try:
+                dados = self._construir(None)
+            except Exception as erro:
+                # A cópia anterior continua valendo; a próxima visita tenta de novo
+                self.ultimo_erro = f"{type(erro).__name__}: {erro}"
+                return
+            self.copia = CopiaDados(versao, dados, time.time())
+            self.ultimo_erro = None
+
+# ========== TEXTOS SOB DEMANDA ==========
+class CacheTextosVideos:
+    """Títulos e URLs buscados por id só para as linhas exibidas, com LRU limitado
+    
+    O conteúdo é descartado quando a versão dos dados muda.
+    """
+    
+    def __init__(self, limite=20000):
+        self.limite = limite
+        self.versao = None
+        self._textos = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def obter(self, conn, ids, colunas, versao=None):
+        """DataFrame id + colunas de texto para os ids pedidos"""
+        ids = [int(i) for i in ids]
+        with self._lock:
+            if versao != self.versao:
+                self._textos.clear()
+                self.versao = versao
+            
+            faltantes = [i for i in dict.fromkeys(ids) if i not in self._textos]
+            selecao = ', '.join(['id'] + colunas)
+            for inicio in range(0, len(faltantes), 500):
+                lote = faltantes[inicio:inicio + 500]
+                marcadores = ', '.join('?' * len(lote))
+                for linha in conn.execute(
+                    f"SELECT {selecao} FROM valid_videos WHERE id IN ({marcadores})", lote
+                ):
+                    self._textos[linha[0]] = linha[1:]
+            
+            linhas = []
+            for i in ids:
+                valores = self._textos.get(i)
+                if valores is None:
+                    valores = (None,) * len(colunas)
+                else:
+                    self._textos.move_to_end(i)
+                linhas.append((i,) + tuple(valores))
+            
+            while len(self._textos) > self.limite:
+                self._textos.popitem(last=False)
+        
+        return pd.DataFrame(linhas, columns=['id'] + colunas)
+
+def _contem_texto(texto, termo):
+    return 1 if texto is not None and termo in str(texto).casefold() else 0
+
+def buscar_ids_por_titulo(conn, termo):
+    """Ids de vídeos cujo título contém o termo (sem diferenciar maiúsculas)"""
+    conn.create_function('trendx_contem', 2, _contem_texto, deterministic=True)
+    linhas = conn.execute(
+        "SELECT id FROM valid_videos WHERE trendx_contem(title, ?)", (termo.casefold(),)
+    ).fetchall()
+    return [linha[0] for linha in linhas]
+
+# ========== BUSCA POR TÍTULO (FTS5) ==========
+# Índice de texto dos títulos num arquivo ao lado do banco (o bot nunca vê), criado por
+# `python script.py busca` e acompanhado pela atualização em segundo plano do dashboard
+# (as páginas só consultam, nunca gravam). Sem conteúdo (content=''): só o índice invertido, sem uma
+# segunda cópia dos títulos. Novas linhas entram pela marca d'água de id; exclusões e
+# títulos editados só saem numa reconstrução (`--completa` ou contagem divergente).
+FORMATO_BUSCA = 1
+TABELA_BUSCA = 'titulos_fts'
+TOKENIZADOR_BUSCA = 'unicode61 remove_diacritics 2'  # sem diferenciar maiúsculas nem acentos
+TAMANHO_LOTE_BUSCA = 50_000
+LIMITE_RANQUEAMENTO_BUSCA = 10_000
+
+def caminho_busca(caminho_banco):
+    """Arquivo do índice de títulos ao lado do banco (trendx_bot.db -> trendx_bot_busca.db)"""
+    base, _ = os.path.splitext(caminho_banco)
+    return f"{base}_busca.db"
+
+def _abrir_indice_busca(caminho_banco):
+    conn = sqlite3.connect(caminho_busca(caminho_banco), timeout=TIMEOUT_OCUPADO)
+    # WAL: buscas do dashboard continuam lendo enquanto a sincronização grava
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} "
+        f"USING fts5(title, content='', tokenize='{TOKENIZADOR_BUSCA}')"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS estado_busca (chave TEXT PRIMARY KEY, valor)")
+    return conn
+
+def sincronizar_busca_titulos(caminho_banco, completa=False, apenas_novos=False):
+    """Indexa no FTS5 os títulos com id acima da marca d'água; retorna {novos, total, reconstruido}
+    
+    Reconstrói do zero com `completa`, com formato antigo ou quando linhas até a marca
+    d'água foram excluídas (o índice sem conteúdo não apaga linha a linha); `apenas_novos`
+    pula essa verificação e nunca reconstrói.
+    """
+    origem = abrir_conexao_leitura(caminho_banco)
+    destino = _abrir_indice_busca(caminho_banco)
+    try:
+        with destino:
+            # Trava de escrita antes de ler a marca d'água: dois processos sincronizando ao
+            # mesmo tempo não partem do mesmo max_id (o FTS5 sem conteúdo aceitaria os
+            # rowids duplicados em silêncio, e o total contado duas vezes forçaria reconstruções)
+            destino.execute("BEGIN IMMEDIATE")
+            estado = dict(destino.execute("SELECT chave, valor FROM estado_busca").fetchall())
+            max_id, total = estado.get('max_id', 0), estado.get('total', 0)
+            
+            if estado.get('formato') != FORMATO_BUSCA:
+                completa = True
+            elif not completa and not apenas_novos:
+                atuais = origem.execute("SELECT COUNT(*) FROM valid_videos WHERE id <= ?", (max_id,)).fetchone()[0]
+                completa = atuais != total
+            
+            if completa:
+                destino.execute(f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('delete-all')")
+                max_id, total = 0, 0
+            
+            novos = 0
+            cursor = origem.execute("SELECT id, COALESCE(title, '') FROM valid_videos WHERE id > ? ORDER BY id", (max_id,))
+            while True:
+                lote = cursor.fetchmany(TAMANHO_LOTE_BUSCA)
+                if not lote:
+                    break
+                destino.executemany(f"INSERT INTO {TABELA_BUSCA}(rowid, title) VALUES (?, ?)", lote)
+                novos += len(lote)
+                max_id = lote[-1][0]
+            
+            total += novos
+            destino.executemany(
+                "INSERT OR REPLACE INTO estado_busca (chave, valor) VALUES (?, ?)",
+                [('formato', FORMATO_BUSCA), ('max_id', max_id), ('total', total)]
+            )
+        if completa:
+            destino.execute(f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('optimize')")
+            destino.commit()
+    finally:
+        origem.close()
+        destino.close()
+    return {'novos': novos, 'total': total, 'reconstruido': completa}
+
+def consulta_fts(termo):
+    """Texto digitado -> consulta FTS5: todas as palavras obrigatórias, a última como prefixo
+    
+    Só a última vira prefixo (é a que ainda está sendo digitada): prefixo em palavra
+    comum expande para muitos termos e deixa a busca dezenas de vezes mais lenta.
+    """
+    # \w+ não deixa passar aspas nem operadores: o termo nunca vira sintaxe do FTS5
+    palavras = [f'"{palavra}"' for palavra in re.findall(r'\w+', termo)]
+    if palavras:
+        palavras[-1] += '*'
+    return ' '.join(palavras)
+
+def buscar_titulos_fts(conn, termo):
+    """(ids dos vídeos cujo título tem todas as palavras, ranqueado) — `conn` aberta em caminho_busca
+    
+    Até LIMITE_RANQUEAMENTO_BUSCA resultados, os ids vêm do mais ao menos relevante (BM25);
+    acima disso a busca é ampla demais para o BM25 ajudar e custaria centenas de ms, então
+    vêm do mais recente ao mais antigo e ranqueado é False.
+    """
+    consulta = consulta_fts(termo)
+    if not consulta:
+        return np.array([], dtype=np.int64), False
+    
+    # Sem ORDER BY o FTS5 só percorre as listas de ids, sem calcular pontuação
+    linhas = conn.execute(f"SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH ?", (consulta,)).fetchall()
+    if len(linhas) > LIMITE_RANQUEAMENTO_BUSCA:
+        return np.fromiter((linha[0] for linha in reversed(linhas)), dtype=np.int64, count=len(linhas)), False
+    
+    linhas = conn.execute(
+        f"SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH ? ORDER BY rank", (consulta,)
+    ).fetchall()
+    return np.fromiter((linha[0] for linha in linhas), dtype=np.int64, count=len(linhas)), True
+
+# ========== FILTROS EM MEMÓRIA ==========
+class IndiceCriadoresVideos:
+    """Posições das linhas de cada criador no frame de vídeos, com os totais por criador
+    
+    Montado uma vez por frame a partir dos códigos da categoria discord_username; as
+    posições de cada criador ficam na ordem do frame, como sairiam de uma máscara.
+    """
+    
+    def __init__(self, df):
+        serie = df['discord_username']
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        
+        # Código -1 (sem criador) vira 0: o grupo de cada código c fica em inicios[c + 1].
+        # O argsort estável roda nos códigos originais (int8/int16 usam radix sort)
+        codigos = serie.cat.codes.to_numpy()
+        contagens = np.bincount(codigos.astype(np.int64) + 1, minlength=len(serie.cat.categories) + 1)
+        self._ordem = np.argsort(codigos, kind='stable').astype(np.int32 if len(df) < 2**31 else np.int64)
+        self._ordem.setflags(write=False)
+        self._inicios = np.concatenate([[0], np.cumsum(contagens)])
+        self._codigos = {nome: i + 1 for i, nome in enumerate(serie.cat.categories)}
+        self.nomes = [nome for nome, i in self._codigos.items() if contagens[i] > 0]
+        self._origem = weakref.ref(df)
+        self._totais = None
+    
+    @property
+    def totais(self):
+        """Vídeos, views, likes e engajamento médio por criador; calculados no primeiro uso"""
+        if self._totais is None:
+            self._totais = self._calcular_totais(self._origem())
+        return self._totais
+    
+    def posicoes(self, criador):
+        """Posições (iloc) dos vídeos do criador, em O(vídeos dele)"""
+        codigo = self._codigos.get(criador)
+        if codigo is None:
+            return self._ordem[:0]
+        return self._ordem[self._inicios[codigo]:self._inicios[codigo + 1]]
+    
+    def quantidade(self, criador):
+        """Total de vídeos do criador no frame"""
+        codigo = self._codigos.get(criador)
+        return 0 if codigo is None else int(self._inicios[codigo + 1] - self._inicios[codigo])
+    
+    def _calcular_totais(self, df):
+        # Fatia de cada criador somada na ordem do frame, como Series.sum()/mean() faria
+        # sobre df[df.discord_username == criador]: mesmos valores exibidos até a última casa
+        totais = {'videos': [self.quantidade(nome) for nome in self.nomes]}
+        for coluna, nome in (('views', 'views'), ('likes', 'likes'), ('engagement_rate', 'engajamento_medio')):
+            if coluna not in df.columns:
+                continue
+            valores = df[coluna].to_numpy()[self._ordem]
+            resultados = []
+            for criador in self.nomes:
+                codigo = self._codigos[criador]
+                fatia = valores[self._inicios[codigo]:self._inicios[codigo + 1]]
+                if fatia.dtype.kind == 'f':
+                    validos = ~np.isnan(fatia)
+                    soma = np.where(validos, fatia, 0.0).sum()
+                else:
+                    validos = np.ones(len(fatia), dtype=bool)
+                    soma = fatia.sum(dtype=np.int64)
+                if coluna == 'engagement_rate':
+                    resultados.append(soma / validos.sum() if validos.any() else np.nan)
+                else:
+                    resultados.append(soma)
+            totais[nome] = resultados
+        return pd.DataFrame(totais, index=pd.Index(self.nomes, name='discord_username'))
+
+class PermutacoesOrdenadas:
+    """Permutações decrescentes de um frame, uma por coluna, calculadas no primeiro uso
+    
+    Empates ficam na ordem do frame e NaN no fim (sort_values estável, nlargest com
+    keep='first'). Top-N e listas ordenadas de um subconjunto viram um recorte da
+    permutação pela máscara do subconjunto, sem ordenar de novo.
+    """
+    
+    def __init__(self, df):
+        self._origem = weakref.ref(df)
+        self._permutacoes = {}
+        self._lock = threading.Lock()
+    
+    def permutacao(self, coluna):
+        """(posições em ordem decrescente da coluna, quantas do início não são NaN)"""
+        with self._lock:
+            if coluna not in self._permutacoes:
+                valores = self._origem()[coluna].reset_index(drop=True)
+                ordem = valores.sort_values(ascending=False, kind='stable').index.to_numpy()
+                ordem = ordem.astype(np.int32 if len(ordem) < 2**31 else np.int64)
+                ordem.setflags(write=False)
+                self._permutacoes[coluna] = (ordem, int(valores.notna().sum()))
+            return self._permutacoes[coluna]
+    
+    def ordenar(self, coluna, mascara=None):
+        """Posições das linhas da máscara (todas, sem ela) em ordem decrescente da coluna"""
+        ordem, _ = self.permutacao(coluna)
+        return ordem if mascara is None else ordem[mascara[ordem]]
+    
+    def maiores(self, coluna, n, mascara=None, desempate=None):
+        """Posições das n linhas da máscara com os maiores valores, sem NaN (como nlargest)
+        
+        Empates seguem a ordem do frame. Com `desempate` (posição de cada linha numa lista
+        já ordenada), seguem a ordem dessa lista, como o nlargest aplicado a ela.
+        """
+        ordem, validos = self.permutacao(coluna)
+        ordem = ordem[:validos]
+        if mascara is None:
+            selecionadas = ordem[:n]
+        else:
+            # Blocos crescentes da permutação: com filtro pouco seletivo o primeiro já basta
+            encontrados = []
+            total, inicio, bloco = 0, 0, max(1024, 4 * n)
+            while inicio < len(ordem) and total < n:
+                trecho = ordem[inicio:inicio + bloco]
+                trecho = trecho[mascara[trecho]]
+                encontrados.append(trecho)
+                total += len(trecho)
+                inicio += bloco
+                bloco *= 4
+            selecionadas = np.concatenate(encontrados)[:n] if encontrados else ordem[:0]
+        
+        if desempate is None or not len(selecionadas):
+            return selecionadas
+        return self._desempatar(coluna, selecionadas, n, mascara, desempate)
+    
+    def _desempatar(self, coluna, selecionadas, n, mascara, desempate):
+        """Refaz o corte do top-N e a ordem dos empates pela posição em `desempate`"""
+        valores = self._origem()[coluna].to_numpy()
+        corte = valores[selecionadas[-1]]
+        acima = selecionadas[valores[selecionadas] > corte]
+        
+        # Todas as linhas com o valor do corte disputam as vagas que sobraram
+        iguais = valores == corte
+        empatadas = np.flatnonzero(iguais if mascara is None else iguais & mascara)
+        empatadas = empatadas[np.argsort(desempate[empatadas], kind='stable')][:n - len(acima)]
+        
+        escolhidas = np.concatenate([acima, empatadas])
+        return escolhidas[np.lexsort((desempate[escolhidas], -valores[escolhidas].astype(np.float64)))]
+
+class CacheOrdenacoes:
+    """PermutacoesOrdenadas do frame atual, refeitas quando a versão dos dados ou o frame muda"""
+    
+    def __init__(self):
+        self.versao = None
+        self._permutacoes = None
+        self._lock = threading.Lock()
+    
+    def obter(self, df, versao=None):
+        with self._lock:
+            atual = self._permutacoes
+            if atual is None or versao != self.versao or atual._origem() is not df:
+                self._permutacoes = PermutacoesOrdenadas(df)
+                self.versao = versao
+            return self._permutacoes
+
+def filtrar_videos(df, plataforma=None, usuario=None, min_views=0, apenas_com_link=False,
+                   ordenacao=None, crescente=False, criadores=None, permutacoes=None):
+    """Posições (para iloc) das linhas que passam pelos filtros da página de vídeos, já ordenadas
+    
+    Com o índice `criadores`, o filtro por criador parte só das linhas dele e os demais
+    filtros rodam sobre elas. Com `permutacoes` (PermutacoesOrdenadas), resultados grandes
+    saem da permutação da coluna em vez de serem ordenados; a ordem é a mesma.
+    """
+    posicoes = None  # None = todas as linhas
+    if usuario and 'discord_username' in df.columns:
+        if criadores is not None:
+            posicoes = criadores.posicoes(usuario)
+        else:
+            posicoes = np.flatnonzero((df['discord_username'] == usuario).to_numpy())
+    
+    def coluna(nome):
+        return df[nome] if posicoes is None else df[nome].iloc[posicoes]
+    
+    mascara = np.ones(len(df) if posicoes is None else len(posicoes), dtype=bool)
+    
+    if plataforma and 'platform' in df.columns:
+        mascara &= (coluna('platform') == plataforma).to_numpy()
+    
+    if 'views' in df.columns:
+        mascara &= (coluna('views') >= min_views).to_numpy()
+    
+    if apenas_com_link and 'tem_link' in df.columns:
+        mascara &= (coluna('tem_link') == True).to_numpy()
+    
+    posicoes = np.flatnonzero(mascara) if posicoes is None else posicoes[mascara]
+    if ordenacao in df.columns:
+        if permutacoes is not None and not crescente and len(posicoes) > len(df) // 16:
+            # Recortar a permutação custa O(linhas do frame); ordenar, O(k log k)
+            marcadas = np.zeros(len(df), dtype=bool)
+            marcadas[posicoes] = True
+            posicoes = permutacoes.ordenar(ordenacao, marcadas)
+        else:
+            # Estável: empates na ordem do frame, igual ao recorte da permutação
+            valores = pd.Series(df[ordenacao].to_numpy()[posicoes], index=posicoes)
+            posicoes = valores.sort_values(ascending=crescente, kind='stable').index.to_numpy()
+    
+    # int32 ocupa metade e basta para qualquer frame que caiba na memória
+    return posicoes.astype(np.int32 if len(df) < 2**31 else np.int64)
+
+def selecionar_linhas(df, posicoes):
+    """df.iloc[posicoes]; sem cópia quando as posições são todas as linhas, na ordem do frame"""
+    if len(posicoes) == len(df) and np.array_equal(posicoes, np.arange(len(df))):
+        return df
+    return df.iloc[posicoes]
+
+class CacheFiltrosVideos:
+    """LRU dos resultados de filtrar_videos, um por combinação de filtros e ordem
+    
+    Descartado quando a versão dos dados muda ou chega outro frame. Os arrays
+    devolvidos são somente leitura e compartilhados entre sessões.
+    """
+    
+    def __init__(self, limite=16):
+        self.limite = limite
+        self.versao = None
+        self._origem = None
+        self._criadores = None
+        self._indice_ids = None
+        self._ordenacoes = CacheOrdenacoes()
+        self._resultados = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _sincronizar(self, df, versao):
+        # Referência fraca: o cache não segura um frame antigo na memória
+        if versao != self.versao or self._origem is None or self._origem() is not df:
+            self._resultados.clear()
+            self._criadores = None
+            self._indice_ids = None
+            self.versao = versao
+            self._origem = weakref.ref(df)
+    
+    def criadores(self, df, versao=None):
+        """Índice por criador do frame (IndiceCriadoresVideos), montado na primeira vez"""
+        with self._lock:
+            self._sincronizar(df, versao)
+            if self._criadores is None and 'discord_username' in df.columns:
+                self._criadores = IndiceCriadoresVideos(df)
+            return self._criadores
+    
+    def permutacoes(self, df, versao=None):
+        """PermutacoesOrdenadas do frame de vídeos (top-N e ordenações das abas)"""
+        return self._ordenacoes.obter(df, versao)
+    
+    def posicoes_dos_ids(self, df, ids, versao=None):
+        """Posições (iloc) dos ids no frame, -1 para os que não estão nele"""
+        with self._lock:
+            self._sincronizar(df, versao)
+            if self._indice_ids is None:
+                # int64 como os ids vindos do SQLite: tipos diferentes fariam o get_indexer converter o índice todo
+                self._indice_ids = pd.Index(df['id'].to_numpy(dtype=np.int64))
+            indice = self._indice_ids
+        return indice.get_indexer(ids)
+    
+    def obter(self, df, versao=None, **filtros):
+        """Posições das linhas filtradas e ordenadas; calcula só na primeira vez"""
+        chave = tuple(sorted(filtros.items()))
+        criadores = self.criadores(df, versao) if filtros.get('usuario') else None
+        with self._lock:
+            self._sincronizar(df, versao)
+            
+            posicoes = self._resultados.get(chave)
+            if posicoes is None:
+                posicoes = filtrar_videos(df, criadores=criadores, permutacoes=self.permutacoes(df, versao), **filtros)
+                posicoes.setflags(write=False)
+                self._resultados[chave] = posicoes
+                while len(self._resultados) > self.limite:
+                    self._resultados.popitem(last=False)
+            else:
+                self._resultados.move_to_end(chave)
+            return posicoes
+
+# ========== PAGINAÇÃO NO BANCO (KEYSET) ==========
+# Coluna de ordenação do dashboard -> expressão SQL (todas ordenadas de forma decrescente)
+COLUNAS_METRICAS_SQL = "COALESCE(v.views, 0), COALESCE(v.likes, 0), COALESCE(v.comments, 0), COALESCE(v.shares, 0), v.platform"
+EXPRESSOES_ORDENACAO = {
+    'id': "v.id",
+    'views': "COALESCE(v.views, 0)",
+    'likes': "COALESCE(v.likes, 0)",
+    'engagement_rate': f"trendx_engajamento({COLUNAS_METRICAS_SQL})",
+    'video_score': f"trendx_video_score({COLUNAS_METRICAS_SQL})",
+}
+
+def _engajamento_sql(views, likes, comments, shares, platform):
+    return calcular_engajamento_por_plataforma(views, likes, comments, shares, platform or 'geral')
+
+def _video_score_sql(views, likes, comments, shares, platform):
+    engajamento = _engajamento_sql(views, likes, comments, shares, platform)
+    return float(np.round(engajamento * 0.6 + np.log1p(views) * 0.4, 2))
+
+def registrar_funcoes_sql(conn):
+    """Registra as fórmulas do dashboard no SQLite para ordenar com os mesmos valores exibidos
+    
+    O ROUND() do SQLite arredonda diferente do round() do Python (ex: 6.125), então as
+    métricas derivadas usam as próprias funções de referência.
+    """
+    conn.create_function('trendx_engajamento', 5, _engajamento_sql, deterministic=True)
+    conn.create_function('trendx_video_score', 5, _video_score_sql, deterministic=True)
+
+def montar_filtros_videos(plataforma=None, usuario=None, min_views=0, apenas_com_link=False):
+    """Traduz os filtros da página de vídeos para cláusulas WHERE + parâmetros"""
+    condicoes = ["cs.discord_username IS NOT NULL"]
+    parametros = []
+    
+    if plataforma:
+        condicoes.append("v.platform = ?")
+        parametros.append(plataforma)
+    
+    if usuario:
+        condicoes.append("cs.discord_username = ?")
+        parametros.append(usuario)
+    
+    if min_views:
+        condicoes.append("v.views >= ?")
+        parametros.append(min_views)
+    
+    if apenas_com_link:
+        # Mesmo critério de tem_link: URL com mais de 10 caracteres
+        condicoes.append("length(v.url) > 10")
+    
+    return condicoes, parametros
+
+def montar_consulta_contagem(filtros):
+    """(SQL, parâmetros) do total de vídeos que passam pelos filtros"""
+    condicoes, parametros = filtros
+    query = f"""
+    SELECT COUNT(*)
+    FROM valid_videos v
+    LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+    WHERE {' AND '.join(condicoes)}
+    """
+    return query, list(parametros)
+
+def contar_videos_filtrados(conn, filtros):
+    """Total de vídeos que passam pelos filtros"""
+    query, parametros = montar_consulta_contagem(filtros)
+    return conn.execute(query, parametros).fetchone()[0]
+
+def montar_consulta_pagina(filtros, ordenacao, limite, cursor=None, chaves_persistidas=False):
+    """(SQL, parâmetros) de uma página ordenada começando depois do cursor (chave, id)
+    
+    Com `chaves_persistidas`, engagement_rate e video_score vêm do arquivo de chaves
+    anexado (ver anexar_chaves_ordenacao) em vez das funções trendx_*.
+    """
+    condicoes, parametros = filtros
+    condicoes = list(condicoes)
+    parametros = list(parametros)
+    persistida = chaves_persistidas and ordenacao in ORDENACOES_PERSISTIDAS
+    chave = f"k.{ordenacao}" if persistida else EXPRESSOES_ORDENACAO[ordenacao]
+    coluna_id = "k.id" if persistida else "v.id"
+    # CROSS JOIN fixa k como laço externo: o índice da chave entrega a ordem e o LIMIT para a leitura
+    origem = f"{ESQUEMA_CHAVES}.{TABELA_CHAVES} k CROSS JOIN valid_videos v ON v.id = k.id" if persistida else "valid_videos v"
+    
+    if cursor is not None:
+        valor_chave, ultimo_id = cursor
+        if ordenacao == 'id':
+            condicoes.append("v.id < ?")
+            parametros.append(ultimo_id)
+        else:
+            # O "chave <= ?" isolado deixa o SQLite posicionar o índice no cursor; só com o
+            # OR (ou com valores de linha) ele percorre o índice desde o topo, como um OFFSET
+            condicoes.append(f"{chave} <= ? AND ({chave} < ? OR {coluna_id} < ?)")
+            parametros.extend([valor_chave, valor_chave, ultimo_id])
+    
+    query = f"""
+    SELECT 
+        v.*,
+        cs.discord_username,
+        {chave} AS chave_ordenacao
+    FROM {origem}
+    LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+    WHERE {' AND '.join(condicoes)}
+    ORDER BY chave_ordenacao DESC, {coluna_id} DESC
+    LIMIT ?
+    """
+    return query, parametros + [limite]
+
+def consultar_pagina_videos(conn, filtros, ordenacao, limite, cursor=None, caminho_banco_chaves=None):
+    """Busca uma página de vídeos já ordenada, começando depois do cursor (chave, id)
+    
+    Retorna (df, proximo_cursor); proximo_cursor é None na última página. O custo depende
+    do tamanho da página e não da posição, ao contrário de OFFSET/iloc. Com
+    `caminho_banco_chaves` (banco cujas chaves estão em dia, ver chaves_ordenacao_em_dia),
+    engajamento e video score também são lidos por índice; sem ele, essas duas ordens
+    avaliam as funções em todas as linhas filtradas.
+    """
+    registrar_funcoes_sql(conn)
+    persistida = caminho_banco_chaves is not None and ordenacao in ORDENACOES_PERSISTIDAS
+    if persistida:
+        anexar_chaves_ordenacao(conn, caminho_banco_chaves)
+    query, parametros = montar_consulta_pagina(filtros, ordenacao, limite, cursor, persistida)
+    df = pd.read_sql_query(query, conn, params=parametros)
+    
+    proximo_cursor = None
+    if len(df) == limite:
+        ultima = df.iloc[-1]
+        valor_chave = ultima['chave_ordenacao']
+        # Tipos do NumPy não são aceitos como parâmetro pelo sqlite3
+        valor_chave = valor_chave.item() if hasattr(valor_chave, 'item') else valor_chave
+        proximo_cursor = (valor_chave, int(ultima['id']))
+    
+    df = preparar_videos(df.drop(columns=['chave_ordenacao']))
+    return df, proximo_cursor
+
+# ========== CHAVES DE ORDENAÇÃO PERSISTIDAS ==========
+# engagement_rate e video_score saem das fórmulas em Python (trendx_* no SQLite), que
+# nenhum índice do trendx_bot.db pode usar. As chaves ficam num arquivo ao lado do banco
+# (o bot nunca vê), indexadas e com os contadores de onde saíram: a sincronização só
+# recalcula as linhas novas ou alteradas. Criado por `python script.py ordenacao` e
+# acompanhado pela atualização em segundo plano do dashboard.
+FORMATO_CHAVES = 1
+TABELA_CHAVES = 'chaves_ordenacao'
+ESQUEMA_CHAVES = 'chaves'  # nome do ATTACH nas conexões do dashboard
+ORDENACOES_PERSISTIDAS = ['engagement_rate', 'video_score']
+COLUNAS_ORIGEM_CHAVES = ['id'] + COLUNAS_CONTADORES_VIDEO + ['platform']
+TAMANHO_LOTE_CHAVES = 50_000
+
+def caminho_chaves_ordenacao(caminho_banco):
+    """Arquivo das chaves ao lado do banco (trendx_bot.db -> trendx_bot_ordenacao.db)"""
+    base, _ = os.path.splitext(caminho_banco)
+    return f"{base}_ordenacao.db"
+
+def _abrir_chaves_ordenacao(caminho_banco):
+    conn = sqlite3.connect(caminho_chaves_ordenacao(caminho_banco), timeout=TIMEOUT_OCUPADO)
+    # WAL: as páginas do dashboard continuam lendo enquanto a sincronização grava
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABELA_CHAVES} (id INTEGER PRIMARY KEY, "
+        f"{', '.join(COLUNAS_ORIGEM_CHAVES[1:])}, {' REAL, '.join(ORDENACOES_PERSISTIDAS)} REAL)"
+    )
+    for coluna in ORDENACOES_PERSISTIDAS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABELA_CHAVES}_{coluna} ON {TABELA_CHAVES} ({coluna}, id)")
+    conn.execute("CREATE TABLE IF NOT EXISTS estado_chaves (chave TEXT PRIMARY KEY, valor)")
+    return conn
+
+def sincronizar_chaves_ordenacao(caminho_banco):
+    """Recalcula as chaves das linhas novas, alteradas e excluídas; retorna {novos, alterados, removidos, total}
+    
+    Percorre valid_videos em lotes por id e compara com os contadores gravados (sem
+    Python por linha nas fórmulas: só as linhas que mudaram passam por preparar_videos).
+    """
+    origem = abrir_conexao_leitura(caminho_banco)
+    destino = _abrir_chaves_ordenacao(caminho_banco)
+    resultado = {'novos': 0, 'alterados': 0, 'removidos': 0, 'total': 0}
+    selecao = ', '.join(COLUNAS_ORIGEM_CHAVES)
+    try:
+        with destino:
+            # Trava de escrita primeiro, como na busca: uma sincronização por vez
+            destino.execute("BEGIN IMMEDIATE")
+            estado = dict(destino.execute("SELECT chave, valor FROM estado_chaves").fetchall())
+            if estado.get('formato') != FORMATO_CHAVES:
+                destino.execute(f"DELETE FROM {TABELA_CHAVES}")
+            
+            # Tudo lido na mesma transação: o estado gravado no fim descreve exatamente o que foi lido
+            origem.execute("BEGIN")
+            cursor = origem.execute(f"SELECT {selecao} FROM valid_videos ORDER BY id")
+            ultimo_id = None
+            while True:
+                lote = cursor.fetchmany(TAMANHO_LOTE_CHAVES)
+                if not lote:
+                    break
+                faixa = "id <= ?" if ultimo_id is None else "id > ? AND id <= ?"
+                limites = (lote[-1][0],) if ultimo_id is None else (ultimo_id, lote[-1][0])
+                gravadas = {linha[0]: linha[1:] for linha in destino.execute(
+                    f"SELECT {selecao} FROM {TABELA_CHAVES} WHERE {faixa}", limites
+                )}
+                
+                mudadas = []
+                for linha in lote:
+                    anterior = gravadas.pop(linha[0], None)
+                    if anterior is None:
+                        resultado['novos'] += 1
+                    elif anterior == linha[1:]:
+                        continue
+                    else:
+                        resultado['alterados'] += 1
+                    mudadas.append(linha)
+                
+                # Sobraram na faixa: excluídas do banco
+                destino.executemany(f"DELETE FROM {TABELA_CHAVES} WHERE id = ?", [(i,) for i in gravadas])
+                resultado['removidos'] += len(gravadas)
+                if mudadas:
+                    chaves = preparar_videos(pd.DataFrame(mudadas, columns=COLUNAS_ORIGEM_CHAVES))
+                    valores = zip(*(chaves[coluna].tolist() for coluna in ORDENACOES_PERSISTIDAS))
+                    destino.executemany(
+                        f"INSERT OR REPLACE INTO {TABELA_CHAVES} VALUES ({', '.join('?' * (len(COLUNAS_ORIGEM_CHAVES) + len(ORDENACOES_PERSISTIDAS)))})",
+                        [linha + tuple(chave) for linha, chave in zip(mudadas, valores)]
+                    )
+                resultado['total'] += len(lote)
+                ultimo_id = lote[-1][0]
+            
+            resultado['removidos'] += destino.execute(
+                f"DELETE FROM {TABELA_CHAVES} WHERE id > ?", (ultimo_id or 0,)
+            ).rowcount
+            max_id = ultimo_id or 0
+            soma = list(origem.execute(QUERY_SOMA_CONTADORES, (max_id,)).fetchone())
+            destino.executemany(
+                "INSERT OR REPLACE INTO estado_chaves (chave, valor) VALUES (?, ?)",
+                [('formato', FORMATO_CHAVES), ('max_id', max_id), ('total', resultado['total']),
+                 ('soma_contadores', json.dumps(soma))]
+            )
+    finally:
+        origem.close()
+        destino.close()
+    return resultado
+
+def chaves_ordenacao_em_dia(conn, caminho_banco):
+    """True quando o arquivo de chaves foi sincronizado com o conteúdo atual de valid_videos
+    
+    Compara max(id), total e a soma de verificação dos contadores (a mesma do carregador
+    incremental); uma varredura pelo índice de contadores, então vale cachear por versão.
+    """
+    destino = caminho_chaves_ordenacao(caminho_banco)
+    if not os.path.exists(destino):
+        return False
+    leitura = abrir_conexao_leitura(destino)
+    try:
+        estado = dict(leitura.execute("SELECT chave, valor FROM estado_chaves").fetchall())
+    except sqlite3.Error:
+        return False
+    finally:
+        leitura.close()
+    if estado.get('formato') != FORMATO_CHAVES:
+        return False
+    
+    max_id, total = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM valid_videos").fetchone()
+    if (max_id, total) != (estado['max_id'], estado['total']):
+        return False
+    return list(conn.execute(QUERY_SOMA_CONTADORES, (max_id,)).fetchone()) == json.loads(estado['soma_contadores'])
+
+def anexar_chaves_ordenacao(conn, caminho_banco):
+    """Anexa o arquivo de chaves à conexão como `chaves` (uma vez por conexão do pool)"""
+    anexados = {linha[1] for linha in conn.execute("PRAGMA database_list")}
+    if ESQUEMA_CHAVES not in anexados:
+        conn.execute(f"ATTACH DATABASE ? AS {ESQUEMA_CHAVES}", (caminho_chaves_ordenacao(caminho_banco),))
+
+# ========== ÍNDICES E PLANOS DE CONSULTA ==========
+# Índices das consultas do dashboard, criados por `python script.py indices`. Só
+# expressões nativas do SQLite: o bot precisa conseguir gravar nas tabelas sem as
+# funções trendx_*. Engajamento e video score usam as chaves persistidas acima; sem
+# elas, essas duas ordens continuam por varredura.
+IndiceDashboard = namedtuple('IndiceDashboard', ['nome', 'tabela', 'colunas', 'definicao'])
+
+INDICES_DASHBOARD = [
+    # Join vídeo -> criador e filtro por criador
+    IndiceDashboard('idx_valid_videos_user_id', 'valid_videos', ['user_id'], "user_id"),
+    # Filtro por plataforma + views mínimas
+    IndiceDashboard('idx_valid_videos_platform_views', 'valid_videos', ['platform', 'views'], "platform, views"),
+    # Ordem das páginas por views/likes: mesmas expressões de EXPRESSOES_ORDENACAO
+    IndiceDashboard('idx_valid_videos_views_ordem', 'valid_videos', ['views', 'id'], "COALESCE(views, 0), id"),
+    IndiceDashboard('idx_valid_videos_likes_ordem', 'valid_videos', ['likes', 'id'], "COALESCE(likes, 0), id"),
+    # Cobre a soma de verificação e a releitura dos contadores sem tocar em títulos e URLs
+    IndiceDashboard(
+        'idx_valid_videos_contadores', 'valid_videos',
+        ['id'] + COLUNAS_CONTADORES_VIDEO, ', '.join(['id'] + COLUNAS_CONTADORES_VIDEO)
+    ),
+    IndiceDashboard('idx_valid_videos_updated_at', 'valid_videos', ['updated_at'], "updated_at"),
+    # Filtro por nome do criador e assinatura do conjunto de criadores
+    IndiceDashboard(
+        'idx_cached_stats_username_views', 'cached_stats',
+        ['discord_username', 'total_views'], "discord_username, total_views"
+    ),
+    IndiceDashboard('idx_cached_stats_updated_at', 'cached_stats', ['updated_at'], "updated_at"),
+]
+
+def migrar_indices(caminho_banco):
+    """Cria os índices que faltam (idempotente) e roda ANALYZE; retorna {situação: [nomes]}
+    
+    Abre o banco para escrita: rode com o dashboard no ar sem problema, mas cada
+    CREATE INDEX segura o lock de escrita do bot enquanto percorre a tabela.
+    """
+    conn = sqlite3.connect(caminho_banco, timeout=TIMEOUT_OCUPADO)
+    try:
+        tabelas = tabelas_do_banco(conn)
+        existentes = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        resultado = {'criados': [], 'existentes': [], 'ignorados': []}
+        
+        for indice in INDICES_DASHBOARD:
+            if indice.nome in existentes:
+                resultado['existentes'].append(indice.nome)
+                continue
+            # Esquemas antigos do bot podem não ter todas as colunas (ex: updated_at)
+            if indice.tabela not in tabelas or not set(indice.colunas) <= set(colunas_da_tabela(conn, indice.tabela)):
+                resultado['ignorados'].append(indice.nome)
+                continue
+            
+            with conn:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {indice.nome} ON {indice.tabela} ({indice.definicao})")
+            resultado['criados'].append(indice.nome)
+        
+        # Estatísticas novas para o planejador escolher entre os índices
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    return resultado
+
+def _colunas_monitoradas(conn, tabela):
+    da_tabela = colunas_da_tabela(conn, tabela)
+    colunas = MonitorVersaoDados.MARCAS_TABELAS[tabela] + ['updated_at']
+    return [c for c in dict.fromkeys(colunas) if c in da_tabela]
+
+def consultas_dashboard(conn, chaves_persistidas=False):
+    """Consultas que o dashboard emite, com parâmetros de exemplo: [(nome, SQL, parâmetros, motivo)]
+    
+    `motivo` explica por que uma varredura completa é esperada naquela consulta; None
+    quando ela deveria ser atendida por índice. Com `chaves_persistidas` (arquivo de
+    chaves já anexado), inclui as páginas de engajamento e video score lidas dele.
+    """
+    tabelas = tabelas_do_banco(conn)
+    consultas = []
+    
+    if 'cached_stats' in tabelas:
+        consultas += [
+            ('usuarios', QUERY_USUARIOS, [], "carga de todos os criadores"),
+            ('versao_usuarios', QUERY_VERSAO_USUARIOS, [], "somas sobre todos os criadores"),
+            ('assinatura_usuarios', QUERY_ASSINATURA_USUARIOS, [], None),
+            ('versao_cached_stats', query_maximos('cached_stats', _colunas_monitoradas(conn, 'cached_stats')), [], None),
+            ('opcoes_criadores',
+             "SELECT DISTINCT discord_username FROM cached_stats WHERE discord_username IS NOT NULL ORDER BY discord_username",
+             [], None),
+        ]
+    
+    if 'valid_videos' not in tabelas:
+        return consultas
+    
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM valid_videos").fetchone()[0]
+    corte = max_id // 2
+    projecao, adiadas = projecao_videos(conn)
+    ids = [linha[0] for linha in conn.execute("SELECT id FROM valid_videos ORDER BY id DESC LIMIT 50")]
+    marcadores = ', '.join('?' * len(ids)) or 'NULL'
+    
+    consultas += [
+        ('versao_valid_videos', query_maximos('valid_videos', _colunas_monitoradas(conn, 'valid_videos')), [], None),
+        ('estado_videos', "SELECT COALESCE(MAX(id), 0), COUNT(*) FROM valid_videos", [], "COUNT(*) sem filtro"),
+        ('total_videos', "SELECT COUNT(*) FROM valid_videos", [], "COUNT(*) sem filtro"),
+        ('contagem_ate_marca', "SELECT COUNT(*) FROM valid_videos WHERE id <= ?", [max_id], "faixa até a marca d'água"),
+        ('soma_contadores', QUERY_SOMA_CONTADORES, [max_id], "faixa até a marca d'água"),
+        ('contadores_atuais',
+         f"SELECT {', '.join(['id'] + COLUNAS_CONTADORES_VIDEO)} FROM valid_videos WHERE id <= ?",
+         [max_id], "faixa até a marca d'água"),
+        ('videos_carga_completa', QUERY_VIDEOS.format(colunas=projecao, filtro="AND v.id <= ?"),
+         [max_id], "carga de todos os vídeos"),
+        ('videos_novos', QUERY_VIDEOS.format(colunas=projecao, filtro="AND v.id > ? AND v.id <= ?"),
+         [corte, max_id], None),
+        ('videos_alterados_por_id', QUERY_VIDEOS.format(colunas=projecao, filtro=f"AND v.id IN ({marcadores})"),
+         ids, None),
+        ('opcoes_plataformas',
+         "SELECT DISTINCT platform FROM valid_videos WHERE platform IS NOT NULL ORDER BY platform", [], None),
+    ]
+    
+    if 'updated_at' in colunas_da_tabela(conn, 'valid_videos'):
+        consultas += [
+            ('max_updated_at', "SELECT MAX(updated_at) FROM valid_videos", [], None),
+            ('videos_alterados_updated_at',
+             QUERY_VIDEOS.format(colunas=projecao, filtro="AND v.id <= ? AND v.updated_at > ? AND v.updated_at <= ?"),
+             [max_id, '', ''], None),
+        ]
+    
+    if adiadas:
+        consultas += [
+            ('textos_por_id', f"SELECT {', '.join(['id'] + adiadas)} FROM valid_videos WHERE id IN ({marcadores})",
+             ids, None),
+        ]
+    if 'title' in adiadas:
+        consultas += [
+            ('busca_titulo', "SELECT id FROM valid_videos WHERE trendx_contem(title, ?)", ['x'],
+             "busca por substring no título"),
+        ]
+    
+    # Paginação: primeira página e página seguinte de cada ordenação, com e sem filtros
+    plataforma = conn.execute("SELECT platform FROM valid_videos WHERE platform IS NOT NULL LIMIT 1").fetchone()
+    usuario = conn.execute(
+        "SELECT discord_username FROM cached_stats WHERE discord_username IS NOT NULL LIMIT 1"
+    ).fetchone() if 'cached_stats' in tabelas else None
+    filtros = {
+        'sem_filtro': montar_filtros_videos(),
+        'plataforma': montar_filtros_videos(plataforma=plataforma[0] if plataforma else 'tiktok', min_views=1000),
+        'criador': montar_filtros_videos(usuario=usuario[0] if usuario else 'x'),
+    }
+    for ordenacao, expressao in EXPRESSOES_ORDENACAO.items():
+        motivo = "ordem por função Python (sem `python script.py ordenacao`)" if expressao.startswith('trendx_') else None
+        for nome_filtro, filtro in filtros.items():
+            for pagina, cursor in (('p1', None), ('p2', (1, max_id))):
+                query, parametros = montar_consulta_pagina(filtro, ordenacao, 50, cursor)
+                consultas.append((f"pagina_{ordenacao}_{nome_filtro}_{pagina}", query, parametros, motivo))
+                if chaves_persistidas and ordenacao in ORDENACOES_PERSISTIDAS:
+                    query, parametros = montar_consulta_pagina(filtro, ordenacao, 50, cursor, chaves_persistidas=True)
+                    consultas.append((f"pagina_{ordenacao}_{nome_filtro}_{pagina}_chaves", query, parametros, None))
+    for nome_filtro, filtro in filtros.items():
+        query, parametros = montar_consulta_contagem(filtro)
+        motivo = "COUNT(*) sem filtro" if nome_filtro == 'sem_filtro' else None
+        consultas.append((f"contagem_{nome_filtro}", query, parametros, motivo))
+    
+    return consultas
+
+def _e_varredura_completa(detalhe):
+    # "SCAN v" (ou "SCAN TABLE valid_videos AS v" em SQLites antigos) sem índice
+    return detalhe.startswith('SCAN') and 'USING' not in detalhe and 'CONSTANT ROW' not in detalhe
+
+def planos_consultas(conn, caminho_banco_chaves=None):
+    """EXPLAIN QUERY PLAN de cada consulta do dashboard, com varreduras e ordenações temporárias
+    
+    `ordenada` marca a varredura que já sai na ordem do ORDER BY (sem B-tree temporária)
+    numa consulta com LIMIT: ela para ao juntar a página, em vez de ler a tabela toda.
+    Com `caminho_banco_chaves`, inclui as páginas lidas do arquivo de chaves de ordenação.
+    """
+    registrar_funcoes_sql(conn)
+    conn.create_function('trendx_contem', 2, _contem_texto, deterministic=True)
+    if caminho_banco_chaves is not None:
+        anexar_chaves_ordenacao(conn, caminho_banco_chaves)
+    
+    planos = []
+    for nome, query, parametros, motivo in consultas_dashboard(conn, caminho_banco_chaves is not None):
+        detalhes = [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {query}", parametros)]
+        ordenacao_temporaria = any('TEMP B-TREE' in d for d in detalhes)
+        planos.append({
+            'nome': nome,
+            'plano': detalhes,
+            'varreduras': [d for d in detalhes if _e_varredura_completa(d)],
+            'ordenacao_temporaria': ordenacao_temporaria,
+            'ordenada': 'LIMIT' in query and not ordenacao_temporaria,
+            'motivo': motivo,
+        })
+    return planos
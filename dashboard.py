@@ -1,5 +1,6 @@
 import streamlit as st
 import sqlite3
+import html
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -8,6 +9,35 @@ import os
 from datetime import datetime, timedelta
 import numpy as np
 import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from banco import (
+    ORDENACOES_PERSISTIDAS,
+    AtualizadorEmSegundoPlano,
+    CacheFiltrosVideos,
+    CacheOrdenacoes,
+    CacheTextosVideos,
+    CarregadorVideosIncremental,
+    MonitorVersaoDados,
+    PoolConexoesLeitura,
+    abrir_conexao_leitura,
+    buscar_ids_por_titulo,
+    buscar_titulos_fts,
+    caminho_busca,
+    caminho_snapshot,
+    carregar_frames,
+    chaves_ordenacao_em_dia,
+    consultar_pagina_videos,
+    contar_videos_filtrados,
+    montar_filtros_videos,
+    opcoes_filtros_videos,
+    selecionar_linhas,
+    sincronizar_arquivos_auxiliares,
+)
+from metricas import CacheEstatisticasPopulacao, relatorio_memoria
 
 import os
 
@@ -139,14 +169,10 @@ st.markdown("""
 # ========== CONFIGURAÇÕES ==========
 DB_PATH = "trendx_bot.db"
 
-# ========== FUNÇÕES UTILITÁRIAS AVANÇADAS ==========
-def converter_para_numerico_seguro(series, valor_padrao=0):
-    """Converte uma série para numérico de forma segura"""
-    try:
-        return pd.to_numeric(series, errors='coerce').fillna(valor_padrao)
-    except:
-        return pd.Series([valor_padrao] * len(series), index=series.index)
+# Teto de memória do frame de vídeos; acima dele a página de vídeos consulta o banco direto
+LIMITE_MEMORIA_VIDEOS_MB = float(os.getenv('TRENDX_LIMITE_MEMORIA_VIDEOS_MB', '1024'))
 
+# ========== FUNÇÕES UTILITÁRIAS AVANÇADAS ==========
 def formatar_numero(num):
     """Formatar números para exibição"""
     try:
@@ -171,319 +197,397 @@ def formatar_numero(num):
     except:
         return "0"
 
-def calcular_engajamento_por_plataforma(views, likes, comments, shares, platform):
-    """Calcula engajamento usando as fórmulas oficiais de cada rede social"""
-    if views == 0:
-        return 0
-    
-    if platform.lower() == 'tiktok':
-        # TikTok: (Curtidas + Comentários + Compartilhamentos) / Views × 100
-        # TikTok considera todas as interações igualmente
-        engajamento = ((likes + comments + shares) / views) * 100
-    
-    elif platform.lower() == 'youtube':
-        # YouTube: (Curtidas + Comentários) / Views × 100
-        # YouTube não conta shares da mesma forma
-        engajamento = ((likes + comments) / views) * 100
-    
-    elif platform.lower() == 'instagram':
-        # Instagram: (Curtidas + Comentários + Compartilhamentos) / Alcance × 100
-        # Instagram usa alcance, mas como temos views, usamos views
-        engajamento = ((likes + comments + shares) / views) * 100
-    
-    else:
-        # Fórmula geral para outras plataformas
-        engajamento = ((likes + comments + shares) / views) * 100
-    
-    return round(engajamento, 2)
+def formatar_numeros(valores):
+    """formatar_numero aplicado a uma coluna inteira de uma vez"""
+    numeros = pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+    textos = np.full(len(numeros), "0", dtype=object)
+    restantes = ~np.isnan(numeros) & (numeros != 0)
+    for limite, sufixo in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        faixa = restantes & (numeros >= limite)
+        textos[faixa] = [f"{n:.1f}{sufixo}" for n in numeros[faixa] / limite]
+        restantes &= ~faixa
+    textos[restantes] = [f"{int(n):,}" for n in numeros[restantes]]
+    return textos
 
-def calcular_score_performance_real(views, likes, comments, shares, videos, platform_principal=None):
-    """Calcula score baseado nas métricas reais das redes sociais"""
-    if views == 0 or videos == 0:
-        return 0
-    
-    # 1. Taxa de Engajamento Real (50% do score)
-    if platform_principal:
-        taxa_engajamento = calcular_engajamento_por_plataforma(views, likes, comments, shares, platform_principal)
+# ========== TEMPOS DA PÁGINA ==========
+# Etapas cronometradas na execução atual, mostradas no fim da sidebar
+def iniciar_tempos():
+    """Zera os tempos no começo de cada execução do script"""
+    st.session_state['tempos_pagina'] = []
+
+@contextmanager
+def medir_tempo(etapa):
+    """Cronometra o bloco e registra o tempo (ms) da etapa na execução atual"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        st.session_state.setdefault('tempos_pagina', []).append((etapa, (time.perf_counter() - inicio) * 1000))
+
+# ========== GRÁFICOS EM CACHE ==========
+class CacheFiguras:
+    """Figuras Plotly já montadas por chave, com LRU limitado; esvazia quando a versão dos dados muda"""
+    
+    def __init__(self, limite=64):
+        self.limite = limite
+        self.versao = None
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def obter(self, chave, versao=None):
+        with self._lock:
+            if versao != self.versao:
+                self._figuras.clear()
+                self.versao = versao
+            fig = self._figuras.get(chave)
+            if fig is not None:
+                self._figuras.move_to_end(chave)
+            return fig
+    
+    def guardar(self, chave, fig, versao=None):
+        with self._lock:
+            if versao != self.versao:
+                return
+            self._figuras[chave] = fig
+            while len(self._figuras) > self.limite:
+                self._figuras.popitem(last=False)
+
+@st.cache_resource
+def obter_cache_figuras():
+    """Cache das figuras montadas compartilhado entre sessões"""
+    return CacheFiguras()
+
+def exibir_figura(chave, construir, versao_dados=None):
+    """Mostra a figura de construir() (largura do container), memorizada por versão dos dados e chave
+    
+    O cache guarda a figura já montada: num rerun com os mesmos parâmetros o px/go não
+    roda de novo, o st.plotly_chart só serializa e envia. Sem versão dos dados não há
+    como saber se a figura guardada ainda vale, então ela é sempre montada.
+    """
+    cache = obter_cache_figuras()
+    nome = '/'.join(str(parte) for parte in chave[:2])
+    fig = cache.obter(chave, versao_dados) if versao_dados is not None else None
+    if fig is None:
+        with medir_tempo(f"📈 {nome}: montar"):
+            fig = construir()
+        if versao_dados is not None:
+            cache.guardar(chave, fig, versao_dados)
+        etapa = f"📈 {nome}: serializar e enviar"
     else:
-        # Fórmula geral se não soubermos a plataforma principal
-        taxa_engajamento = ((likes + comments + shares) / views) * 100
-    
-    # Normalizar taxa de engajamento para pontuação (0-50 pontos)
-    # Taxa > 10% = pontuação máxima (50 pontos)
-    score_engajamento = min(taxa_engajamento * 5, 50)
-    
-    # 2. Volume de Alcance (30% do score)
-    # Baseado em views totais, mas com escala logarítmica
-    score_volume = min(np.log1p(views) * 3, 30)
-    
-    # 3. Frequência/Consistência (20% do score)
-    # Views por vídeo - mede se cada vídeo tem performance boa
-    views_por_video = views / videos
-    score_consistencia = min(views_por_video * 0.002, 20)
-    
-    total_score = score_engajamento + score_volume + score_consistencia
-    return min(round(total_score, 1), 100)
-
-def determinar_plataforma_principal(tiktok_views, youtube_views, instagram_views):
-    """Determina qual é a plataforma principal do usuário"""
-    plataformas = {
-        'tiktok': tiktok_views,
-        'youtube': youtube_views, 
-        'instagram': instagram_views
-    }
+        etapa = f"📈 {nome}: serializar e enviar (cache)"
     
-    # Retorna a plataforma com mais views
-    plataforma_principal = max(plataformas.items(), key=lambda x: x[1])
-    return plataforma_principal[0] if plataforma_principal[1] > 0 else None
-
-def obter_categoria_performance(score):
-    """Retorna categoria baseada no score"""
-    if score >= 80:
-        return "🏆 Elite", "#ffd700"
-    elif score >= 60:
-        return "🥇 Expert", "#c0c0c0"
-    elif score >= 40:
-        return "🥈 Avançado", "#cd7f32"
-    elif score >= 20:
-        return "🥉 Intermediário", "#4caf50"
-    elif score > 0:
-        return "🌱 Iniciante", "#ff9800"
-    else:
-        return "😴 Inativo", "#6c757d"
+    # A figura é compartilhada entre sessões; o st.plotly_chart só lê (serializa uma cópia)
+    with medir_tempo(etapa):
+        st.plotly_chart(fig, use_container_width=True)
+
+# Rankings maiores que isso ("Todos") viram top rotulado + distribuição, e a tabela é paginada
+LIMITE_BARRAS_RANKING = 100
+TOP_ROTULADO_RANKING = 50
+FAIXAS_CAUDA_RANKING = 24
+
+def rotulo_faixa(valor):
+    """Limite de faixa legível tanto para views quanto para taxas pequenas"""
+    return formatar_numero(valor) if valor >= 10 else f"{valor:.2f}"
+
+def distribuicao_log(valores, faixas=FAIXAS_CAUDA_RANKING):
+    """Quantidade de valores por faixa logarítmica (zeros numa faixa própria)"""
+    valores = np.asarray(valores, dtype=float)
+    positivos = valores[valores > 0]
+    linhas = []
+    zeros = int((valores <= 0).sum())
+    if zeros:
+        linhas.append(("0", zeros))
+    if len(positivos):
+        menor, maior = positivos.min(), positivos.max()
+        limites = np.geomspace(menor, maior, faixas + 1) if maior > menor else np.array([menor, maior])
+        contagem, limites = np.histogram(positivos, bins=limites)
+        linhas += [
+            (f"{rotulo_faixa(a)}–{rotulo_faixa(b)}", int(q))
+            for a, b, q in zip(limites[:-1], limites[1:], contagem)
+        ]
+    return pd.DataFrame(linhas, columns=['faixa', 'usuarios'])
+
+def figura_ranking_grande(df, coluna, titulo, escala):
+    """Top rotulado em barras e o resto do ranking como distribuição em faixas log
+    
+    O tamanho da figura não depende do número de usuários: no máximo TOP_ROTULADO_RANKING
+    barras com nome mais FAIXAS_CAUDA_RANKING faixas.
+    """
+    topo = df.head(TOP_ROTULADO_RANKING)
+    cauda = distribuicao_log(df[coluna].iloc[TOP_ROTULADO_RANKING:])
+    fig = make_subplots(
+        rows=2, cols=1, row_heights=[0.7, 0.3], vertical_spacing=0.12,
+        subplot_titles=[
+            f"Top {len(topo)}",
+            f"Demais {len(df) - len(topo):,} usuários por faixa de {coluna} (escala log)",
+        ]
+    )
+    fig.add_trace(go.Bar(
+        x=topo[coluna], y=topo['discord_username'], orientation='h',
+        marker=dict(color=topo[coluna], colorscale=escala)
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(x=cauda['faixa'], y=cauda['usuarios'], marker_color='#764ba2'), row=2, col=1)
+    fig.update_yaxes(categoryorder='total ascending', row=1, col=1)
+    fig.update_xaxes(tickangle=45, row=2, col=1)
+    fig.update_layout(title=titulo, height=1100, showlegend=False)
+    return fig
+
+def exibir_tabela_ranking(df, chave, **kwargs):
+    """st.dataframe do ranking, uma página de LIMITE_BARRAS_RANKING linhas quando passa disso"""
+    if len(df) > LIMITE_BARRAS_RANKING:
+        total_paginas = (len(df) - 1) // LIMITE_BARRAS_RANKING + 1
+        pagina = st.number_input(
+            f"📄 Página da tabela (de {total_paginas}):",
+            min_value=1, max_value=total_paginas, value=1, key=chave
+        )
+        inicio = (pagina - 1) * LIMITE_BARRAS_RANKING
+        st.caption(f"Posições {inicio + 1:,} a {min(inicio + LIMITE_BARRAS_RANKING, len(df)):,} de {len(df):,}")
+        df = df.iloc[inicio:inicio + LIMITE_BARRAS_RANKING]
+    st.dataframe(df, **kwargs)
+
+# ========== FRAGMENTOS ==========
+# Funções com @st.fragment (Streamlit >= 1.37) reexecutam sozinhas quando um widget delas
+# muda, com os argumentos da última execução completa do script.
+def mudar_pagina(chave, passo):
+    """Callback dos botões de navegação: anda `passo` páginas no number_input da chave"""
+    st.session_state[chave] = st.session_state.get(chave, 1) + passo
+
+# ========== ABAS SOB DEMANDA ==========
+def selecionar_aba(rotulos, chave):
+    """Abas que só executam a escolhida (st.tabs roda o corpo de todas a cada rerun)
+    
+    A escolha fica em st.session_state[chave], então sobrevive à troca de página.
+    """
+    # O Streamlit descarta o estado do widget nas execuções em que ele não aparece
+    chave_widget = f"{chave}_widget"
+    if chave_widget not in st.session_state and st.session_state.get(chave) in rotulos:
+        st.session_state[chave_widget] = st.session_state[chave]
+    aba = st.radio(chave, rotulos, horizontal=True, label_visibility="collapsed", key=chave_widget)
+    st.session_state[chave] = aba
+    return aba
+
+# ========== CARTÕES EM LOTE ==========
+# Listas de cartões viram um único st.markdown: uma mensagem para o navegador por lista,
+# em vez de um markdown (mais link e divisor) por linha. Textos vêm escapados porque um
+# título com HTML quebrado estragaria a lista inteira, não só o próprio cartão.
+def renderizar_cartoes(cartoes):
+    """Envia uma lista de cartões HTML (um por linha, sem indentação) numa mensagem só"""
+    if len(cartoes):
+        st.markdown("\n".join(cartoes), unsafe_allow_html=True)
+
+def textos_coluna(df, coluna, padrao='N/A'):
+    """Valores da coluna como texto escapado para HTML (o padrão quando a coluna não existe)"""
+    if coluna not in df.columns:
+        return [padrao] * len(df)
+    return [html.escape(str(valor)) for valor in df[coluna].tolist()]
+
+def numeros_coluna(df, coluna):
+    """formatar_numeros da coluna ("0" quando a coluna não existe, como video.get(coluna, 0))"""
+    if coluna not in df.columns:
+        return ["0"] * len(df)
+    return formatar_numeros(df[coluna])
+
+def urls_validas(df):
+    """URL de cada linha, ou None quando vazia/ausente"""
+    if 'url' not in df.columns:
+        return [None] * len(df)
+    validas = (df['url'].notna() & (df['url'] != '')).tolist()
+    return [url if ok else None for url, ok in zip(df['url'].tolist(), validas)]
+
+def botao_link(texto, cores, grande=False):
+    """Função url -> bloco HTML do botão de link com o gradiente dado"""
+    caixa = "padding: 1.5rem; border-radius: 10px; margin: 1rem 0;" if grande else "padding: 1rem; border-radius: 8px; margin: 0.5rem 0;"
+    fonte = " font-size: 1.1em;" if grande else ""
+    return lambda url: (
+        f'<div style="background: linear-gradient(135deg, {cores[0]}, {cores[1]}); {caixa} text-align: center;">'
+        f'<a href="{html.escape(url)}" target="_blank" style="color: white; text-decoration: none; font-weight: bold;{fonte}">{texto}</a></div>'
+    )
+
+def link_simples(texto):
+    """Função url -> parágrafo com link em negrito"""
+    return lambda url: f'<p>🔗 <strong><a href="{html.escape(url)}" target="_blank">{texto}</a></strong></p>'
+
+def cartoes_videos(df, titulos, campos, link=None):
+    """Cartões video-card numerados, com um divisor depois de cada um
+    
+    campos: pares (rótulo, valores já formatados) na ordem dos parágrafos;
+    link: função url -> HTML, só para as linhas com URL.
+    """
+    paragrafos = zip(*[[f"<p><strong>{rotulo}:</strong> {valor}</p>" for valor in valores] for rotulo, valores in campos])
+    cartoes = []
+    for i, (titulo, linhas, url) in enumerate(zip(titulos, paragrafos, urls_validas(df)), 1):
+        extra = link(url) if link and url else ""
+        cartoes.append(f'<div class="video-card"><h4>#{i} - {titulo}</h4>{"".join(linhas)}</div>{extra}<hr>')
+    return cartoes
+
+def titulos_curtos(df, tamanho=80):
+    """Títulos cortados como nos cartões dos tops ('Sem título' sem a coluna)"""
+    if 'title' not in df.columns:
+        return ["Sem título..."] * len(df)
+    return [html.escape(str(titulo or '')[:tamanho]) + "..." for titulo in df['title'].tolist()]
+
+@st.cache_resource
+def obter_pool_conexoes():
+    """Pool de conexões só-leitura compartilhado entre sessões"""
+    return PoolConexoesLeitura(DB_PATH)
 
 def conectar_banco():
-    """Conecta com o banco de dados"""
+    """Empresta uma conexão só-leitura do pool (conn.close() devolve ao pool)"""
     if not os.path.exists(DB_PATH):
         st.error(f"❌ Banco de dados não encontrado: {DB_PATH}")
         return None
-    return sqlite3.connect(DB_PATH)
+    return obter_pool_conexoes().emprestar()
+
+@st.cache_resource
+def obter_monitor_versao():
+    """Monitor da versão do banco compartilhado entre sessões"""
+    return MonitorVersaoDados(DB_PATH)
+
+@st.cache_data(max_entries=4)
+def calcular_relatorio_memoria(nome, versao_dados, _df):
+    """Uso de memória por coluna de um frame carregado, medido uma vez por versão dos dados"""
+    return relatorio_memoria(_df)
+
+@st.cache_resource
+def obter_carregador_videos():
+    """Carregador incremental de vídeos compartilhado entre sessões (parte do snapshot, se houver)"""
+    return CarregadorVideosIncremental(caminho_snapshot(DB_PATH, 'videos'), LIMITE_MEMORIA_VIDEOS_MB)
+
+@st.cache_resource
+def obter_estatisticas_usuarios():
+    """Médias, medianas e quantis dos usuários ativos do frame atual, compartilhados entre sessões"""
+    return CacheEstatisticasPopulacao()
+
+@st.cache_resource(max_entries=2)
+def obter_resumo_dados(versao_dados, _df_usuarios, _df_videos):
+    """Totais exibidos na sidebar, calculados uma vez por versão dos dados"""
+    resumo = {}
+    
+    if not _df_usuarios.empty:
+        total_usuarios = len(_df_usuarios)
+        usuarios_ativos = int((_df_usuarios['total_views'] > 0).sum())
+        resumo['usuarios'] = {
+            'total': total_usuarios,
+            'ativos': usuarios_ativos,
+            'inativos': total_usuarios - usuarios_ativos,
+            'taxa_ativacao': (usuarios_ativos / total_usuarios) * 100 if usuarios_ativos > 0 else None
+        }
+    
+    if not _df_videos.empty:
+        total_videos = len(_df_videos)
+        videos = {'total': total_videos, 'com_link': None, 'porcentagem_links': None, 'views': None}
+        if 'tem_link' in _df_videos.columns:
+            videos['com_link'] = int((_df_videos['tem_link'] == True).sum())
+            videos['porcentagem_links'] = (videos['com_link'] / total_videos) * 100
+        if 'views' in _df_videos.columns:
+            videos['views'] = _df_videos['views'].sum()
+        resumo['videos'] = videos
+    
+    # Tamanho do banco na versão em uso (a versão muda junto com o arquivo)
+    resumo['tamanho_db_mb'] = os.path.getsize(DB_PATH) / (1024 * 1024) if os.path.exists(DB_PATH) else None
+    return resumo
+
+@st.cache_resource
+def obter_cache_textos():
+    """Cache LRU de títulos/URLs compartilhado entre sessões"""
+    return CacheTextosVideos()
+
+@st.cache_resource
+def obter_cache_filtros():
+    """Cache LRU dos filtros da página de vídeos compartilhado entre sessões"""
+    return CacheFiltrosVideos()
+
+@st.cache_resource
+def obter_ordenacoes_usuarios():
+    """Permutações ordenadas do frame de usuários (rankings) compartilhadas entre sessões"""
+    return CacheOrdenacoes()
 
-@st.cache_data(ttl=300)
-def carregar_dados_usuarios_completo():
-    """Carrega TODOS os usuários (incluindo com zeros)"""
+def anexar_textos_videos(df):
+    """Completa título e URL só das linhas que vão ser exibidas (não ficam no frame principal)"""
+    adiadas = [c for c in obter_carregador_videos().colunas_adiadas if c not in df.columns]
+    if df.empty or not adiadas:
+        return df
+    
     conn = conectar_banco()
     if not conn:
-        return pd.DataFrame()
+        return df
+    try:
+        textos = obter_cache_textos().obter(conn, df['id'], adiadas, obter_monitor_versao().versao())
+    finally:
+        conn.close()
     
+    df = df.copy()
+    for coluna in adiadas:
+        df[coluna] = textos[coluna].to_numpy()
+    return df
+
+def construir_dados(pool, carregador, progresso=None):
+    """Lê usuários e vídeos do banco; roda na thread de atualização, então nada de st.*"""
+    conn = pool.emprestar()
     try:
-        query = """
-        SELECT 
-            user_id,
-            discord_username,
-            COALESCE(total_videos, 0) as total_videos,
-            COALESCE(total_views, 0) as total_views,
-            COALESCE(total_likes, 0) as total_likes,
-            COALESCE(total_comments, 0) as total_comments,
-            COALESCE(total_shares, 0) as total_shares,
-            COALESCE(tiktok_views, 0) as tiktok_views,
-            COALESCE(tiktok_videos, 0) as tiktok_videos,
-            COALESCE(youtube_views, 0) as youtube_views,
-            COALESCE(youtube_videos, 0) as youtube_videos,
-            COALESCE(instagram_views, 0) as instagram_views,
-            COALESCE(instagram_videos, 0) as instagram_videos,
-            updated_at
-        FROM cached_stats 
-        WHERE discord_username IS NOT NULL 
-        AND discord_username != ''
-        ORDER BY total_views DESC
-        """
-        
-        df = pd.read_sql_query(query, conn)
+        dados = carregar_frames(conn, DB_PATH, carregador, progresso)
+    finally:
         conn.close()
-        
-        if df.empty:
-            return df
-        
-        # Converter todas as colunas numéricas de forma segura
-        numeric_columns = ['total_videos', 'total_views', 'total_likes', 'total_comments', 'total_shares',
-                          'tiktok_views', 'tiktok_videos', 'youtube_views', 'youtube_videos', 
-                          'instagram_views', 'instagram_videos']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = converter_para_numerico_seguro(df[col], 0)
-        
-        # Calcular métricas avançadas
-        df['total_interactions'] = df['total_likes'] + df['total_comments'] + df['total_shares']
-        
-        # Garantir que não há divisão por zero e converter para float
-        df['total_views'] = pd.to_numeric(df['total_views'], errors='coerce').fillna(0)
-        df['total_videos'] = pd.to_numeric(df['total_videos'], errors='coerce').fillna(0)
-        df['total_interactions'] = pd.to_numeric(df['total_interactions'], errors='coerce').fillna(0)
-        
-        # Calcular taxa de engajamento por plataforma (usando fórmulas reais)
-        df['plataforma_principal'] = df.apply(
-            lambda x: determinar_plataforma_principal(
-                x['tiktok_views'], x['youtube_views'], x['instagram_views']
-            ), axis=1
-        )
-        
-        # Taxa de engajamento usando fórmulas reais das redes sociais
-        df['taxa_engajamento'] = df.apply(
-            lambda x: calcular_engajamento_por_plataforma(
-                x['total_views'], x['total_likes'], x['total_comments'], 
-                x['total_shares'], x['plataforma_principal'] or 'geral'
-            ), axis=1
-        )
-        
-        # Score de performance usando métricas reais
-        df['score_performance'] = df.apply(
-            lambda x: calcular_score_performance_real(
-                x['total_views'], x['total_likes'], x['total_comments'], 
-                x['total_shares'], x['total_videos'], x['plataforma_principal']
-            ), axis=1
-        ).round(1)
-        
-        # Métricas complementares
-        df['media_views_por_video'] = (df['total_views'] / df['total_videos'].replace(0, 1)).round(0)
-        df['media_likes_por_video'] = (df['total_likes'] / df['total_videos'].replace(0, 1)).round(0)
-        df['media_comments_por_video'] = (df['total_comments'] / df['total_videos'].replace(0, 1)).round(2)
-        
-        # Categoria de performance
-        df[['categoria_performance', 'cor_categoria']] = df['score_performance'].apply(
-            lambda x: pd.Series(obter_categoria_performance(x))
-        )
-        
-        # Rankings (só para usuários com dados)
-        df_ativo = df[df['total_views'] > 0]
-        if not df_ativo.empty:
-            df.loc[df['total_views'] > 0, 'rank_views'] = df_ativo['total_views'].rank(ascending=False, method='min').astype(int)
-            df.loc[df['total_likes'] > 0, 'rank_likes'] = df_ativo['total_likes'].rank(ascending=False, method='min').astype(int)
-            df.loc[df['taxa_engajamento'] > 0, 'rank_engajamento'] = df_ativo['taxa_engajamento'].rank(ascending=False, method='min').astype(int)
-            df.loc[df['score_performance'] > 0, 'rank_performance'] = df_ativo['score_performance'].rank(ascending=False, method='min').astype(int)
-        
-        # Preencher NaN dos rankings com 0
-        df[['rank_views', 'rank_likes', 'rank_engajamento', 'rank_performance']] = df[['rank_views', 'rank_likes', 'rank_engajamento', 'rank_performance']].fillna(0).astype(int)
-        
-        # Análise de consistência
-        df['consistencia'] = np.where(
-            df['total_videos'] > 5,
-            np.where(df['taxa_engajamento'] > df['taxa_engajamento'].median(), "Alta", "Média"),
-            np.where(df['total_videos'] > 0, "Baixa", "Sem dados")
-        )
-        
-        # Status do usuário
-        df['status_usuario'] = np.where(
-            df['total_views'] == 0,
-            "🔴 Inativo",
-            np.where(
-                df['total_views'] >= df['total_views'].quantile(0.75),
-                "🟢 Muito Ativo",
-                np.where(
-                    df['total_views'] >= df['total_views'].median(),
-                    "🟡 Ativo",
-                    "🟠 Pouco Ativo"
-                )
-            )
-        )
-        
-        # Potencial de crescimento
-        df['potencial_crescimento'] = np.where(
-            df['total_views'] == 0,
-            "Sem dados",
-            np.where(
-                (df['taxa_engajamento'] > df['taxa_engajamento'].quantile(0.75)) & 
-                (df['total_videos'] < df['total_videos'].quantile(0.5)),
-                "Alto", 
-                np.where(df['taxa_engajamento'] > df['taxa_engajamento'].median(), "Médio", "Baixo")
-            )
-        )
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {str(e)}")
-        if conn:
-            conn.close()
-        return pd.DataFrame()
-
-@st.cache_data(ttl=300)
-def carregar_videos_completo():
-    """Carrega TODOS os vídeos do banco (sem limite)"""
+    # Busca e chaves de ordenação (`python script.py busca` / `ordenacao`) acompanham cada
+    # versão aqui, antes da cópia nova ser publicada: as páginas só leem esses arquivos
+    sincronizar_arquivos_auxiliares(DB_PATH)
+    return dados
+
+@st.cache_resource
+def obter_atualizador_dados():
+    """Última cópia boa dos frames, compartilhada entre sessões e refeita em segundo plano
+    
+    Snapshot (`python script.py snapshot`) e métricas gravadas (`python script.py metricas`)
+    da versão atual são usados quando existem; ver carregar_usuarios.
+    """
+    pool = obter_pool_conexoes()
+    carregador = obter_carregador_videos()
+    return AtualizadorEmSegundoPlano(
+        obter_monitor_versao().versao, lambda progresso: construir_dados(pool, carregador, progresso)
+    )
+
+@st.cache_data(max_entries=32)
+def buscar_titulos_indexados(termo, versao_dados=None):
+    """(ids, ranqueado) pelo índice de títulos; None sem índice (`python script.py busca`)
+    
+    Só leitura: o índice é sincronizado na atualização em segundo plano (construir_dados).
+    """
+    if not os.path.exists(caminho_busca(DB_PATH)):
+        return None
+    conn = abrir_conexao_leitura(caminho_busca(DB_PATH))
+    try:
+        return buscar_titulos_fts(conn, termo)
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+@st.cache_data(max_entries=2)
+def chaves_ordenacao_disponiveis(versao_dados=None):
+    """True quando engajamento e video score podem ser paginados pelas chaves persistidas"""
     conn = conectar_banco()
     if not conn:
-        return pd.DataFrame()
-    
+        return False
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='valid_videos'")
-        if not cursor.fetchone():
-            conn.close()
-            return pd.DataFrame()
-        
-        # Primeiro, contar quantos vídeos existem
-        cursor.execute("SELECT COUNT(*) FROM valid_videos")
-        total_videos = cursor.fetchone()[0]
-        
-        # Query sem LIMIT para carregar todos
-        query = """
-        SELECT 
-            v.*,
-            cs.discord_username
-        FROM valid_videos v
-        LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
-        WHERE cs.discord_username IS NOT NULL
-        ORDER BY v.id DESC
-        """
-        
-        df = pd.read_sql_query(query, conn)
+        return chaves_ordenacao_em_dia(conn, DB_PATH)
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+@st.cache_data(max_entries=2)
+def carregar_opcoes_filtros_videos(versao_dados=None):
+    """Plataformas e criadores para os filtros do modo consulta, uma vez por versão dos dados"""
+    conn = conectar_banco()
+    if not conn:
+        return [], []
+    try:
+        return opcoes_filtros_videos(conn)
+    finally:
         conn.close()
-        
-        if not df.empty:
-            # Converter colunas numéricas de forma segura
-            numeric_cols = ['views', 'likes', 'comments', 'shares']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = converter_para_numerico_seguro(df[col], 0)
-            
-            # Métricas avançadas por vídeo usando fórmulas reais
-            if 'views' in df.columns and 'likes' in df.columns:
-                df['interactions'] = df['likes'] + df['comments'] + df['shares']
-                
-                # Taxa de engajamento usando fórmula da plataforma específica
-                df['engagement_rate'] = df.apply(
-                    lambda x: calcular_engajamento_por_plataforma(
-                        x['views'], x['likes'], x['comments'], 
-                        x['shares'], x.get('platform', 'geral')
-                    ), axis=1
-                )
-                
-                # Score do vídeo simplificado
-                df['video_score'] = (
-                    df['engagement_rate'] * 0.6 +  # 60% engajamento
-                    np.log1p(df['views']) * 0.4     # 40% alcance
-                ).round(2)
-                
-                # Categoria do vídeo (convertida para string)
-                try:
-                    df['categoria_video'] = pd.cut(
-                        df['engagement_rate'],
-                        bins=[0, 1, 3, 6, 10, 100],
-                        labels=['🔴 Baixo', '🟡 Regular', '🟢 Bom', '🔵 Muito Bom', '🟣 Excepcional'],
-                        include_lowest=True
-                    ).astype(str)
-                except:
-                    # Fallback se pd.cut falhar
-                    df['categoria_video'] = '📊 Sem categoria'
-                
-                # Status do link
-                df['tem_link'] = df['url'].notna() & (df['url'] != '') & (df['url'].str.len() > 10)
-            
-            # Adicionar informação sobre o total
-            st.session_state['total_videos_banco'] = total_videos
-            st.session_state['videos_carregados'] = len(df)
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"Erro ao carregar vídeos: {str(e)}")
-        if conn:
-            conn.close()
-        return pd.DataFrame()
 
-def gerar_insights_usuario(usuario_data, df_usuarios):
-    """Gera insights personalizados para um usuário"""
+def gerar_insights_usuario(usuario_data, estatisticas):
+    """Gera insights personalizados para um usuário (estatisticas: EstatisticasPopulacao)"""
     insights = []
     recomendacoes = []
     
@@ -495,23 +599,21 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
         return insights, recomendacoes
     
     # Análise de posição (só para usuários ativos)
-    usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
-    total_usuarios_ativos = len(usuarios_ativos)
     rank_views = usuario_data['rank_views']
     rank_performance = usuario_data['rank_performance']
     
     # Insights de posição
-    if rank_views <= total_usuarios_ativos * 0.1:
+    if estatisticas.no_topo(rank_views, 0.1):
         insights.append("🏆 Você está no TOP 10% em visualizações!")
-    elif rank_views <= total_usuarios_ativos * 0.25:
+    elif estatisticas.no_topo(rank_views, 0.25):
         insights.append("🥇 Você está no TOP 25% em visualizações!")
     
-    if rank_performance <= total_usuarios_ativos * 0.1:
+    if estatisticas.no_topo(rank_performance, 0.1):
         insights.append("⭐ Performance excepcional - TOP 10% geral!")
     
     # Análise de engajamento
     taxa = usuario_data['taxa_engajamento']
-    media_taxa = usuarios_ativos['taxa_engajamento'].mean()
+    media_taxa = estatisticas.medias['taxa_engajamento']
     
     if taxa > media_taxa * 2:
         insights.append("🚀 Sua taxa de engajamento é DUPLA da média!")
@@ -523,6 +625,13 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
         insights.append("📊 Há oportunidade para melhorar o engajamento")
         recomendacoes.append("💡 Use mais CTAs e interaja ativamente com comentários")
     
+    # A média puxada pelos virais esconde onde a taxa cai na distribuição; os quantis não
+    quantil_taxa = estatisticas.quantil_alcancado('taxa_engajamento', taxa)
+    if quantil_taxa is not None and quantil_taxa >= 0.75:
+        insights.append(f"📐 Engajamento maior que o de {quantil_taxa:.0%} dos usuários ativos")
+    elif taxa > media_taxa and (quantil_taxa is None or quantil_taxa < 0.5):
+        insights.append("⚖️ Acima da média, mas abaixo da mediana: a média é puxada por poucos criadores")
+    
     # Análise de volume
     videos = usuario_data['total_videos']
     if videos > 100:
@@ -550,7 +659,7 @@ def gerar_insights_usuario(usuario_data, df_usuarios):
     return insights, recomendacoes
 
 # ========== PÁGINAS AVANÇADAS ==========
-def pagina_dashboard_executivo(df_usuarios):
+def pagina_dashboard_executivo(df_usuarios, versao_dados=None):
     """Dashboard executivo com visão geral completa"""
     st.markdown('<div class="main-header"><h1>📊 Dashboard Executivo Completo</h1><p>Visão Geral de TODOS os Usuários</p></div>', unsafe_allow_html=True)
     
@@ -631,31 +740,37 @@ def pagina_dashboard_executivo(df_usuarios):
     
     with col1:
         # Status dos usuários
-        status_counts = df_usuarios['status_usuario'].value_counts()
+        def construir_status():
+            status_counts = df_usuarios['status_usuario'].value_counts().loc[lambda s: s > 0]
+            
+            fig_status = px.pie(
+                values=status_counts.values,
+                names=status_counts.index,
+                title="📊 Distribuição por Status de Atividade",
+                color_discrete_sequence=['#28a745', '#ffc107', '#fd7e14', '#dc3545']
+            )
+            fig_status.update_traces(textposition='inside', textinfo='percent+label')
+            return fig_status
         
-        fig_status = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            title="📊 Distribuição por Status de Atividade",
-            color_discrete_sequence=['#28a745', '#ffc107', '#fd7e14', '#dc3545']
-        )
-        fig_status.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_status, use_container_width=True)
+        exibir_figura(('executivo', 'status_usuario'), construir_status, versao_dados)
     
     with col2:
         # Distribuição por categoria (só usuários ativos)
         usuarios_ativos_df = df_usuarios[df_usuarios['total_views'] > 0]
         if not usuarios_ativos_df.empty:
-            dist_categoria = usuarios_ativos_df['categoria_performance'].value_counts()
+            def construir_categorias():
+                dist_categoria = usuarios_ativos_df['categoria_performance'].value_counts().loc[lambda s: s > 0]
+                
+                fig_cat = px.pie(
+                    values=dist_categoria.values,
+                    names=dist_categoria.index,
+                    title="🏆 Distribuição por Performance (Usuários Ativos)",
+                    color_discrete_sequence=['#ffd700', '#c0c0c0', '#cd7f32', '#4caf50', '#ff9800']
+                )
+                fig_cat.update_traces(textposition='inside', textinfo='percent+label')
+                return fig_cat
             
-            fig_cat = px.pie(
-                values=dist_categoria.values,
-                names=dist_categoria.index,
-                title="🏆 Distribuição por Performance (Usuários Ativos)",
-                color_discrete_sequence=['#ffd700', '#c0c0c0', '#cd7f32', '#4caf50', '#ff9800']
-            )
-            fig_cat.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_cat, use_container_width=True)
+            exibir_figura(('executivo', 'categoria_performance'), construir_categorias, versao_dados)
         else:
             st.info("📊 Nenhum usuário ativo para análise de performance")
     
@@ -669,16 +784,19 @@ def pagina_dashboard_executivo(df_usuarios):
         if not usuarios_ativos_df.empty:
             top_performers = usuarios_ativos_df.nlargest(10, 'score_performance')
             
-            for i, (_, user) in enumerate(top_performers.iterrows(), 1):
-                categoria, cor = user['categoria_performance'], user['cor_categoria']
-                st.markdown(f"""
-                <div style="background: white; padding: 0.8rem; border-radius: 8px; 
-                            border-left: 4px solid {cor}; margin: 0.3rem 0;">
-                    <strong>#{i} {user['discord_username']}</strong><br>
-                    <small>{categoria} - Score: {user['score_performance']:.1f}</small><br>
-                    <small>👁️ {formatar_numero(user['total_views'])} views | 🎥 {user['total_videos']} vídeos</small>
-                </div>
-                """, unsafe_allow_html=True)
+            renderizar_cartoes([
+                f'<div style="background: white; padding: 0.8rem; border-radius: 8px; border-left: 4px solid {cor}; margin: 0.3rem 0;">'
+                f'<strong>#{i} {nome}</strong><br><small>{categoria} - Score: {score:.1f}</small><br>'
+                f'<small>👁️ {views} views | 🎥 {videos} vídeos</small></div>'
+                for i, (nome, categoria, cor, score, views, videos) in enumerate(zip(
+                    textos_coluna(top_performers, 'discord_username'),
+                    top_performers['categoria_performance'].tolist(),
+                    top_performers['cor_categoria'].tolist(),
+                    top_performers['score_performance'].tolist(),
+                    formatar_numeros(top_performers['total_views']),
+                    top_performers['total_videos'].tolist(),
+                ), 1)
+            ])
         else:
             st.info("📊 Nenhum usuário ativo encontrado")
     
@@ -690,20 +808,17 @@ def pagina_dashboard_executivo(df_usuarios):
             st.warning(f"⚠️ {len(usuarios_inativos_df)} usuários sem visualizações")
             
             # Mostrar alguns usuários inativos
-            for i, (_, user) in enumerate(usuarios_inativos_df.head(10).iterrows(), 1):
-                st.markdown(f"""
-                <div class="zero-user-card">
-                    <strong>{user['discord_username']}</strong><br>
-                    <small>😴 Sem atividade registrada</small>
-                </div>
-                """, unsafe_allow_html=True)
+            renderizar_cartoes([
+                f'<div class="zero-user-card"><strong>{nome}</strong><br><small>😴 Sem atividade registrada</small></div>'
+                for nome in textos_coluna(usuarios_inativos_df.head(10), 'discord_username')
+            ])
             
             if len(usuarios_inativos_df) > 10:
                 st.info(f"➕ E mais {len(usuarios_inativos_df) - 10} usuários inativos...")
         else:
             st.success("🎉 Todos os usuários têm atividade!")
 
-def pagina_rankings_completos(df_usuarios):
+def pagina_rankings_completos(df_usuarios, versao_dados=None):
     """Rankings completos com controle de visualização"""
     st.markdown('<div class="main-header"><h1>🏆 Rankings Completos</h1><p>Controle Total sobre Visualizações</p></div>', unsafe_allow_html=True)
     
@@ -738,75 +853,90 @@ def pagina_rankings_completos(df_usuarios):
     with col4:
         formato_grafico = st.selectbox("📊 Tipo de gráfico:", ["Barras Horizontais", "Barras Verticais", "Apenas Tabela"])
     
-    # Filtrar dados baseado na seleção
+    # Filtrar dados baseado na seleção: os rankings são recortes das permutações já
+    # ordenadas por métrica, cruzados com a máscara dos usuários considerados
+    permutacoes = obter_ordenacoes_usuarios().obter(df_usuarios, versao_dados)
+    views_usuarios = df_usuarios['total_views'].to_numpy()
+    ativos = views_usuarios > 0
     if incluir_inativos:
-        df_trabalho = df_usuarios.copy()
-        st.info(f"📊 Mostrando dados de {len(df_trabalho)} usuários (incluindo {len(df_usuarios[df_usuarios['total_views'] == 0])} inativos)")
+        mascara_trabalho = None
+        total_trabalho = len(df_usuarios)
+        st.info(f"📊 Mostrando dados de {total_trabalho} usuários (incluindo {int((views_usuarios == 0).sum())} inativos)")
     else:
-        df_trabalho = df_usuarios[df_usuarios['total_views'] > 0].copy()
-        inativos_ocultos = len(df_usuarios) - len(df_trabalho)
+        mascara_trabalho = ativos
+        total_trabalho = int(ativos.sum())
+        inativos_ocultos = len(df_usuarios) - total_trabalho
         if inativos_ocultos > 0:
             st.info(f"📊 Mostrando apenas usuários ativos. {inativos_ocultos} usuários inativos ocultos.")
     
-    if df_trabalho.empty:
+    def restringir(mascara):
+        return mascara if mascara_trabalho is None else mascara & mascara_trabalho
+    
+    def ranking(coluna, mascara=mascara_trabalho):
+        return df_usuarios.iloc[permutacoes.maiores(coluna, top_n, mascara)]
+    
+    if total_trabalho == 0:
         st.warning("⚠️ Nenhum usuário encontrado com os filtros aplicados")
         return
     
     st.divider()
     
-    # Abas dos rankings
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    # Abas dos rankings: só a escolhida é calculada e desenhada
+    abas = [
         "👁️ Mais Views", "❤️ Mais Curtidas", "📈 Melhor Engajamento", 
         "🏆 Score Performance", "📱 Por Plataforma"
-    ])
+    ]
+    aba = selecionar_aba(abas, "aba_rankings")
     
-    with tab1:
+    if aba == abas[0]:
         st.subheader(f"👁️ Ranking por Visualizações")
-        top_views = df_trabalho.nlargest(top_n, 'total_views')
+        top_views = ranking('total_views')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_views,
-                    x='total_views',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Visualizações",
-                    color='total_views',
-                    color_continuous_scale='Blues',
-                    text='total_views'
-                )
-                fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_views) * 25, 800)), showlegend=False)
-            else:  # Barras Verticais
-                fig = px.bar(
-                    top_views.head(20),  # Limit to 20 for vertical bars
-                    x='discord_username',
-                    y='total_views',
-                    title=f"Top 20 - Visualizações",
-                    color='total_views',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
+            def construir():
+                if formato_grafico == "Barras Horizontais":
+                    if len(top_views) > LIMITE_BARRAS_RANKING:
+                        return figura_ranking_grande(top_views, 'total_views', "Ranking por Visualizações", 'Blues')
+                    fig = px.bar(
+                        top_views,
+                        x='total_views',
+                        y='discord_username',
+                        orientation='h',
+                        title=f"Ranking por Visualizações",
+                        color='total_views',
+                        color_continuous_scale='Blues',
+                        text='total_views'
+                    )
+                    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+                    fig.update_yaxes(categoryorder='total ascending')
+                    fig.update_layout(height=max(400, min(len(top_views) * 25, 800)), showlegend=False)
+                else:  # Barras Verticais
+                    fig = px.bar(
+                        top_views.head(20),  # Limit to 20 for vertical bars
+                        x='discord_username',
+                        y='total_views',
+                        title=f"Top 20 - Visualizações",
+                        color='total_views',
+                        color_continuous_scale='Blues'
+                    )
+                    fig.update_xaxes(tickangle=45)
+                    fig.update_layout(height=600, showlegend=False)
+                return fig
             
-            st.plotly_chart(fig, use_container_width=True)
+            exibir_figura(('rankings', 'total_views', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
         
         # Tabela detalhada
         df_display = top_views[['discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']].copy()
         
         # Adicionar indicadores visuais para usuários inativos
         if incluir_inativos:
-            df_display['indicador'] = df_display.apply(
-                lambda x: "😴 INATIVO" if x['total_views'] == 0 else "🟢 ATIVO", axis=1
-            )
+            df_display['indicador'] = np.where(df_display['total_views'] == 0, "😴 INATIVO", "🟢 ATIVO")
             colunas_ordem = ['indicador', 'discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']
         else:
             colunas_ordem = ['discord_username', 'total_views', 'total_videos', 'media_views_por_video', 'status_usuario']
         
-        st.dataframe(
-            df_display[colunas_ordem],
+        exibir_tabela_ranking(
+            df_display[colunas_ordem], "tabela_ranking_views",
             column_config={
                 "indicador": "🚦 Status",
                 "discord_username": "👤 Usuário",
@@ -832,40 +962,44 @@ def pagina_rankings_completos(df_usuarios):
             views_ativas = top_views[top_views['total_views'] > 0]['total_views']
             st.metric("📊 Média Views", formatar_numero(views_ativas.mean()) if not views_ativas.empty else "0")
     
-    with tab2:
+    if aba == abas[1]:
         st.subheader(f"❤️ Ranking por Curtidas")
-        top_likes = df_trabalho.nlargest(top_n, 'total_likes')
+        top_likes = ranking('total_likes')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_likes,
-                    x='total_likes',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Curtidas",
-                    color='total_likes',
-                    color_continuous_scale='Reds'
-                )
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_likes) * 25, 800)), showlegend=False)
-            else:
-                fig = px.bar(
-                    top_likes.head(20),
-                    x='discord_username',
-                    y='total_likes',
-                    title=f"Top 20 - Curtidas",
-                    color='total_likes',
-                    color_continuous_scale='Reds'
-                )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
+            def construir():
+                if formato_grafico == "Barras Horizontais":
+                    if len(top_likes) > LIMITE_BARRAS_RANKING:
+                        return figura_ranking_grande(top_likes, 'total_likes', "Ranking por Curtidas", 'Reds')
+                    fig = px.bar(
+                        top_likes,
+                        x='total_likes',
+                        y='discord_username',
+                        orientation='h',
+                        title=f"Ranking por Curtidas",
+                        color='total_likes',
+                        color_continuous_scale='Reds'
+                    )
+                    fig.update_yaxes(categoryorder='total ascending')
+                    fig.update_layout(height=max(400, min(len(top_likes) * 25, 800)), showlegend=False)
+                else:
+                    fig = px.bar(
+                        top_likes.head(20),
+                        x='discord_username',
+                        y='total_likes',
+                        title=f"Top 20 - Curtidas",
+                        color='total_likes',
+                        color_continuous_scale='Reds'
+                    )
+                    fig.update_xaxes(tickangle=45)
+                    fig.update_layout(height=600, showlegend=False)
+                return fig
             
-            st.plotly_chart(fig, use_container_width=True)
+            exibir_figura(('rankings', 'total_likes', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
         
         df_display = top_likes[['discord_username', 'total_likes', 'total_views', 'media_likes_por_video', 'taxa_engajamento']].copy()
-        st.dataframe(
-            df_display,
+        exibir_tabela_ranking(
+            df_display, "tabela_ranking_likes",
             column_config={
                 "discord_username": "👤 Usuário",
                 "total_likes": st.column_config.NumberColumn("❤️ Curtidas", format="%d"),
@@ -877,47 +1011,51 @@ def pagina_rankings_completos(df_usuarios):
             use_container_width=True
         )
     
-    with tab3:
+    if aba == abas[2]:
         st.subheader(f"📈 Ranking por Engajamento")
         
         # Para engajamento, filtrar apenas usuários com dados significativos
-        df_engajamento = df_trabalho[df_trabalho['total_views'] >= 100] if not incluir_inativos else df_trabalho[df_trabalho['total_views'] > 0]
+        mascara_engajamento = views_usuarios >= 100 if not incluir_inativos else ativos
         
-        if df_engajamento.empty:
+        if not mascara_engajamento.any():
             st.warning("⚠️ Nenhum usuário com dados suficientes para análise de engajamento")
         else:
-            top_engagement = df_engajamento.nlargest(min(top_n, len(df_engajamento)), 'taxa_engajamento')
+            top_engagement = ranking('taxa_engajamento', mascara_engajamento)
             
             if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                if formato_grafico == "Barras Horizontais":
-                    fig = px.bar(
-                        top_engagement,
-                        x='taxa_engajamento',
-                        y='discord_username',
-                        orientation='h',
-                        title=f"Ranking por Taxa de Engajamento",
-                        color='taxa_engajamento',
-                        color_continuous_scale='Viridis'
-                    )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_engagement) * 25, 800)), showlegend=False)
-                else:
-                    fig = px.bar(
-                        top_engagement.head(20),
-                        x='discord_username',
-                        y='taxa_engajamento',
-                        title=f"Top 20 - Engajamento",
-                        color='taxa_engajamento',
-                        color_continuous_scale='Viridis'
-                    )
-                    fig.update_xaxes(tickangle=45)
-                    fig.update_layout(height=600, showlegend=False)
+                def construir():
+                    if formato_grafico == "Barras Horizontais":
+                        if len(top_engagement) > LIMITE_BARRAS_RANKING:
+                            return figura_ranking_grande(top_engagement, 'taxa_engajamento', "Ranking por Taxa de Engajamento", 'Viridis')
+                        fig = px.bar(
+                            top_engagement,
+                            x='taxa_engajamento',
+                            y='discord_username',
+                            orientation='h',
+                            title=f"Ranking por Taxa de Engajamento",
+                            color='taxa_engajamento',
+                            color_continuous_scale='Viridis'
+                        )
+                        fig.update_yaxes(categoryorder='total ascending')
+                        fig.update_layout(height=max(400, min(len(top_engagement) * 25, 800)), showlegend=False)
+                    else:
+                        fig = px.bar(
+                            top_engagement.head(20),
+                            x='discord_username',
+                            y='taxa_engajamento',
+                            title=f"Top 20 - Engajamento",
+                            color='taxa_engajamento',
+                            color_continuous_scale='Viridis'
+                        )
+                        fig.update_xaxes(tickangle=45)
+                        fig.update_layout(height=600, showlegend=False)
+                    return fig
                 
-                st.plotly_chart(fig, use_container_width=True)
+                exibir_figura(('rankings', 'taxa_engajamento', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
             
             df_display = top_engagement[['discord_username', 'taxa_engajamento', 'total_views', 'total_interactions', 'consistencia']].copy()
-            st.dataframe(
-                df_display,
+            exibir_tabela_ranking(
+                df_display, "tabela_ranking_engajamento",
                 column_config={
                     "discord_username": "👤 Usuário",
                     "taxa_engajamento": st.column_config.NumberColumn("📈 Taxa %", format="%.2f"),
@@ -929,44 +1067,48 @@ def pagina_rankings_completos(df_usuarios):
                 use_container_width=True
             )
     
-    with tab4:
+    if aba == abas[3]:
         st.subheader(f"🏆 Ranking por Score de Performance")
-        top_score = df_trabalho.nlargest(top_n, 'score_performance')
+        top_score = ranking('score_performance')
         
         if mostrar_graficos and formato_grafico != "Apenas Tabela":
-            if formato_grafico == "Barras Horizontais":
-                fig = px.bar(
-                    top_score,
-                    x='score_performance',
-                    y='discord_username',
-                    orientation='h',
-                    title=f"Ranking por Score de Performance",
-                    color='score_performance',
-                    color_continuous_scale='RdYlGn'
-                )
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=max(400, min(len(top_score) * 25, 800)), showlegend=False)
-            else:
-                fig = px.bar(
-                    top_score.head(20),
-                    x='discord_username',
-                    y='score_performance',
-                    title=f"Top 20 - Performance",
-                    color='score_performance',
-                    color_continuous_scale='RdYlGn'
-                )
-                fig.update_xaxes(tickangle=45)
-                fig.update_layout(height=600, showlegend=False)
+            def construir():
+                if formato_grafico == "Barras Horizontais":
+                    if len(top_score) > LIMITE_BARRAS_RANKING:
+                        return figura_ranking_grande(top_score, 'score_performance', "Ranking por Score de Performance", 'RdYlGn')
+                    fig = px.bar(
+                        top_score,
+                        x='score_performance',
+                        y='discord_username',
+                        orientation='h',
+                        title=f"Ranking por Score de Performance",
+                        color='score_performance',
+                        color_continuous_scale='RdYlGn'
+                    )
+                    fig.update_yaxes(categoryorder='total ascending')
+                    fig.update_layout(height=max(400, min(len(top_score) * 25, 800)), showlegend=False)
+                else:
+                    fig = px.bar(
+                        top_score.head(20),
+                        x='discord_username',
+                        y='score_performance',
+                        title=f"Top 20 - Performance",
+                        color='score_performance',
+                        color_continuous_scale='RdYlGn'
+                    )
+                    fig.update_xaxes(tickangle=45)
+                    fig.update_layout(height=600, showlegend=False)
+                return fig
             
-            st.plotly_chart(fig, use_container_width=True)
+            exibir_figura(('rankings', 'score_performance', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
         
         df_display = top_score[['discord_username', 'score_performance', 'categoria_performance', 'plataforma_principal', 'taxa_engajamento']].copy()
         
         # Formatar plataforma principal
         df_display['plataforma_principal'] = df_display['plataforma_principal'].fillna('Geral').str.title()
         
-        st.dataframe(
-            df_display,
+        exibir_tabela_ranking(
+            df_display, "tabela_ranking_score",
             column_config={
                 "discord_username": "👤 Usuário",
                 "score_performance": st.column_config.NumberColumn("🏆 Score", format="%.1f"),
@@ -978,32 +1120,38 @@ def pagina_rankings_completos(df_usuarios):
             use_container_width=True
         )
     
-    with tab5:
+    if aba == abas[4]:
         st.subheader("📱 Rankings por Plataforma")
         
-        plat_tabs = st.tabs(["🎵 TikTok", "📺 YouTube", "📸 Instagram"])
+        abas_plataforma = ["🎵 TikTok", "📺 YouTube", "📸 Instagram"]
+        aba_plataforma = selecionar_aba(abas_plataforma, "aba_rankings_plataforma")
         
-        with plat_tabs[0]:  # TikTok
-            tiktok_users = df_trabalho[df_trabalho['tiktok_views'] > 0]
-            if not tiktok_users.empty:
-                top_tiktok = tiktok_users.nlargest(min(top_n, len(tiktok_users)), 'tiktok_views')
+        if aba_plataforma == abas_plataforma[0]:  # TikTok
+            mascara_tiktok = restringir(df_usuarios['tiktok_views'].to_numpy() > 0)
+            if mascara_tiktok.any():
+                top_tiktok = ranking('tiktok_views', mascara_tiktok)
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_tiktok,
-                        x='tiktok_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking TikTok - Views",
-                        color='tiktok_views',
-                        color_continuous_scale='Blues'
-                    )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_tiktok) * 25, 600)), showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+                    def construir():
+                        if len(top_tiktok) > LIMITE_BARRAS_RANKING:
+                            return figura_ranking_grande(top_tiktok, 'tiktok_views', "Ranking TikTok - Views", 'Blues')
+                        fig = px.bar(
+                            top_tiktok,
+                            x='tiktok_views',
+                            y='discord_username',
+                            orientation='h',
+                            title="Ranking TikTok - Views",
+                            color='tiktok_views',
+                            color_continuous_scale='Blues'
+                        )
+                        fig.update_yaxes(categoryorder='total ascending')
+                        fig.update_layout(height=max(400, min(len(top_tiktok) * 25, 600)), showlegend=False)
+                        return fig
+                    
+                    exibir_figura(('rankings', 'tiktok_views', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
                 
-                st.dataframe(
-                    top_tiktok[['discord_username', 'tiktok_views', 'tiktok_videos']],
+                exibir_tabela_ranking(
+                    top_tiktok[['discord_username', 'tiktok_views', 'tiktok_videos']], "tabela_ranking_tiktok",
                     column_config={
                         "discord_username": "👤 Usuário",
                         "tiktok_views": st.column_config.NumberColumn("🎵 TikTok Views", format="%d"),
@@ -1015,27 +1163,32 @@ def pagina_rankings_completos(df_usuarios):
             else:
                 st.info("📊 Nenhum dado do TikTok encontrado")
         
-        with plat_tabs[1]:  # YouTube
-            youtube_users = df_trabalho[df_trabalho['youtube_views'] > 0]
-            if not youtube_users.empty:
-                top_youtube = youtube_users.nlargest(min(top_n, len(youtube_users)), 'youtube_views')
+        if aba_plataforma == abas_plataforma[1]:  # YouTube
+            mascara_youtube = restringir(df_usuarios['youtube_views'].to_numpy() > 0)
+            if mascara_youtube.any():
+                top_youtube = ranking('youtube_views', mascara_youtube)
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_youtube,
-                        x='youtube_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking YouTube - Views",
-                        color='youtube_views',
-                        color_continuous_scale='Reds'
-                    )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_youtube) * 25, 600)), showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+                    def construir():
+                        if len(top_youtube) > LIMITE_BARRAS_RANKING:
+                            return figura_ranking_grande(top_youtube, 'youtube_views', "Ranking YouTube - Views", 'Reds')
+                        fig = px.bar(
+                            top_youtube,
+                            x='youtube_views',
+                            y='discord_username',
+                            orientation='h',
+                            title="Ranking YouTube - Views",
+                            color='youtube_views',
+                            color_continuous_scale='Reds'
+                        )
+                        fig.update_yaxes(categoryorder='total ascending')
+                        fig.update_layout(height=max(400, min(len(top_youtube) * 25, 600)), showlegend=False)
+                        return fig
+                    
+                    exibir_figura(('rankings', 'youtube_views', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
                 
-                st.dataframe(
-                    top_youtube[['discord_username', 'youtube_views', 'youtube_videos']],
+                exibir_tabela_ranking(
+                    top_youtube[['discord_username', 'youtube_views', 'youtube_videos']], "tabela_ranking_youtube",
                     column_config={
                         "discord_username": "👤 Usuário",
                         "youtube_views": st.column_config.NumberColumn("📺 YouTube Views", format="%d"),
@@ -1047,27 +1200,32 @@ def pagina_rankings_completos(df_usuarios):
             else:
                 st.info("📊 Nenhum dado do YouTube encontrado")
         
-        with plat_tabs[2]:  # Instagram
-            instagram_users = df_trabalho[df_trabalho['instagram_views'] > 0]
-            if not instagram_users.empty:
-                top_instagram = instagram_users.nlargest(min(top_n, len(instagram_users)), 'instagram_views')
+        if aba_plataforma == abas_plataforma[2]:  # Instagram
+            mascara_instagram = restringir(df_usuarios['instagram_views'].to_numpy() > 0)
+            if mascara_instagram.any():
+                top_instagram = ranking('instagram_views', mascara_instagram)
                 
                 if mostrar_graficos and formato_grafico != "Apenas Tabela":
-                    fig = px.bar(
-                        top_instagram,
-                        x='instagram_views',
-                        y='discord_username',
-                        orientation='h',
-                        title="Ranking Instagram - Views",
-                        color='instagram_views',
-                        color_continuous_scale='Purples'
-                    )
-                    fig.update_yaxes(categoryorder='total ascending')
-                    fig.update_layout(height=max(400, min(len(top_instagram) * 25, 600)), showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+                    def construir():
+                        if len(top_instagram) > LIMITE_BARRAS_RANKING:
+                            return figura_ranking_grande(top_instagram, 'instagram_views', "Ranking Instagram - Views", 'Purples')
+                        fig = px.bar(
+                            top_instagram,
+                            x='instagram_views',
+                            y='discord_username',
+                            orientation='h',
+                            title="Ranking Instagram - Views",
+                            color='instagram_views',
+                            color_continuous_scale='Purples'
+                        )
+                        fig.update_yaxes(categoryorder='total ascending')
+                        fig.update_layout(height=max(400, min(len(top_instagram) * 25, 600)), showlegend=False)
+                        return fig
+                    
+                    exibir_figura(('rankings', 'instagram_views', top_n, formato_grafico, incluir_inativos), construir, versao_dados)
                 
-                st.dataframe(
-                    top_instagram[['discord_username', 'instagram_views', 'instagram_videos']],
+                exibir_tabela_ranking(
+                    top_instagram[['discord_username', 'instagram_views', 'instagram_videos']], "tabela_ranking_instagram",
                     column_config={
                         "discord_username": "👤 Usuário",
                         "instagram_views": st.column_config.NumberColumn("📸 Instagram Views", format="%d"),
@@ -1079,7 +1237,7 @@ def pagina_rankings_completos(df_usuarios):
             else:
                 st.info("📊 Nenhum dado do Instagram encontrado")
 
-def pagina_analise_usuario_avancada(df_usuarios):
+def pagina_analise_usuario_avancada(df_usuarios, versao_dados=None):
     """Análise avançada individual do usuário"""
     st.markdown('<div class="main-header"><h1>👤 Análise Individual Completa</h1><p>Insights Detalhados para Qualquer Usuário</p></div>', unsafe_allow_html=True)
     
@@ -1087,9 +1245,12 @@ def pagina_analise_usuario_avancada(df_usuarios):
         st.warning("⚠️ Nenhum dado disponível")
         return
     
+    # Referências da população: calculadas uma vez por versão, não a cada usuário escolhido
+    estatisticas = obter_estatisticas_usuarios().obter(df_usuarios, versao_dados)
+    
     # Seleção do usuário com busca
     st.subheader("🔍 Seleção de Usuário")
-    usuarios = sorted(df_usuarios['discord_username'].tolist())
+    usuarios = estatisticas.nomes_ordenados
     
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -1097,13 +1258,11 @@ def pagina_analise_usuario_avancada(df_usuarios):
     
     with col2:
         # Mostrar estatísticas de seleção
-        total_usuarios = len(usuarios)
-        usuarios_ativos = len(df_usuarios[df_usuarios['total_views'] > 0])
-        st.metric("📊 Total de Usuários", f"{total_usuarios}")
-        st.metric("🟢 Usuários Ativos", f"{usuarios_ativos}")
+        st.metric("📊 Total de Usuários", f"{estatisticas.total_usuarios}")
+        st.metric("🟢 Usuários Ativos", f"{estatisticas.usuarios_ativos}")
     
     if usuario_selecionado:
-        dados_usuario = df_usuarios[df_usuarios['discord_username'] == usuario_selecionado].iloc[0]
+        dados_usuario = df_usuarios.iloc[estatisticas.posicao(usuario_selecionado)]
         
         # Verificar se é usuário ativo ou inativo
         eh_inativo = dados_usuario['total_views'] == 0
@@ -1235,19 +1394,19 @@ def pagina_analise_usuario_avancada(df_usuarios):
             
             # Estatísticas gerais para contexto
             st.subheader("📊 Contexto Geral da Plataforma")
-            usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
+            medias = estatisticas.medias
             
-            if not usuarios_ativos.empty:
+            if estatisticas.usuarios_ativos > 0:
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("📊 Média de Views", formatar_numero(usuarios_ativos['total_views'].mean()))
+                    st.metric("📊 Média de Views", formatar_numero(medias['total_views']))
                 with col2:
-                    st.metric("🎥 Média de Vídeos", f"{usuarios_ativos['total_videos'].mean():.0f}")
+                    st.metric("🎥 Média de Vídeos", f"{medias['total_videos']:.0f}")
                 with col3:
-                    st.metric("📈 Engajamento Médio", f"{usuarios_ativos['taxa_engajamento'].mean():.1f}%")
+                    st.metric("📈 Engajamento Médio", f"{medias['taxa_engajamento']:.1f}%")
                 with col4:
-                    st.metric("🏆 Score Médio", f"{usuarios_ativos['score_performance'].mean():.1f}")
+                    st.metric("🏆 Score Médio", f"{medias['score_performance']:.1f}")
                 
                 st.info("💡 **Dica:** Estes são os números médios dos usuários ativos. Use como referência para suas primeiras metas!")
         
@@ -1259,21 +1418,14 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Comparação com a média
                 st.subheader("📊 Comparação com Usuários Ativos")
                 
-                usuarios_ativos = df_usuarios[df_usuarios['total_views'] > 0]
-                media_views = usuarios_ativos['total_views'].mean()
-                media_likes = usuarios_ativos['total_likes'].mean()
-                media_engagement = usuarios_ativos['taxa_engajamento'].mean()
-                media_videos = usuarios_ativos['total_videos'].mean()
+                colunas_comp = ['total_views', 'total_likes', 'taxa_engajamento', 'total_videos']
                 
                 comparacao_data = {
                     'Métrica': ['Views', 'Curtidas', 'Engajamento %', 'Vídeos'],
-                    'Usuário': [
-                        dados_usuario['total_views'],
-                        dados_usuario['total_likes'],
-                        dados_usuario['taxa_engajamento'],
-                        dados_usuario['total_videos']
-                    ],
-                    'Média Geral': [media_views, media_likes, media_engagement, media_videos]
+                    'Usuário': [dados_usuario[c] for c in colunas_comp],
+                    'Média Geral': [estatisticas.medias[c] for c in colunas_comp],
+                    # Com views de cauda longa, a mediana é o usuário ativo típico
+                    'Mediana': [estatisticas.medianas[c] for c in colunas_comp]
                 }
                 
                 df_comp = pd.DataFrame(comparacao_data)
@@ -1281,10 +1433,10 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 fig_comp = px.bar(
                     df_comp,
                     x='Métrica',
-                    y=['Usuário', 'Média Geral'],
-                    title="Comparação: Usuário vs Média de Usuários Ativos",
+                    y=['Usuário', 'Média Geral', 'Mediana'],
+                    title="Comparação: Usuário vs Média e Mediana de Usuários Ativos",
                     barmode='group',
-                    color_discrete_sequence=['#667eea', '#764ba2']
+                    color_discrete_sequence=['#667eea', '#764ba2', '#4ecdc4']
                 )
                 st.plotly_chart(fig_comp, use_container_width=True)
                 
@@ -1330,11 +1482,12 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Rankings específicos
                 st.subheader("🏆 Posições nos Rankings")
                 
+                total_ativos = estatisticas.usuarios_ativos
                 rankings = [
-                    ("👁️ Views", dados_usuario['rank_views'], len(usuarios_ativos)),
-                    ("❤️ Curtidas", dados_usuario['rank_likes'], len(usuarios_ativos)),
-                    ("📈 Engajamento", dados_usuario['rank_engajamento'], len(usuarios_ativos)),
-                    ("🏆 Performance", dados_usuario['rank_performance'], len(usuarios_ativos))
+                    ("👁️ Views", dados_usuario['rank_views'], total_ativos),
+                    ("❤️ Curtidas", dados_usuario['rank_likes'], total_ativos),
+                    ("📈 Engajamento", dados_usuario['rank_engajamento'], total_ativos),
+                    ("🏆 Performance", dados_usuario['rank_performance'], total_ativos)
                 ]
                 
                 for nome, posicao, total in rankings:
@@ -1365,7 +1518,7 @@ def pagina_analise_usuario_avancada(df_usuarios):
                 # Insights e recomendações
                 st.subheader("💡 Insights Personalizados")
                 
-                insights, recomendacoes = gerar_insights_usuario(dados_usuario, df_usuarios)
+                insights, recomendacoes = gerar_insights_usuario(dados_usuario, estatisticas)
                 
                 if insights:
                     for insight in insights:
@@ -1384,10 +1537,536 @@ def pagina_analise_usuario_avancada(df_usuarios):
                         </div>
                         """, unsafe_allow_html=True)
 
-def pagina_videos_completa(df_videos):
+def renderizar_detalhe_video(video):
+    """Informações, link e métricas de um vídeo em três colunas"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        # Informações principais
+        st.markdown("#### 📋 Informações do Vídeo")
+        if 'discord_username' in video.index:
+            st.write(f"👤 **Criador:** {video['discord_username']}")
+        if 'platform' in video.index:
+            st.write(f"📱 **Plataforma:** {video['platform']}")
+        if 'title' in video.index:
+            st.write(f"📝 **Título:** {video['title']}")
+        
+        # Link do vídeo - DESTAQUE
+        if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
+            st.markdown(f"""
+            <div style="background: linear-gradient(135deg, #28a745, #20c997); 
+                        padding: 1.5rem; border-radius: 12px; margin: 1rem 0; text-align: center;">
+                <a href="{video['url']}" target="_blank" 
+                   style="color: white; text-decoration: none; font-weight: bold; font-size: 1.2em;">
+                    🔗 ASSISTIR VÍDEO ORIGINAL
+                </a>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 12px; 
+                        border: 2px dashed #dee2e6; margin: 1rem 0; text-align: center;">
+                <span style="color: #6c757d; font-weight: bold;">🔗 Link não disponível</span>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    with col2:
+        # Métricas básicas
+        st.markdown("#### 📊 Métricas")
+        if 'views' in video.index:
+            st.metric("👁️ Views", formatar_numero(video['views']))
+        if 'likes' in video.index:
+            st.metric("❤️ Curtidas", formatar_numero(video['likes']))
+        if 'comments' in video.index:
+            st.metric("💬 Comentários", formatar_numero(video['comments']))
+    
+    with col3:
+        # Métricas avançadas
+        st.markdown("#### 🎯 Performance")
+        if 'engagement_rate' in video.index:
+            st.metric("📈 Engajamento", f"{video['engagement_rate']:.2f}%")
+        if 'video_score' in video.index:
+            st.metric("🏆 Score", f"{video['video_score']:.1f}")
+        if 'interactions' in video.index:
+            st.metric("💪 Interações", formatar_numero(video['interactions']))
+
+def renderizar_lista_videos(df_pagina):
+    """Exibe os vídeos de uma página como expanders com informações, link e métricas"""
+    df_pagina = anexar_textos_videos(df_pagina)
+    
+    for idx, (_, video) in enumerate(df_pagina.iterrows()):
+        titulo = video.get('title', f'Vídeo #{video.get("id", idx+1)}')
+        categoria = video.get('categoria_video', '📊 Sem categoria')
+        
+        with st.expander(f"{categoria} {(titulo or '')[:100]}..."):
+            renderizar_detalhe_video(video)
+
+# Tamanhos de janela do modo tabela: rolar dentro da tabela é barato, então janelas maiores
+OPCOES_JANELA_TABELA = [100, 250, 500, 1000]
+
+# Colunas da tabela de vídeos, na ordem de exibição (as ausentes no frame ficam de fora)
+COLUNAS_TABELA_VIDEOS = {
+    'title': st.column_config.TextColumn("📝 Título", width="large"),
+    'url': st.column_config.LinkColumn("🔗 Link"),
+    'discord_username': st.column_config.TextColumn("👤 Criador"),
+    'platform': st.column_config.TextColumn("📱 Plataforma"),
+    'views': st.column_config.NumberColumn("👁️ Views", format="%d"),
+    'likes': st.column_config.NumberColumn("❤️ Curtidas", format="%d"),
+    'comments': st.column_config.NumberColumn("💬 Comentários", format="%d"),
+    'engagement_rate': st.column_config.NumberColumn("📈 Engajamento", format="%.2f%%"),
+    'categoria_video': st.column_config.TextColumn("🏷️ Categoria"),
+}
+
+def renderizar_tabela_videos(df_janela, inicio=0, chave="detalhe_video"):
+    """Tabela rolável só com as linhas da janela, mais o detalhe apenas do vídeo escolhido
+    
+    O st.dataframe já desenha só as linhas visíveis; mandando só a janela (em vez do
+    resultado filtrado inteiro), o navegador também só recebe essas linhas.
+    """
+    df_janela = anexar_textos_videos(df_janela)
+    colunas = [c for c in COLUNAS_TABELA_VIDEOS if c in df_janela.columns]
+    tabela = df_janela[colunas].reset_index(drop=True)
+    tabela.insert(0, 'posicao', np.arange(inicio + 1, inicio + len(tabela) + 1))
+    
+    st.dataframe(
+        tabela,
+        height=420,
+        hide_index=True,
+        use_container_width=True,
+        column_config={'posicao': st.column_config.NumberColumn("#", format="%d"), **COLUNAS_TABELA_VIDEOS}
+    )
+    
+    titulos = df_janela['title'].tolist() if 'title' in df_janela.columns else [f"Vídeo #{n}" for n in tabela['posicao']]
+    escolhido = st.selectbox(
+        "🔎 Detalhes do vídeo:",
+        range(len(tabela)),
+        format_func=lambda i: f"#{inicio + i + 1} - {str(titulos[i] or '')[:100]}",
+        key=chave
+    )
+    renderizar_detalhe_video(df_janela.iloc[escolhido])
+
+@st.fragment
+def exibir_lista_paginada_banco(plataforma, usuario, min_views, apenas_com_link, coluna_ord, em_tabela=False, versao_dados=None):
+    """Lista paginada direto do SQLite: filtros e ordenação no banco, uma página por vez (keyset)"""
+    col1, col2 = st.columns(2)
+    with col1:
+        opcoes_pagina = OPCOES_JANELA_TABELA if em_tabela else [10, 20, 50, 100]
+        videos_por_pagina = st.selectbox("Vídeos por página:", opcoes_pagina, index=2, key="videos_por_pagina_banco")
+    
+    filtros = montar_filtros_videos(
+        plataforma=plataforma if plataforma != 'Todas' else None,
+        usuario=usuario if usuario != 'Todos' else None,
+        min_views=min_views,
+        apenas_com_link=apenas_com_link
+    )
+    
+    # Cursores das páginas visitadas; qualquer mudança de filtro/ordem ou versão dos dados
+    # volta para a página 1 e reconta o total
+    assinatura = (tuple(filtros[0]), tuple(filtros[1]), coluna_ord, videos_por_pagina, versao_dados)
+    estado = st.session_state.get('paginacao_banco')
+    if not estado or estado['assinatura'] != assinatura:
+        conn = conectar_banco()
+        if not conn:
+            return
+        total = contar_videos_filtrados(conn, filtros)
+        conn.close()
+        estado = {'assinatura': assinatura, 'cursores': [None], 'total': total}
+        st.session_state['paginacao_banco'] = estado
+    
+    total = estado['total']
+    pagina_atual = len(estado['cursores'])
+    total_paginas = max(1, (total - 1) // videos_por_pagina + 1)
+    
+    with col2:
+        st.metric("📄 Total de Páginas", total_paginas)
+    
+    if total == 0:
+        st.warning("⚠️ Nenhum vídeo encontrado com os filtros aplicados")
+        return
+    
+    # Engajamento e video score só vêm por índice com as chaves em dia; senão cada página
+    # calcula as duas fórmulas em todas as linhas filtradas e cresce com o banco
+    caminho_chaves = None
+    if coluna_ord in ORDENACOES_PERSISTIDAS:
+        if chaves_ordenacao_disponiveis(versao_dados):
+            caminho_chaves = DB_PATH
+        else:
+            st.caption("🐢 Esta ordem percorre todos os vídeos filtrados a cada página; "
+                       "`python script.py ordenacao` grava as chaves e deixa a página indexada.")
+    
+    conn = conectar_banco()
+    if not conn:
+        return
+    try:
+        df_pagina, proximo_cursor = consultar_pagina_videos(
+            conn, filtros, coluna_ord, videos_por_pagina, cursor=estado['cursores'][-1],
+            caminho_banco_chaves=caminho_chaves
+        )
+    finally:
+        conn.close()
+    
+    inicio = (pagina_atual - 1) * videos_por_pagina
+    st.info(f"📊 Mostrando vídeos {inicio + 1:,} a {inicio + len(df_pagina):,} de {total:,} filtrados (consulta no banco)")
+    
+    if em_tabela:
+        renderizar_tabela_videos(df_pagina, inicio, chave="detalhe_video_banco")
+    else:
+        renderizar_lista_videos(df_pagina)
+    
+    # Navegação sequencial: cada página começa depois da última linha da anterior
+    st.divider()
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        if pagina_atual > 1:
+            st.button("⬅️ Página Anterior", key="pagina_anterior_banco", on_click=estado['cursores'].pop)
+    
+    with col2:
+        st.markdown(f"<div style='text-align: center;'><strong>Página {pagina_atual} de {total_paginas}</strong></div>", unsafe_allow_html=True)
+    
+    with col3:
+        if proximo_cursor is not None and pagina_atual < total_paginas:
+            st.button(
+                "Próxima Página ➡️", key="proxima_pagina_banco",
+                on_click=estado['cursores'].append, args=(proximo_cursor,)
+            )
+
+def pagina_videos_modo_consulta(limite_videos):
+    """Página de vídeos quando o frame passaria do teto de memória: tudo direto do banco"""
+    st.warning(f"⚠️ Vídeos não carregados em memória: {limite_videos}. A lista abaixo consulta o banco a cada página.")
+    
+    versao_dados = obter_monitor_versao().versao()
+    plataformas, criadores = carregar_opcoes_filtros_videos(versao_dados)
+    
+    st.subheader("🎯 Filtros Avançados")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        plataforma = st.selectbox("📱 Plataforma:", ['Todas'] + plataformas)
+    with col2:
+        usuario = st.selectbox("👤 Usuário:", ['Todos'] + criadores)
+    with col3:
+        min_views = st.number_input("👁️ Views mínimas:", min_value=0, value=0, step=100)
+    with col4:
+        apenas_com_link = st.checkbox("🔗 Apenas com links", value=False)
+    with col5:
+        ordenacao_opcoes = {
+            "📅 Mais Recentes": "id",
+            "👁️ Mais Views": "views",
+            "❤️ Mais Curtidas": "likes",
+            "📈 Maior Engajamento": "engagement_rate",
+            "🏆 Melhor Score": "video_score"
+        }
+        ordenacao = st.selectbox("🔄 Ordenar por:", list(ordenacao_opcoes.keys()))
+    
+    st.divider()
+    st.subheader("📋 Lista Completa de Vídeos")
+    exibir_lista_paginada_banco(plataforma, usuario, min_views, apenas_com_link, ordenacao_opcoes[ordenacao], versao_dados=versao_dados)
+
+@st.fragment
+def exibir_lista_paginada_memoria(df_filtrado, em_tabela, assinatura_filtros=None):
+    """Lista paginada do resultado filtrado em memória (fragmento: trocar de página só redesenha a lista)"""
+    # Controles de paginação melhorados
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        opcoes_pagina = OPCOES_JANELA_TABELA if em_tabela else [10, 20, 50, 100]
+        videos_por_pagina = st.selectbox("Vídeos por página:", opcoes_pagina, index=2)
+    
+    with col2:
+        total_paginas = max(1, (len(df_filtrado) - 1) // videos_por_pagina + 1)
+        # Filtros, ordenação, tamanho de página ou versão dos dados mudaram: volta para a página 1
+        assinatura = (assinatura_filtros, em_tabela, videos_por_pagina)
+        if st.session_state.get('assinatura_lista_memoria') != assinatura:
+            st.session_state['assinatura_lista_memoria'] = assinatura
+            st.session_state['pagina_lista_memoria'] = 1
+        pagina_atual = st.number_input("Página:", min_value=1, max_value=total_paginas, key='pagina_lista_memoria')
+    
+    with col3:
+        st.metric("📄 Total de Páginas", total_paginas)
+    
+    # Calcular range da página
+    inicio = (pagina_atual - 1) * videos_por_pagina
+    fim = min(inicio + videos_por_pagina, len(df_filtrado))
+    df_pagina = df_filtrado.iloc[inicio:fim]
+    
+    st.info(f"📊 Mostrando vídeos {inicio + 1:,} a {fim:,} de {len(df_filtrado):,} filtrados")
+    
+    # Exibir vídeos
+    if em_tabela:
+        renderizar_tabela_videos(df_pagina, inicio)
+    else:
+        renderizar_lista_videos(df_pagina)
+    
+    # Navegação da página
+    if total_paginas > 1:
+        st.divider()
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            if pagina_atual > 1:
+                st.button("⬅️ Página Anterior", on_click=mudar_pagina, args=('pagina_lista_memoria', -1))
+        
+        with col2:
+            st.markdown(f"<div style='text-align: center;'><strong>Página {pagina_atual} de {total_paginas}</strong></div>", unsafe_allow_html=True)
+        
+        with col3:
+            if pagina_atual < total_paginas:
+                st.button("Próxima Página ➡️", on_click=mudar_pagina, args=('pagina_lista_memoria', 1))
+
+@st.fragment
+def exibir_top_videos(df_videos, df_filtrado, posicoes, versao_dados=None):
+    """Tops da página de vídeos (fragmento: trocar a quantidade ou a aba não refaz os filtros)"""
+    st.subheader("🏆 Top Vídeos por Categoria")
+    
+    # Controle de quantidade
+    top_quantidade = st.selectbox("📊 Quantidade no top:", [10, 20, 50, 100], index=1)
+    
+    abas_top = ["👁️ Mais Views", "❤️ Mais Curtidas", "📈 Maior Engajamento", "🔗 Melhores com Links"]
+    aba_top = selecionar_aba(abas_top, "aba_top_videos")
+    
+    # Os tops são recortes das permutações já ordenadas do frame inteiro, cruzados com
+    # as linhas que passaram pelos filtros (nenhuma ordenação a cada troca de aba)
+    permutacoes_videos = obter_cache_filtros().permutacoes(df_videos, versao_dados)
+    if len(posicoes) == len(df_videos):
+        mascara_filtrada = np.ones(len(df_videos), dtype=bool)
+    else:
+        mascara_filtrada = np.zeros(len(df_videos), dtype=bool)
+        mascara_filtrada[posicoes] = True
+    
+    # Posição de cada linha na lista filtrada: empates nos tops seguem a ordenação escolhida
+    ordem_lista = np.empty(len(df_videos), dtype=np.int64)
+    ordem_lista[posicoes] = np.arange(len(posicoes))
+    
+    def top_videos(coluna, mascara=mascara_filtrada):
+        return df_videos.iloc[permutacoes_videos.maiores(coluna, top_quantidade, mascara, ordem_lista)]
+    
+    if aba_top == abas_top[0]:  # Mais Views
+        if 'views' in df_filtrado.columns and not df_filtrado.empty:
+            top_views = anexar_textos_videos(top_videos('views'))
+            
+            # Gráfico
+            fig = px.bar(
+                top_views.head(20),  # Limitar gráfico a 20 para visualização
+                x='views',
+                y='title' if 'title' in top_views.columns else 'id',
+                orientation='h',
+                title=f"Top 20 Vídeos - Mais Views",
+                color='views',
+                color_continuous_scale='Blues'
+            )
+            fig.update_yaxes(categoryorder='total ascending')
+            fig.update_layout(height=600)
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Lista detalhada
+            campos = [
+                ("👤 Criador", textos_coluna(top_views, 'discord_username')),
+                ("📱 Plataforma", textos_coluna(top_views, 'platform')),
+                ("👁️ Views", numeros_coluna(top_views, 'views')),
+                ("❤️ Curtidas", numeros_coluna(top_views, 'likes')),
+            ]
+            if 'engagement_rate' in top_views.columns:
+                campos.append(("📈 Engajamento", [f"{taxa:.2f}%" for taxa in top_views['engagement_rate'].tolist()]))
+            renderizar_cartoes(cartoes_videos(
+                top_views, titulos_curtos(top_views), campos,
+                botao_link("🔗 ASSISTIR VÍDEO", ("#007bff", "#0056b3"))
+            ))
+        else:
+            st.info("ℹ️ Dados de views não disponíveis")
+    
+    if aba_top == abas_top[1]:  # Mais Curtidas
+        if 'likes' in df_filtrado.columns and not df_filtrado.empty:
+            top_likes = anexar_textos_videos(top_videos('likes'))
+            
+            renderizar_cartoes(cartoes_videos(top_likes, titulos_curtos(top_likes), [
+                ("👤 Criador", textos_coluna(top_likes, 'discord_username')),
+                ("❤️ Curtidas", numeros_coluna(top_likes, 'likes')),
+                ("👁️ Views", numeros_coluna(top_likes, 'views')),
+            ], link_simples("Ver Vídeo Original")))
+    
+    if aba_top == abas_top[2]:  # Maior Engajamento
+        if 'engagement_rate' in df_filtrado.columns and not df_filtrado.empty:
+            # Filtrar vídeos com pelo menos 100 views
+            mascara_eng = mascara_filtrada & (df_videos['views'].to_numpy() >= 100) if 'views' in df_videos.columns else mascara_filtrada
+            top_engagement = anexar_textos_videos(top_videos('engagement_rate', mascara_eng))
+            
+            renderizar_cartoes(cartoes_videos(top_engagement, titulos_curtos(top_engagement), [
+                ("👤 Criador", textos_coluna(top_engagement, 'discord_username')),
+                ("📈 Engajamento", [f"{taxa:.2f}%" for taxa in top_engagement['engagement_rate'].tolist()]),
+                ("👁️ Views", numeros_coluna(top_engagement, 'views')),
+            ], link_simples("Ver Vídeo Original")))
+    
+    if aba_top == abas_top[3]:  # Melhores com Links
+        com_link = (df_videos['tem_link'] == True) if 'tem_link' in df_videos.columns else (df_videos['url'].notna() & (df_videos['url'] != ''))
+        mascara_links = mascara_filtrada & com_link.to_numpy()
+        total_com_link = int(mascara_links.sum())
+        
+        if total_com_link > 0:
+            st.success(f"✅ Encontrados {total_com_link:,} vídeos com links disponíveis")
+            
+            # Os melhores por views; sem a coluna, na ordem dos filtros
+            if 'views' in df_videos.columns:
+                top_com_links = anexar_textos_videos(top_videos('views', mascara_links))
+            else:
+                top_com_links = anexar_textos_videos(df_filtrado[mascara_links[posicoes]].head(top_quantidade))
+            
+            renderizar_cartoes(cartoes_videos(top_com_links, titulos_curtos(top_com_links), [
+                ("👤 Criador", textos_coluna(top_com_links, 'discord_username')),
+                ("📱 Plataforma", textos_coluna(top_com_links, 'platform')),
+                ("👁️ Views", numeros_coluna(top_com_links, 'views')),
+                ("❤️ Curtidas", numeros_coluna(top_com_links, 'likes')),
+            ], botao_link("🔗 ASSISTIR VÍDEO AGORA", ("#28a745", "#20c997"), grande=True)))
+        else:
+            st.warning("⚠️ Nenhum vídeo com link encontrado nos filtros aplicados")
+
+@st.fragment
+def exibir_busca_avancada(df_videos, df_filtrado, posicoes, filtros_memoria, criadores, versao_dados=None):
+    """Busca por título e por criador (fragmento: digitar não reexecuta a página inteira)"""
+    st.subheader("🔍 Busca Avançada")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        titulos_adiados = 'title' in obter_carregador_videos().colunas_adiadas
+        if 'title' in df_filtrado.columns or titulos_adiados:
+            termo_busca = st.text_input(
+                "🔎 Buscar no título:", 
+                placeholder="Ex: tutorial, review, gameplay, como fazer...",
+                help="Digite palavras-chave para buscar nos títulos dos vídeos"
+            )
+            
+            if termo_busca:
+                resultado_busca = buscar_titulos_indexados(termo_busca, versao_dados)
+                if resultado_busca is not None:
+                    # Índice FTS5: ids já na ordem de exibição, restritos aos vídeos dos filtros
+                    ids_relevantes, ranqueado = resultado_busca
+                    posicoes_busca = obter_cache_filtros().posicoes_dos_ids(df_videos, ids_relevantes, versao_dados)
+                    posicoes_busca = posicoes_busca[posicoes_busca >= 0]
+                    if df_filtrado is not df_videos:
+                        nos_filtros = np.zeros(len(df_videos), dtype=bool)
+                        nos_filtros[posicoes] = True
+                        posicoes_busca = posicoes_busca[nos_filtros[posicoes_busca]]
+                    total_encontrados = len(posicoes_busca)
+                    videos_encontrados = df_videos.iloc[posicoes_busca[:50]]
+                else:
+                    if 'title' in df_filtrado.columns:
+                        videos_encontrados = df_filtrado[
+                            df_filtrado['title'].str.contains(termo_busca, case=False, na=False)
+                        ]
+                    else:
+                        # Títulos ficam no banco; a busca roda lá e volta só os ids
+                        conn = conectar_banco()
+                        ids_encontrados = buscar_ids_por_titulo(conn, termo_busca) if conn else []
+                        if conn:
+                            conn.close()
+                        videos_encontrados = df_filtrado[df_filtrado['id'].isin(ids_encontrados)]
+                    
+                    # Ordenar por views
+                    total_encontrados = len(videos_encontrados)
+                    if 'views' in videos_encontrados.columns:
+                        videos_encontrados = videos_encontrados.sort_values('views', ascending=False)
+                
+                if not videos_encontrados.empty:
+                    st.success(f"✅ Encontrados {total_encontrados:,} vídeos com '{termo_busca}'")
+                    
+                    # Limitar a 50 resultados para performance
+                    videos_mostrar = anexar_textos_videos(videos_encontrados.head(50))
+                    
+                    if total_encontrados > 50:
+                        if resultado_busca is None:
+                            criterio = "melhores"
+                        else:
+                            criterio = "mais relevantes" if ranqueado else "mais recentes"
+                        st.info(f"📊 Mostrando os 50 {criterio} de {total_encontrados} encontrados")
+                    
+                    renderizar_cartoes(cartoes_videos(videos_mostrar, textos_coluna(videos_mostrar, 'title'), [
+                        ("👤 Criador", textos_coluna(videos_mostrar, 'discord_username')),
+                        ("📱 Plataforma", textos_coluna(videos_mostrar, 'platform')),
+                        ("👁️ Views", numeros_coluna(videos_mostrar, 'views')),
+                        ("❤️ Curtidas", numeros_coluna(videos_mostrar, 'likes')),
+                    ], botao_link("🔗 VER VÍDEO", ("#6f42c1", "#5a2d91"))))
+                else:
+                    st.warning(f"⚠️ Nenhum vídeo encontrado com o termo '{termo_busca}'")
+        else:
+            st.info("ℹ️ Campo de título não disponível para busca")
+    
+    with col2:
+        # Busca por criador
+        if 'discord_username' in df_filtrado.columns:
+            st.markdown("#### 👤 Busca por Criador")
+            
+            criadores_unicos = sorted(df_filtrado['discord_username'].dropna().unique())
+            criador_busca = st.selectbox("Selecione um criador:", [''] + criadores_unicos)
+            
+            if criador_busca:
+                # Mesmos filtros, só as linhas do criador (pelo índice, sem varrer o frame)
+                if filtros_memoria['usuario'] in (None, criador_busca):
+                    posicoes_criador = obter_cache_filtros().obter(
+                        df_videos, versao_dados, **{**filtros_memoria, 'usuario': criador_busca}
+                    )
+                else:
+                    posicoes_criador = posicoes[:0]
+                videos_criador = df_videos.iloc[posicoes_criador]
+                
+                if not videos_criador.empty:
+                    st.success(f"✅ {len(videos_criador)} vídeos de {criador_busca}")
+                    
+                    # Filtros não cortaram nenhum vídeo do criador: totais já calculados no índice
+                    if len(videos_criador) == criadores.quantidade(criador_busca):
+                        totais = criadores.totais.loc[criador_busca]
+                    else:
+                        totais = None
+                    
+                    # Estatísticas do criador
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("🎥 Total Vídeos", len(videos_criador))
+                        if 'views' in videos_criador.columns:
+                            views_criador = totais['views'] if totais is not None else videos_criador['views'].sum()
+                            st.metric("👁️ Views Totais", formatar_numero(views_criador))
+                    with col2:
+                        if 'likes' in videos_criador.columns:
+                            likes_criador = totais['likes'] if totais is not None else videos_criador['likes'].sum()
+                            st.metric("❤️ Curtidas Totais", formatar_numero(likes_criador))
+                        if 'engagement_rate' in videos_criador.columns:
+                            engajamento_criador = (
+                                totais['engajamento_medio'] if totais is not None
+                                else videos_criador['engagement_rate'].mean()
+                            )
+                            st.metric("📈 Engajamento Médio", f"{engajamento_criador:.2f}%")
+                    
+                    # Mostrar alguns vídeos do criador
+                    st.markdown("#### 🎬 Últimos Vídeos")
+                    videos_recentes = anexar_textos_videos(videos_criador.head(10))
+                    
+                    for i, (_, video) in enumerate(videos_recentes.iterrows(), 1):
+                        with st.expander(f"🎥 {video.get('title', f'Vídeo #{i}')}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                if 'views' in video.index:
+                                    st.write(f"👁️ **Views:** {formatar_numero(video['views'])}")
+                                if 'likes' in video.index:
+                                    st.write(f"❤️ **Curtidas:** {formatar_numero(video['likes'])}")
+                                if 'platform' in video.index:
+                                    st.write(f"📱 **Plataforma:** {video['platform']}")
+                            
+                            with col2:
+                                if 'engagement_rate' in video.index:
+                                    st.write(f"📈 **Engajamento:** {video['engagement_rate']:.2f}%")
+                                if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
+                                    st.markdown(f"🔗 **[Ver Vídeo]({video['url']})**")
+                                else:
+                                    st.write("🔗 **Link:** Não disponível")
+
+def pagina_videos_completa(df_videos, limite_videos=None, versao_dados=None):
     """Análise completa de TODOS os vídeos"""
     st.markdown('<div class="main-header"><h1>🎬 Análise Completa de Vídeos</h1><p>Todos os Vídeos com Links e Filtros Avançados</p></div>', unsafe_allow_html=True)
     
+    if limite_videos:
+        pagina_videos_modo_consulta(limite_videos)
+        return
+    
     # Mostrar estatísticas do carregamento
     if 'total_videos_banco' in st.session_state and 'videos_carregados' in st.session_state:
         total_banco = st.session_state['total_videos_banco']
@@ -1429,8 +2108,11 @@ def pagina_videos_completa(df_videos):
         plataformas = ['Todas'] + sorted(df_videos['platform'].dropna().unique().tolist()) if 'platform' in df_videos.columns else ['Todas']
         plataforma = st.selectbox("📱 Plataforma:", plataformas)
     
+    # Índice por criador montado uma vez por versão: lista do filtro, filtro e drill-down
+    criadores = obter_cache_filtros().criadores(df_videos, versao_dados)
+    
     with col2:
-        usuarios = ['Todos'] + sorted(df_videos['discord_username'].dropna().unique().tolist()) if 'discord_username' in df_videos.columns else ['Todos']
+        usuarios = ['Todos'] + sorted(criadores.nomes) if criadores is not None else ['Todos']
         usuario = st.selectbox("👤 Usuário:", usuarios)
     
     with col3:
@@ -1449,269 +2131,58 @@ def pagina_videos_completa(df_videos):
         }
         ordenacao = st.selectbox("🔄 Ordenar por:", list(ordenacao_opcoes.keys()))
     
-    # Aplicar filtros
-    df_filtrado = df_videos.copy()
-    
-    if plataforma != 'Todas' and 'platform' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['platform'] == plataforma]
-    
-    if usuario != 'Todos' and 'discord_username' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['discord_username'] == usuario]
-    
-    if 'views' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['views'] >= min_views]
-    
-    if apenas_com_link and 'tem_link' in df_filtrado.columns:
-        df_filtrado = df_filtrado[df_filtrado['tem_link'] == True]
-    
-    # Aplicar ordenação
+    # Aplicar filtros e ordenação: memorizados por versão dos dados, então trocar de
+    # página ou de aba reaproveita o mesmo resultado em vez de filtrar e ordenar de novo
     coluna_ord, ascending = ordenacao_opcoes[ordenacao]
-    if coluna_ord in df_filtrado.columns:
-        df_filtrado = df_filtrado.sort_values(coluna_ord, ascending=ascending)
+    filtros_memoria = {
+        'plataforma': plataforma if plataforma != 'Todas' else None,
+        'usuario': usuario if usuario != 'Todos' else None,
+        'min_views': min_views,
+        'apenas_com_link': apenas_com_link,
+        'ordenacao': coluna_ord,
+        'crescente': ascending,
+    }
+    posicoes = obter_cache_filtros().obter(df_videos, versao_dados, **filtros_memoria)
+    df_filtrado = selecionar_linhas(df_videos, posicoes)
     
     # Mostrar resultados dos filtros
     st.info(f"🔍 Filtros aplicados: {len(df_filtrado):,} vídeos de {total_videos:,} total")
     
     st.divider()
     
-    # Abas principais
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📋 Lista Paginada", "🏆 Top Vídeos", "📊 Análises", "🔍 Busca Avançada"
-    ])
+    # Abas principais: só a escolhida é calculada e desenhada
+    abas = ["📋 Lista Paginada", "🏆 Top Vídeos", "📊 Análises", "🔍 Busca Avançada"]
+    aba = selecionar_aba(abas, "aba_videos")
     
-    with tab1:
+    if aba == abas[0]:
         st.subheader("📋 Lista Completa de Vídeos")
         
-        if df_filtrado.empty:
+        fonte_lista = st.radio(
+            "🗄️ Fonte da lista:",
+            ["💾 Em memória", "⚡ Consulta no banco"],
+            horizontal=True,
+            help="Consulta no banco aplica filtros e ordenação no SQLite e busca só a página exibida"
+        )
+        
+        modo_exibicao = st.radio(
+            "🧾 Exibição:",
+            ["🗂️ Cartões", "📊 Tabela"],
+            horizontal=True,
+            help="Tabela: rolável, com links e métricas em colunas; o detalhe é desenhado só para o vídeo escolhido"
+        )
+        em_tabela = modo_exibicao == "📊 Tabela"
+        
+        if fonte_lista == "⚡ Consulta no banco":
+            exibir_lista_paginada_banco(plataforma, usuario, min_views, apenas_com_link, coluna_ord, em_tabela, versao_dados)
+        elif df_filtrado.empty:
             st.warning("⚠️ Nenhum vídeo encontrado com os filtros aplicados")
         else:
-            # Controles de paginação melhorados
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                videos_por_pagina = st.selectbox("Vídeos por página:", [10, 20, 50, 100], index=2)
-            
-            with col2:
-                total_paginas = max(1, (len(df_filtrado) - 1) // videos_por_pagina + 1)
-                pagina_atual = st.number_input("Página:", min_value=1, max_value=total_paginas, value=1)
-            
-            with col3:
-                st.metric("📄 Total de Páginas", total_paginas)
-            
-            # Calcular range da página
-            inicio = (pagina_atual - 1) * videos_por_pagina
-            fim = min(inicio + videos_por_pagina, len(df_filtrado))
-            df_pagina = df_filtrado.iloc[inicio:fim]
-            
-            st.info(f"📊 Mostrando vídeos {inicio + 1:,} a {fim:,} de {len(df_filtrado):,} filtrados")
-            
-            # Exibir vídeos
-            for idx, (_, video) in enumerate(df_pagina.iterrows()):
-                titulo = video.get('title', f'Vídeo #{video.get("id", idx+1)}')
-                categoria = video.get('categoria_video', '📊 Sem categoria')
-                
-                with st.expander(f"{categoria} {titulo[:100]}..."):
-                    col1, col2, col3 = st.columns([2, 1, 1])
-                    
-                    with col1:
-                        # Informações principais
-                        st.markdown("#### 📋 Informações do Vídeo")
-                        if 'discord_username' in video.index:
-                            st.write(f"👤 **Criador:** {video['discord_username']}")
-                        if 'platform' in video.index:
-                            st.write(f"📱 **Plataforma:** {video['platform']}")
-                        if 'title' in video.index:
-                            st.write(f"📝 **Título:** {video['title']}")
-                        
-                        # Link do vídeo - DESTAQUE
-                        if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                            st.markdown(f"""
-                            <div style="background: linear-gradient(135deg, #28a745, #20c997); 
-                                        padding: 1.5rem; border-radius: 12px; margin: 1rem 0; text-align: center;">
-                                <a href="{video['url']}" target="_blank" 
-                                   style="color: white; text-decoration: none; font-weight: bold; font-size: 1.2em;">
-                                    🔗 ASSISTIR VÍDEO ORIGINAL
-                                </a>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            st.markdown("""
-                            <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 12px; 
-                                        border: 2px dashed #dee2e6; margin: 1rem 0; text-align: center;">
-                                <span style="color: #6c757d; font-weight: bold;">🔗 Link não disponível</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        # Métricas básicas
-                        st.markdown("#### 📊 Métricas")
-                        if 'views' in video.index:
-                            st.metric("👁️ Views", formatar_numero(video['views']))
-                        if 'likes' in video.index:
-                            st.metric("❤️ Curtidas", formatar_numero(video['likes']))
-                        if 'comments' in video.index:
-                            st.metric("💬 Comentários", formatar_numero(video['comments']))
-                    
-                    with col3:
-                        # Métricas avançadas
-                        st.markdown("#### 🎯 Performance")
-                        if 'engagement_rate' in video.index:
-                            st.metric("📈 Engajamento", f"{video['engagement_rate']:.2f}%")
-                        if 'video_score' in video.index:
-                            st.metric("🏆 Score", f"{video['video_score']:.1f}")
-                        if 'interactions' in video.index:
-                            st.metric("💪 Interações", formatar_numero(video['interactions']))
-            
-            # Navegação da página
-            if total_paginas > 1:
-                st.divider()
-                col1, col2, col3 = st.columns([1, 2, 1])
-                
-                with col1:
-                    if pagina_atual > 1:
-                        if st.button("⬅️ Página Anterior"):
-                            st.rerun()
-                
-                with col2:
-                    st.markdown(f"<div style='text-align: center;'><strong>Página {pagina_atual} de {total_paginas}</strong></div>", unsafe_allow_html=True)
-                
-                with col3:
-                    if pagina_atual < total_paginas:
-                        if st.button("Próxima Página ➡️"):
-                            st.rerun()
+            exibir_lista_paginada_memoria(df_filtrado, em_tabela, (tuple(filtros_memoria.items()), versao_dados))
     
-    with tab2:
-        st.subheader("🏆 Top Vídeos por Categoria")
-        
-        # Controle de quantidade
-        top_quantidade = st.selectbox("📊 Quantidade no top:", [10, 20, 50, 100], index=1)
-        
-        subtabs = st.tabs(["👁️ Mais Views", "❤️ Mais Curtidas", "📈 Maior Engajamento", "🔗 Melhores com Links"])
-        
-        with subtabs[0]:  # Mais Views
-            if 'views' in df_filtrado.columns and not df_filtrado.empty:
-                top_views = df_filtrado.nlargest(top_quantidade, 'views')
-                
-                # Gráfico
-                fig = px.bar(
-                    top_views.head(20),  # Limitar gráfico a 20 para visualização
-                    x='views',
-                    y='title' if 'title' in top_views.columns else 'id',
-                    orientation='h',
-                    title=f"Top 20 Vídeos - Mais Views",
-                    color='views',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_yaxes(categoryorder='total ascending')
-                fig.update_layout(height=600)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Lista detalhada
-                for i, (_, video) in enumerate(top_views.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video['views'])}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                        {'<p><strong>📈 Engajamento:</strong> ' + f"{video['engagement_rate']:.2f}%" + '</p>' if 'engagement_rate' in video.index else ''}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"""
-                        <div style="background: linear-gradient(135deg, #007bff, #0056b3); 
-                                    padding: 1rem; border-radius: 8px; margin: 0.5rem 0; text-align: center;">
-                            <a href="{video['url']}" target="_blank" 
-                               style="color: white; text-decoration: none; font-weight: bold;">
-                                🔗 ASSISTIR VÍDEO
-                            </a>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.divider()
-            else:
-                st.info("ℹ️ Dados de views não disponíveis")
-        
-        with subtabs[1]:  # Mais Curtidas
-            if 'likes' in df_filtrado.columns and not df_filtrado.empty:
-                top_likes = df_filtrado.nlargest(top_quantidade, 'likes')
-                
-                for i, (_, video) in enumerate(top_likes.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video['likes'])}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"🔗 **[Ver Vídeo Original]({video['url']})**")
-                    
-                    st.divider()
-        
-        with subtabs[2]:  # Maior Engajamento
-            if 'engagement_rate' in df_filtrado.columns and not df_filtrado.empty:
-                # Filtrar vídeos com pelo menos 100 views
-                df_eng = df_filtrado[df_filtrado['views'] >= 100] if 'views' in df_filtrado.columns else df_filtrado
-                top_engagement = df_eng.nlargest(top_quantidade, 'engagement_rate')
-                
-                for i, (_, video) in enumerate(top_engagement.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📈 Engajamento:</strong> {video['engagement_rate']:.2f}%</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                        st.markdown(f"🔗 **[Ver Vídeo Original]({video['url']})**")
-                    
-                    st.divider()
-        
-        with subtabs[3]:  # Melhores com Links
-            videos_com_link = df_filtrado[df_filtrado['tem_link'] == True] if 'tem_link' in df_filtrado.columns else df_filtrado[df_filtrado['url'].notna() & (df_filtrado['url'] != '')]
-            
-            if not videos_com_link.empty:
-                # Ordenar por views para mostrar os melhores
-                if 'views' in videos_com_link.columns:
-                    videos_com_link = videos_com_link.sort_values('views', ascending=False)
-                
-                st.success(f"✅ Encontrados {len(videos_com_link):,} vídeos com links disponíveis")
-                
-                top_com_links = videos_com_link.head(top_quantidade)
-                
-                for i, (_, video) in enumerate(top_com_links.iterrows(), 1):
-                    st.markdown(f"""
-                    <div class="video-card">
-                        <h4>#{i} - {video.get('title', 'Sem título')[:80]}...</h4>
-                        <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                        <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                        <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                        <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.markdown(f"""
-                    <div style="background: linear-gradient(135deg, #28a745, #20c997); 
-                                padding: 1.5rem; border-radius: 10px; margin: 1rem 0; text-align: center;">
-                        <a href="{video['url']}" target="_blank" 
-                           style="color: white; text-decoration: none; font-weight: bold; font-size: 1.1em;">
-                            🔗 ASSISTIR VÍDEO AGORA
-                        </a>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.divider()
-            else:
-                st.warning("⚠️ Nenhum vídeo com link encontrado nos filtros aplicados")
+    if aba == abas[1]:
+        exibir_top_videos(df_videos, df_filtrado, posicoes, versao_dados)
     
-    with tab3:
+    if aba == abas[2]:
         st.subheader("📊 Análises e Estatísticas")
         
         if df_filtrado.empty:
@@ -1722,7 +2193,7 @@ def pagina_videos_completa(df_videos):
             with col1:
                 # Distribuição por plataforma
                 if 'platform' in df_filtrado.columns:
-                    dist_plat = df_filtrado['platform'].value_counts()
+                    dist_plat = df_filtrado['platform'].value_counts().loc[lambda s: s > 0]
                     
                     fig_plat = px.pie(
                         values=dist_plat.values,
@@ -1734,7 +2205,7 @@ def pagina_videos_completa(df_videos):
             with col2:
                 # Distribuição de engajamento
                 if 'categoria_video' in df_filtrado.columns:
-                    dist_cat = df_filtrado['categoria_video'].value_counts()
+                    dist_cat = df_filtrado['categoria_video'].value_counts().loc[lambda s: s > 0]
                     
                     fig_cat = px.bar(
                         x=dist_cat.index,
@@ -1797,114 +2268,8 @@ def pagina_videos_completa(df_videos):
                     use_container_width=True
                 )
     
-    with tab4:
-        st.subheader("🔍 Busca Avançada")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            if 'title' in df_filtrado.columns:
-                termo_busca = st.text_input(
-                    "🔎 Buscar no título:", 
-                    placeholder="Ex: tutorial, review, gameplay, como fazer...",
-                    help="Digite palavras-chave para buscar nos títulos dos vídeos"
-                )
-                
-                if termo_busca:
-                    videos_encontrados = df_filtrado[
-                        df_filtrado['title'].str.contains(termo_busca, case=False, na=False)
-                    ]
-                    
-                    if not videos_encontrados.empty:
-                        st.success(f"✅ Encontrados {len(videos_encontrados):,} vídeos com '{termo_busca}'")
-                        
-                        # Ordenar por views
-                        if 'views' in videos_encontrados.columns:
-                            videos_encontrados = videos_encontrados.sort_values('views', ascending=False)
-                        
-                        # Limitar a 50 resultados para performance
-                        videos_mostrar = videos_encontrados.head(50)
-                        
-                        if len(videos_encontrados) > 50:
-                            st.info(f"📊 Mostrando os 50 melhores de {len(videos_encontrados)} encontrados")
-                        
-                        for i, (_, video) in enumerate(videos_mostrar.iterrows(), 1):
-                            st.markdown(f"""
-                            <div class="video-card">
-                                <h4>#{i} - {video['title']}</h4>
-                                <p><strong>👤 Criador:</strong> {video.get('discord_username', 'N/A')}</p>
-                                <p><strong>📱 Plataforma:</strong> {video.get('platform', 'N/A')}</p>
-                                <p><strong>👁️ Views:</strong> {formatar_numero(video.get('views', 0))}</p>
-                                <p><strong>❤️ Curtidas:</strong> {formatar_numero(video.get('likes', 0))}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                                st.markdown(f"""
-                                <div style="background: linear-gradient(135deg, #6f42c1, #5a2d91); 
-                                            padding: 1rem; border-radius: 8px; margin: 0.5rem 0; text-align: center;">
-                                    <a href="{video['url']}" target="_blank" 
-                                       style="color: white; text-decoration: none; font-weight: bold;">
-                                        🔗 VER VÍDEO
-                                    </a>
-                                </div>
-                                """, unsafe_allow_html=True)
-                            
-                            st.divider()
-                    else:
-                        st.warning(f"⚠️ Nenhum vídeo encontrado com o termo '{termo_busca}'")
-            else:
-                st.info("ℹ️ Campo de título não disponível para busca")
-        
-        with col2:
-            # Busca por criador
-            if 'discord_username' in df_filtrado.columns:
-                st.markdown("#### 👤 Busca por Criador")
-                
-                criadores_unicos = sorted(df_filtrado['discord_username'].dropna().unique())
-                criador_busca = st.selectbox("Selecione um criador:", [''] + criadores_unicos)
-                
-                if criador_busca:
-                    videos_criador = df_filtrado[df_filtrado['discord_username'] == criador_busca]
-                    
-                    if not videos_criador.empty:
-                        st.success(f"✅ {len(videos_criador)} vídeos de {criador_busca}")
-                        
-                        # Estatísticas do criador
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.metric("🎥 Total Vídeos", len(videos_criador))
-                            if 'views' in videos_criador.columns:
-                                st.metric("👁️ Views Totais", formatar_numero(videos_criador['views'].sum()))
-                        with col2:
-                            if 'likes' in videos_criador.columns:
-                                st.metric("❤️ Curtidas Totais", formatar_numero(videos_criador['likes'].sum()))
-                            if 'engagement_rate' in videos_criador.columns:
-                                st.metric("📈 Engajamento Médio", f"{videos_criador['engagement_rate'].mean():.2f}%")
-                        
-                        # Mostrar alguns vídeos do criador
-                        st.markdown("#### 🎬 Últimos Vídeos")
-                        videos_recentes = videos_criador.head(10)
-                        
-                        for i, (_, video) in enumerate(videos_recentes.iterrows(), 1):
-                            with st.expander(f"🎥 {video.get('title', f'Vídeo #{i}')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    if 'views' in video.index:
-                                        st.write(f"👁️ **Views:** {formatar_numero(video['views'])}")
-                                    if 'likes' in video.index:
-                                        st.write(f"❤️ **Curtidas:** {formatar_numero(video['likes'])}")
-                                    if 'platform' in video.index:
-                                        st.write(f"📱 **Plataforma:** {video['platform']}")
-                                
-                                with col2:
-                                    if 'engagement_rate' in video.index:
-                                        st.write(f"📈 **Engajamento:** {video['engagement_rate']:.2f}%")
-                                    if 'url' in video.index and pd.notna(video['url']) and video['url'] != '':
-                                        st.markdown(f"🔗 **[Ver Vídeo]({video['url']})**")
-                                    else:
-                                        st.write("🔗 **Link:** Não disponível")
+    if aba == abas[3]:
+        exibir_busca_avancada(df_videos, df_filtrado, posicoes, filtros_memoria, criadores, versao_dados)
 
 # ========== FUNÇÃO PRINCIPAL ==========
 def main():
@@ -1913,6 +2278,7 @@ def main():
     # Inicializar session state
     if 'mostrar_explicacao' not in st.session_state:
         st.session_state['mostrar_explicacao'] = False
+    iniciar_tempos()
     
     # Header principal
     st.markdown("""
@@ -1930,22 +2296,31 @@ def main():
         st.info(f"🔍 Arquivo esperado: `{DB_PATH}`")
         st.stop()
     
-    # Carregar dados com indicador de progresso
+    # Carregar dados: só a primeira carga do processo espera; depois a página recebe a
+    # última cópia boa e as mudanças no banco são aplicadas em segundo plano
     try:
-        with st.spinner("🔄 Carregando TODOS os dados do banco..."):
-            progress_bar = st.progress(0)
-            
-            # Carregar usuários
-            progress_bar.progress(25)
-            df_usuarios = carregar_dados_usuarios_completo()
-            
-            # Carregar vídeos
-            progress_bar.progress(75)
-            df_videos = carregar_videos_completo()
-            
-            progress_bar.progress(100)
+        atualizador = obter_atualizador_dados()
+        if atualizador.copia is None:
+            with st.spinner("🔄 Carregando TODOS os dados do banco..."):
+                progress_bar = st.progress(0, text="🎬 Lendo vídeos do banco...")
+                
+                def mostrar_progresso(lidas, total):
+                    fracao = min(lidas / total, 1.0) if total else 1.0
+                    progress_bar.progress(fracao, text=f"🎬 {lidas:,} de {total:,} vídeos lidos")
+                
+                copia = atualizador.obter(mostrar_progresso)
+                progress_bar.empty()
             st.success("✅ Dados carregados com sucesso!")
-            
+        else:
+            copia = atualizador.obter()
+        
+        versao_dados = copia.versao
+        df_usuarios = copia.dados['usuarios']
+        df_videos = copia.dados['videos']
+        if not df_videos.empty:
+            st.session_state['total_videos_banco'] = copia.dados['total_videos_banco']
+            st.session_state['videos_carregados'] = len(df_videos)
+    
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados do banco: {str(e)}")
         st.info("💡 **Possíveis soluções:**")
@@ -1992,48 +2367,41 @@ def main():
     st.sidebar.divider()
     st.sidebar.markdown("### 📊 Status Completo dos Dados")
     
+    # Totais calculados uma vez por versão dos dados e reaproveitados entre execuções e sessões
+    resumo = obter_resumo_dados(versao_dados, df_usuarios, df_videos)
+    
     # Estatísticas dos usuários
-    if not df_usuarios.empty:
-        total_usuarios = len(df_usuarios)
-        usuarios_ativos = len(df_usuarios[df_usuarios['total_views'] > 0])
-        usuarios_inativos = total_usuarios - usuarios_ativos
-        
-        st.sidebar.metric("👥 Total Usuários", f"{total_usuarios:,}")
-        st.sidebar.metric("🟢 Usuários Ativos", f"{usuarios_ativos:,}")
-        st.sidebar.metric("😴 Usuários Inativos", f"{usuarios_inativos:,}")
+    if 'usuarios' in resumo:
+        usuarios = resumo['usuarios']
+        st.sidebar.metric("👥 Total Usuários", f"{usuarios['total']:,}")
+        st.sidebar.metric("🟢 Usuários Ativos", f"{usuarios['ativos']:,}")
+        st.sidebar.metric("😴 Usuários Inativos", f"{usuarios['inativos']:,}")
         
-        if usuarios_ativos > 0:
-            taxa_ativacao = (usuarios_ativos / total_usuarios) * 100
-            st.sidebar.metric("📈 Taxa de Ativação", f"{taxa_ativacao:.1f}%")
+        if usuarios['taxa_ativacao'] is not None:
+            st.sidebar.metric("📈 Taxa de Ativação", f"{usuarios['taxa_ativacao']:.1f}%")
     
     # Estatísticas dos vídeos
-    if not df_videos.empty:
+    if 'videos' in resumo:
+        videos = resumo['videos']
         st.sidebar.divider()
         st.sidebar.markdown("### 🎬 Estatísticas de Vídeos")
         
-        total_videos = len(df_videos)
-        st.sidebar.metric("🎥 Total de Vídeos", f"{total_videos:,}")
+        st.sidebar.metric("🎥 Total de Vídeos", f"{videos['total']:,}")
         
-        if 'tem_link' in df_videos.columns:
-            videos_com_link = len(df_videos[df_videos['tem_link'] == True])
-            st.sidebar.metric("🔗 Com Links", f"{videos_com_link:,}")
-            
-            if total_videos > 0:
-                porcentagem_links = (videos_com_link / total_videos) * 100
-                st.sidebar.metric("📊 % com Links", f"{porcentagem_links:.1f}%")
+        if videos['com_link'] is not None:
+            st.sidebar.metric("🔗 Com Links", f"{videos['com_link']:,}")
+            st.sidebar.metric("📊 % com Links", f"{videos['porcentagem_links']:.1f}%")
         
-        if 'views' in df_videos.columns:
-            total_views_videos = df_videos['views'].sum()
-            st.sidebar.metric("👁️ Views Totais", formatar_numero(total_views_videos))
+        if videos['views'] is not None:
+            st.sidebar.metric("👁️ Views Totais", formatar_numero(videos['views']))
     
     # Informações do sistema
     st.sidebar.divider()
     st.sidebar.markdown("### ⚙️ Informações do Sistema")
     
     # Tamanho do banco
-    if os.path.exists(DB_PATH):
-        tamanho_db = os.path.getsize(DB_PATH) / (1024 * 1024)  # MB
-        st.sidebar.metric("💾 Tamanho do Banco", f"{tamanho_db:.1f} MB")
+    if resumo['tamanho_db_mb'] is not None:
+        st.sidebar.metric("💾 Tamanho do Banco", f"{resumo['tamanho_db_mb']:.1f} MB")
     
     # Informações de carregamento
     if 'total_videos_banco' in st.session_state:
@@ -2045,12 +2413,38 @@ def main():
         else:
             st.sidebar.success(f"✅ Todos os {total_banco:,} vídeos carregados")
     
+    # Idade da cópia em uso (refeita em segundo plano quando o banco muda)
+    idade = atualizador.idade()
+    if idade is not None:
+        idade_texto = f"{int(idade // 60)}min {int(idade % 60)}s" if idade >= 60 else f"{idade:.0f}s"
+        st.sidebar.metric("🕒 Idade dos Dados", idade_texto)
+    if atualizador.atualizando:
+        st.sidebar.info("🔄 Atualizando dados em segundo plano...")
+    if copia.dados['limite_videos']:
+        st.sidebar.warning("⚠️ Vídeos acima do limite de memória: página de vídeos em modo consulta")
+    if atualizador.ultimo_erro:
+        st.sidebar.warning(f"⚠️ Última atualização falhou (usando a cópia anterior): {atualizador.ultimo_erro}")
+    
+    # Memória ocupada pelos frames em cache (esquema compacto)
+    with st.sidebar.expander("🧠 Memória dos dados"):
+        for nome, df_memoria in [("Usuários", df_usuarios), ("Vídeos", df_videos)]:
+            if df_memoria.empty:
+                continue
+            uso = calcular_relatorio_memoria(nome, versao_dados, df_memoria)
+            st.metric(f"{nome} ({len(df_memoria):,} linhas)", f"{uso['bytes'].sum() / (1024 * 1024):.1f} MB")
+            st.dataframe(
+                uso.assign(KB=(uso['bytes'] / 1024).round(1)).drop(columns='bytes'),
+                hide_index=True, use_container_width=True
+            )
+    
     # Controles de cache
     st.sidebar.divider()
     st.sidebar.markdown("### 🔄 Controles")
     
     if st.sidebar.button("🔄 Recarregar Dados", help="Limpa o cache e recarrega dados do banco"):
         st.cache_data.clear()
+        obter_carregador_videos().invalidar()
+        atualizador.forcar()
         st.rerun()
     
     # Informações sobre as funcionalidades
@@ -2172,15 +2566,16 @@ def main():
                 st.session_state['mostrar_explicacao'] = False
     
     # Exibir página selecionada
+    inicio_pagina = time.perf_counter()
     try:
         if pagina_selecionada == "📊 Dashboard Executivo":
-            pagina_dashboard_executivo(df_usuarios)
+            pagina_dashboard_executivo(df_usuarios, versao_dados)
         elif pagina_selecionada == "🏆 Rankings Completos":
-            pagina_rankings_completos(df_usuarios)
+            pagina_rankings_completos(df_usuarios, versao_dados)
         elif pagina_selecionada == "👤 Análise Individual":
-            pagina_analise_usuario_avancada(df_usuarios)
+            pagina_analise_usuario_avancada(df_usuarios, versao_dados)
         elif pagina_selecionada == "🎬 Vídeos Completos":
-            pagina_videos_completa(df_videos)
+            pagina_videos_completa(df_videos, copia.dados['limite_videos'], versao_dados)
             
     except TypeError as e:
         if "unsupported operand type" in str(e):
@@ -2210,6 +2605,14 @@ def main():
             st.markdown("3. Confirme se as tabelas necessárias existem")
             st.markdown("4. Verifique se as colunas têm os nomes e tipos corretos")
     
+    # Tempos desta execução: a página inteira e as etapas cronometradas dentro dela
+    tempos = [("⏱️ Página", (time.perf_counter() - inicio_pagina) * 1000)] + st.session_state.get('tempos_pagina', [])
+    with st.sidebar.expander("⏱️ Tempos desta execução"):
+        st.dataframe(
+            pd.DataFrame(tempos, columns=['Etapa', 'ms']).round(1),
+            hide_index=True, use_container_width=True
+        )
+    
     # Footer informativo
     st.sidebar.divider()
     st.sidebar.markdown(f"""
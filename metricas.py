@@ -0,0 +1,547 @@
+# 🧮 Métricas do TrendX
+# Fórmulas de engajamento e score usadas pelo dashboard, sem dependência do Streamlit
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# ========== UTILITÁRIOS ==========
+def converter_para_numerico_seguro(series, valor_padrao=0):
+    """Converte uma série para numérico de forma segura"""
+    try:
+        return pd.to_numeric(series, errors='coerce').fillna(valor_padrao)
+    except:
+        return pd.Series([valor_padrao] * len(series), index=series.index)
+
+# ========== FUNÇÕES DE REFERÊNCIA (ESCALARES) ==========
+def calcular_engajamento_por_plataforma(views, likes, comments, shares, platform):
+    """Calcula engajamento usando as fórmulas oficiais de cada rede social"""
+    if views == 0:
+        return 0
+    
+    if platform.lower() == 'tiktok':
+        # TikTok: (Curtidas + Comentários + Compartilhamentos) / Views × 100
+        # TikTok considera todas as interações igualmente
+        engajamento = ((likes + comments + shares) / views) * 100
+    
+    elif platform.lower() == 'youtube':
+        # YouTube: (Curtidas + Comentários) / Views × 100
+        # YouTube não conta shares da mesma forma
+        engajamento = ((likes + comments) / views) * 100
+    
+    elif platform.lower() == 'instagram':
+        # Instagram: (Curtidas + Comentários + Compartilhamentos) / Alcance × 100
+        # Instagram usa alcance, mas como temos views, usamos views
+        engajamento = ((likes + comments + shares) / views) * 100
+    
+    else:
+        # Fórmula geral para outras plataformas
+        engajamento = ((likes + comments + shares) / views) * 100
+    
+    return round(engajamento, 2)
+
+def calcular_score_performance_real(views, likes, comments, shares, videos, platform_principal=None):
+    """Calcula score baseado nas métricas reais das redes sociais"""
+    if views == 0 or videos == 0:
+        return 0
+    
+    # 1. Taxa de Engajamento Real (50% do score)
+    if platform_principal:
+        taxa_engajamento = calcular_engajamento_por_plataforma(views, likes, comments, shares, platform_principal)
+    else:
+        # Fórmula geral se não soubermos a plataforma principal
+        taxa_engajamento = ((likes + comments + shares) / views) * 100
+    
+    # Normalizar taxa de engajamento para pontuação (0-50 pontos)
+    # Taxa > 10% = pontuação máxima (50 pontos)
+    score_engajamento = min(taxa_engajamento * 5, 50)
+    
+    # 2. Volume de Alcance (30% do score)
+    # Baseado em views totais, mas com escala logarítmica
+    score_volume = min(np.log1p(views) * 3, 30)
+    
+    # 3. Frequência/Consistência (20% do score)
+    # Views por vídeo - mede se cada vídeo tem performance boa
+    views_por_video = views / videos
+    score_consistencia = min(views_por_video * 0.002, 20)
+    
+    total_score = score_engajamento + score_volume + score_consistencia
+    return min(round(total_score, 1), 100)
+
+def determinar_plataforma_principal(tiktok_views, youtube_views, instagram_views):
+    """Determina qual é a plataforma principal do usuário"""
+    plataformas = {
+        'tiktok': tiktok_views,
+        'youtube': youtube_views, 
+        'instagram': instagram_views
+    }
+    
+    # Retorna a plataforma com mais views
+    plataforma_principal = max(plataformas.items(), key=lambda x: x[1])
+    return plataforma_principal[0] if plataforma_principal[1] > 0 else None
+
+def obter_categoria_performance(score):
+    """Retorna categoria baseada no score"""
+    if score >= 80:
+        return "🏆 Elite", "#ffd700"
+    elif score >= 60:
+        return "🥇 Expert", "#c0c0c0"
+    elif score >= 40:
+        return "🥈 Avançado", "#cd7f32"
+    elif score >= 20:
+        return "🥉 Intermediário", "#4caf50"
+    elif score > 0:
+        return "🌱 Iniciante", "#ff9800"
+    else:
+        return "😴 Inativo", "#6c757d"
+
+def calcular_metricas_usuarios_referencia(df):
+    """Calcula as métricas linha a linha com as funções escalares (referência de paridade)"""
+    resultado = pd.DataFrame(index=df.index)
+    
+    resultado['plataforma_principal'] = df.apply(
+        lambda x: determinar_plataforma_principal(
+            x['tiktok_views'], x['youtube_views'], x['instagram_views']
+        ), axis=1
+    )
+    
+    dados = df.assign(plataforma_principal=resultado['plataforma_principal'])
+    
+    resultado['taxa_engajamento'] = dados.apply(
+        lambda x: calcular_engajamento_por_plataforma(
+            x['total_views'], x['total_likes'], x['total_comments'], 
+            x['total_shares'], x['plataforma_principal'] or 'geral'
+        ), axis=1
+    )
+    
+    resultado['score_performance'] = dados.apply(
+        lambda x: calcular_score_performance_real(
+            x['total_views'], x['total_likes'], x['total_comments'], 
+            x['total_shares'], x['total_videos'], x['plataforma_principal']
+        ), axis=1
+    ).round(1)
+    
+    resultado[['categoria_performance', 'cor_categoria']] = resultado['score_performance'].apply(
+        lambda x: pd.Series(obter_categoria_performance(x))
+    )
+    
+    return resultado
+
+# ========== MOTOR VETORIZADO ==========
+PLATAFORMAS = np.array(['tiktok', 'youtube', 'instagram'], dtype=object)
+
+LIMITES_CATEGORIA = [80, 60, 40, 20]
+CATEGORIAS_PERFORMANCE = ["🏆 Elite", "🥇 Expert", "🥈 Avançado", "🥉 Intermediário", "🌱 Iniciante", "😴 Inativo"]
+CORES_CATEGORIA = ["#ffd700", "#c0c0c0", "#cd7f32", "#4caf50", "#ff9800", "#6c757d"]
+
+def _como_float(valores):
+    """Converte uma coluna/array para float64 sem cópia quando possível"""
+    return np.asarray(valores, dtype=np.float64)
+
+def _arredondar_python(valores, casas):
+    """Arredonda como o round() do Python, que é exato em decimal
+    
+    np.round multiplica por 10^casas antes de arredondar e diverge do round()
+    apenas perto da metade (ex: 2.675). Só esses casos voltam para o round() escalar.
+    """
+    arredondado = np.round(valores, casas)
+    escalado = valores * (10.0 ** casas)
+    distancia_meio = np.abs(escalado - np.floor(escalado) - 0.5)
+    suspeitos = np.flatnonzero(distancia_meio <= 1e-6 + np.abs(escalado) * 1e-12)
+    for i in suspeitos:
+        arredondado[i] = round(float(valores[i]), casas)
+    return arredondado
+
+def calcular_engajamento_vetorizado(views, likes, comments, shares, plataformas, arredondar=True):
+    """Versão em arrays de calcular_engajamento_por_plataforma (YouTube ignora shares)"""
+    views = _como_float(views)
+    likes = _como_float(likes)
+    comments = _como_float(comments)
+    shares = _como_float(shares)
+    
+    # Compara só os valores distintos de plataforma e espalha o resultado pelos códigos
+    codigos, distintas = pd.factorize(np.asarray(plataformas, dtype=object))
+    distintas_youtube = np.array([str(p).lower() == 'youtube' for p in distintas] + [False])
+    eh_youtube = distintas_youtube[codigos]
+    interacoes = np.where(eh_youtube, likes + comments, likes + comments + shares)
+    
+    com_views = views != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        engajamento = (interacoes / np.where(com_views, views, 1)) * 100
+    
+    if arredondar:
+        engajamento = _arredondar_python(engajamento, 2)
+    return np.where(com_views, engajamento, 0.0)
+
+def determinar_plataforma_principal_vetorizado(tiktok_views, youtube_views, instagram_views):
+    """Plataforma com mais views por linha (empate fica com a primeira, como max())"""
+    views_plataforma = np.column_stack([
+        _como_float(tiktok_views), _como_float(youtube_views), _como_float(instagram_views)
+    ])
+    indice = np.argmax(views_plataforma, axis=1)
+    maximo = views_plataforma[np.arange(len(indice)), indice]
+    return np.where(maximo > 0, PLATAFORMAS[indice], None)
+
+def calcular_score_performance_vetorizado(views, likes, comments, shares, videos, plataformas):
+    """Versão em arrays de calcular_score_performance_real"""
+    views = _como_float(views)
+    videos = _como_float(videos)
+    tem_plataforma = pd.notna(plataformas) & (np.asarray(plataformas, dtype=object) != '')
+    
+    # Com plataforma principal a taxa vem arredondada; sem ela, a fórmula geral não arredonda
+    taxa_plataforma = calcular_engajamento_vetorizado(views, likes, comments, shares, plataformas)
+    taxa_geral = calcular_engajamento_vetorizado(views, likes, comments, shares, plataformas, arredondar=False)
+    taxa_engajamento = np.where(tem_plataforma, taxa_plataforma, taxa_geral)
+    
+    score_engajamento = np.minimum(taxa_engajamento * 5, 50)
+    score_volume_bruto = np.log1p(views) * 3
+    score_volume = np.minimum(score_volume_bruto, 30)
+    
+    validos = (views != 0) & (videos != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        views_por_video = views / np.where(videos != 0, videos, 1)
+    score_consistencia = np.minimum(views_por_video * 0.002, 20)
+    
+    total_score = score_engajamento + score_volume + score_consistencia
+    
+    # Na função escalar o total é np.float64 (e arredonda como o NumPy) enquanto o volume
+    # vem de np.log1p; quando o volume satura em 30 (int) o round() é o do Python
+    score = np.where(score_volume_bruto > 30, _arredondar_python(total_score, 1), np.round(total_score, 1))
+    score = np.minimum(score, 100)
+    return np.where(validos, score, 0.0)
+
+def obter_categoria_performance_vetorizado(scores):
+    """Categoria e cor para um array de scores"""
+    scores = _como_float(scores)
+    condicoes = [scores >= limite for limite in LIMITES_CATEGORIA] + [scores > 0]
+    categorias = np.select(condicoes, CATEGORIAS_PERFORMANCE[:-1], CATEGORIAS_PERFORMANCE[-1])
+    cores = np.select(condicoes, CORES_CATEGORIA[:-1], CORES_CATEGORIA[-1])
+    return categorias.astype(object), cores.astype(object)
+
+def calcular_metricas_usuarios(df):
+    """Calcula plataforma principal, engajamento, score e categoria para todos os usuários de uma vez"""
+    resultado = pd.DataFrame(index=df.index)
+    
+    plataformas = determinar_plataforma_principal_vetorizado(
+        df['tiktok_views'], df['youtube_views'], df['instagram_views']
+    )
+    resultado['plataforma_principal'] = plataformas
+    
+    resultado['taxa_engajamento'] = calcular_engajamento_vetorizado(
+        df['total_views'], df['total_likes'], df['total_comments'], df['total_shares'], plataformas
+    )
+    
+    resultado['score_performance'] = calcular_score_performance_vetorizado(
+        df['total_views'], df['total_likes'], df['total_comments'], df['total_shares'],
+        df['total_videos'], plataformas
+    )
+    
+    categorias, cores = obter_categoria_performance_vetorizado(resultado['score_performance'])
+    resultado['categoria_performance'] = categorias
+    resultado['cor_categoria'] = cores
+    
+    return resultado
+
+# ========== PIPELINE DE VÍDEOS ==========
+LIMITES_CATEGORIA_VIDEO = np.array([0, 1, 3, 6, 10, 100], dtype=np.float64)
+CATEGORIAS_VIDEO = ['🔴 Baixo', '🟡 Regular', '🟢 Bom', '🔵 Muito Bom', '🟣 Excepcional']
+
+# Rótulo por posição do searchsorted: 0 e 1 caem no primeiro intervalo (include_lowest),
+# acima de 100% fica fora dos limites e vira 'nan', como o pd.cut(...).astype(str)
+_ROTULOS_POR_POSICAO = np.array([CATEGORIAS_VIDEO[0]] + CATEGORIAS_VIDEO + ['nan'], dtype=object)
+
+def calcular_metricas_videos_referencia(df):
+    """Calcula as métricas de vídeo com o df.apply original (referência de paridade)"""
+    resultado = pd.DataFrame(index=df.index)
+    resultado['interactions'] = df['likes'] + df['comments'] + df['shares']
+    
+    resultado['engagement_rate'] = df.apply(
+        lambda x: calcular_engajamento_por_plataforma(
+            x['views'], x['likes'], x['comments'], 
+            x['shares'], x.get('platform', 'geral')
+        ), axis=1
+    )
+    
+    resultado['video_score'] = (
+        resultado['engagement_rate'] * 0.6 +
+        np.log1p(df['views']) * 0.4
+    ).round(2)
+    
+    resultado['categoria_video'] = pd.cut(
+        resultado['engagement_rate'],
+        bins=[0, 1, 3, 6, 10, 100],
+        labels=CATEGORIAS_VIDEO,
+        include_lowest=True
+    ).astype(str)
+    
+    resultado['tem_link'] = df['url'].notna() & (df['url'] != '') & (df['url'].str.len() > 10)
+    return resultado
+
+def categorizar_engajamento_video(engajamento):
+    """Categoria de engajamento por vídeo usando limites pré-calculados (equivale ao pd.cut)"""
+    engajamento = _como_float(engajamento)
+    posicao = np.searchsorted(LIMITES_CATEGORIA_VIDEO, engajamento, side='left')
+    posicao = np.where(engajamento < 0, len(_ROTULOS_POR_POSICAO) - 1, posicao)
+    return _ROTULOS_POR_POSICAO[posicao]
+
+def verificar_links(urls):
+    """True para URLs com mais de 10 caracteres (nulos e vazios ficam False)"""
+    return urls.str.len().gt(10).to_numpy(dtype=bool)
+
+def calcular_metricas_videos(df):
+    """Calcula interações, engajamento, score, categoria e link de todos os vídeos de uma vez"""
+    resultado = pd.DataFrame(index=df.index)
+    resultado['interactions'] = df['likes'] + df['comments'] + df['shares']
+    
+    plataformas = df['platform'] if 'platform' in df.columns else np.full(len(df), 'geral', dtype=object)
+    engajamento = calcular_engajamento_vetorizado(
+        df['views'], df['likes'], df['comments'], df['shares'], plataformas
+    )
+    resultado['engagement_rate'] = engajamento
+    
+    resultado['video_score'] = np.round(
+        engajamento * 0.6 + np.log1p(_como_float(df['views'])) * 0.4, 2
+    )
+    resultado['categoria_video'] = categorizar_engajamento_video(engajamento)
+    
+    if 'url' in df.columns:
+        resultado['tem_link'] = verificar_links(df['url'])
+    elif 'tem_link' in df.columns:
+        # Já calculado no banco quando a URL não é carregada junto
+        resultado['tem_link'] = df['tem_link'].fillna(0).astype(bool).to_numpy()
+    else:
+        resultado['tem_link'] = False
+    
+    return resultado
+
+# ========== ESQUEMA COMPACTO ==========
+# Contadores viram o menor inteiro que cabe; textos repetidos viram categoria.
+# Métricas em ponto flutuante continuam float64 para não mudar valores nem empates.
+ESQUEMA_USUARIOS = {
+    'inteiros': [
+        'user_id', 'total_videos', 'total_views', 'total_likes', 'total_comments', 'total_shares',
+        'tiktok_views', 'tiktok_videos', 'youtube_views', 'youtube_videos',
+        'instagram_views', 'instagram_videos', 'total_interactions',
+        'rank_views', 'rank_likes', 'rank_engajamento', 'rank_performance',
+    ],
+    # discord_username é único por usuário: como categoria só gastaria mais memória
+    'categorias': [
+        'categoria_performance', 'cor_categoria',
+        'status_usuario', 'consistencia', 'potencial_crescimento',
+    ],
+    'booleanos': [],
+}
+
+ESQUEMA_VIDEOS = {
+    'inteiros': ['id', 'user_id', 'views', 'likes', 'comments', 'shares', 'interactions'],
+    'categorias': ['platform', 'discord_username', 'categoria_video'],
+    'booleanos': ['tem_link'],
+}
+
+def compactar_frame(df, esquema):
+    """Aplica o esquema compacto (inteiros reduzidos, categorias e booleanos) no lugar"""
+    for col in esquema['inteiros']:
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        serie = df[col]
+        # Só reduz quando todos os valores são inteiros (REAL com fração continua float)
+        if pd.api.types.is_float_dtype(serie) and (serie.isna().any() or (serie % 1 != 0).any()):
+            continue
+        df[col] = pd.to_numeric(serie, downcast='integer')
+    
+    for col in esquema['categorias']:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    
+    for col in esquema['booleanos']:
+        if col in df.columns:
+            df[col] = df[col].fillna(False).astype(bool)
+    
+    return df
+
+def concatenar_compacto(frames):
+    """pd.concat que mantém as colunas categóricas unindo as categorias (e não virando object)"""
+    frames = [f for f in frames if not f.empty] or frames[:1]
+    colunas_categoricas = {
+        col for f in frames for col in f.columns if isinstance(f[col].dtype, pd.CategoricalDtype)
+    }
+    
+    for col in colunas_categoricas:
+        categorias = pd.Index([])
+        for f in frames:
+            if col in f.columns:
+                serie = f[col]
+                novas = serie.cat.categories if isinstance(serie.dtype, pd.CategoricalDtype) else pd.Index(serie.dropna().unique())
+                categorias = categorias.union(novas)
+        tipo = pd.CategoricalDtype(categorias)
+        frames = [f.assign(**{col: f[col].astype(tipo)}) if col in f.columns else f for f in frames]
+    
+    return pd.concat(frames, ignore_index=True)
+
+def atribuir_linhas(df, posicoes, lote):
+    """Sobrescreve as linhas em `posicoes` com `lote`, alargando tipos compactos quando preciso"""
+    for coluna in df.columns:
+        if coluna not in lote.columns:
+            continue
+        destino = df[coluna]
+        valores = lote[coluna]
+        
+        if isinstance(destino.dtype, pd.CategoricalDtype):
+            novas = pd.Index(valores.dropna().unique()).difference(destino.cat.categories)
+            if len(novas):
+                # Mantém as categorias ordenadas, como em astype('category')
+                df[coluna] = destino.cat.set_categories(destino.cat.categories.union(novas))
+            valores = valores.astype(object)
+        elif pd.api.types.is_integer_dtype(destino):
+            tipo = np.result_type(destino.dtype, valores.dtype)
+            if pd.api.types.is_integer_dtype(valores) and len(valores):
+                # Valor maior que o inteiro reduzido: volta para o menor tipo que comporta
+                tipo = np.result_type(destino.dtype, pd.to_numeric(valores, downcast='integer').dtype)
+            if tipo != destino.dtype:
+                df[coluna] = destino.astype(tipo)
+            # Mesmo cabendo, um array int64 atribuído faria o pandas promover a coluna inteira
+            valores = valores.astype(tipo)
+        
+        df.iloc[posicoes, df.columns.get_loc(coluna)] = valores.to_numpy()
+    return df
+
+def relatorio_memoria(df):
+    """Bytes residentes por coluna (deep=True inclui o conteúdo das strings)"""
+    uso = df.memory_usage(deep=True, index=True)
+    return pd.DataFrame({
+        'coluna': uso.index.astype(str),
+        'tipo': ['índice' if c == 'Index' else str(df[c].dtype) for c in uso.index],
+        'bytes': uso.to_numpy(),
+    }).sort_values('bytes', ascending=False, ignore_index=True)
+
+# ========== ESTATÍSTICAS DA POPULAÇÃO ==========
+# Referências dos usuários ativos usadas na análise individual e nos insights.
+# Dependem só do frame, então são calculadas uma vez por versão dos dados.
+COLUNAS_POPULACAO = ['total_views', 'total_likes', 'taxa_engajamento', 'total_videos', 'score_performance']
+QUANTIS_POPULACAO = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+class EstatisticasPopulacao:
+    """Contagens, médias, medianas e quantis dos usuários ativos, mais a busca por nome"""
+    
+    def __init__(self, df):
+        views = df['total_views']
+        ativos = df[views > 0]
+        colunas = [c for c in COLUNAS_POPULACAO if c in df.columns]
+        
+        self.total_usuarios = len(df)
+        self.usuarios_ativos = len(ativos)
+        self.usuarios_inativos = int((views == 0).sum())
+        self.medias = {c: ativos[c].mean() for c in colunas}
+        self.medianas = {c: ativos[c].median() for c in colunas}
+        self.quantis = {c: ativos[c].quantile(QUANTIS_POPULACAO).to_dict() for c in colunas}
+        
+        # posicao() só vale para este frame: recarregado, ele pode vir em outra ordem
+        self._origem = weakref.ref(df)
+        nomes = df['discord_username']
+        self.nomes_ordenados = sorted(nomes.tolist())
+        # Primeira linha de cada nome, como df[df['discord_username'] == nome].iloc[0]
+        primeiras = ~nomes.duplicated(keep='first').to_numpy()
+        self._posicoes = dict(zip(nomes.to_numpy()[primeiras].tolist(), np.flatnonzero(primeiras).tolist()))
+    
+    def posicao(self, nome):
+        """Posição (para iloc) da primeira linha do usuário, ou None"""
+        return self._posicoes.get(nome)
+    
+    def no_topo(self, rank, fracao):
+        """Se o rank cai na fração do topo dos usuários ativos (ex.: 0.1 = TOP 10%)"""
+        return rank <= self.usuarios_ativos * fracao
+    
+    def quantil_alcancado(self, coluna, valor):
+        """Maior quantil dos ativos que o valor alcança (0.9 = acima de 90% deles), ou None"""
+        alcancados = [q for q, limite in self.quantis[coluna].items() if valor >= limite]
+        return max(alcancados) if alcancados else None
+
+class CacheEstatisticasPopulacao:
+    """EstatisticasPopulacao do frame atual, refeitas quando a versão dos dados ou o frame muda"""
+    
+    def __init__(self):
+        self.versao = None
+        self._estatisticas = None
+        self._lock = threading.Lock()
+    
+    def obter(self, df, versao=None):
+        with self._lock:
+            atual = self._estatisticas
+            if atual is None or versao != self.versao or atual._origem() is not df:
+                self._estatisticas = EstatisticasPopulacao(df)
+                self.versao = versao
+            return self._estatisticas
+
+# ========== PARIDADE E BENCHMARK ==========
+def gerar_usuarios_sinteticos(n, seed=42):
+    """Gera um DataFrame com o formato de cached_stats para testes e benchmark"""
+    rng = np.random.default_rng(seed)
+    
+    df = pd.DataFrame({
+        'user_id': np.arange(1, n + 1),
+        'discord_username': [f"usuario_{i}" for i in range(n)],
+    })
+    
+    # ~20% inativos e views com cauda longa
+    ativos = rng.random(n) > 0.2
+    for plataforma in PLATAFORMAS:
+        views = (rng.pareto(1.2, n) * 2000).astype(np.int64) * ativos * (rng.random(n) > 0.4)
+        df[f'{plataforma}_views'] = views
+        df[f'{plataforma}_videos'] = np.where(views > 0, rng.integers(1, 200, n), 0)
+    
+    df['total_views'] = df['tiktok_views'] + df['youtube_views'] + df['instagram_views']
+    df['total_videos'] = df['tiktok_videos'] + df['youtube_videos'] + df['instagram_videos']
+    
+    # Alguns usuários com total sem detalhamento por plataforma (plataforma principal = None)
+    sem_detalhe = ativos & (rng.random(n) < 0.05)
+    df.loc[sem_detalhe, 'total_views'] = rng.integers(1, 500000, int(sem_detalhe.sum()))
+    df.loc[sem_detalhe, 'total_videos'] = rng.integers(0, 50, int(sem_detalhe.sum()))
+    
+    # Empates entre plataformas
+    empate = ativos & (rng.random(n) < 0.02)
+    df.loc[empate, 'youtube_views'] = df.loc[empate, 'tiktok_views']
+    
+    df['total_likes'] = (df['total_views'] * rng.random(n) * 0.12).astype(np.int64)
+    df['total_comments'] = (df['total_views'] * rng.random(n) * 0.02).astype(np.int64)
+    df['total_shares'] = (df['total_views'] * rng.random(n) * 0.01).astype(np.int64)
+    df['updated_at'] = '2024-01-01 00:00:00'
+    return df
+
+def comparar_metricas(esperado, obtido):
+    """Retorna a lista de colunas em que os dois resultados divergem"""
+    divergentes = []
+    for coluna in esperado.columns:
+        a = esperado[coluna]
+        b = obtido[coluna]
+        if not (pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b)):
+            # Textos (object ou categoria do esquema compacto) comparados como str
+            iguais = (a.astype(object).fillna('__nulo__').astype(str) == b.astype(object).fillna('__nulo__').astype(str)).all()
+        else:
+            iguais = np.array_equal(a.to_numpy(dtype=np.float64), b.to_numpy(dtype=np.float64))
+        if not iguais:
+            divergentes.append(coluna)
+    return divergentes
+
+def gerar_videos_sinteticos(n, seed=42):
+    """Gera um DataFrame com o formato de valid_videos ⋈ cached_stats para testes e benchmark"""
+    rng = np.random.default_rng(seed)
+    
+    views = (rng.pareto(1.1, n) * 300).astype(np.int64) * (rng.random(n) > 0.05)
+    urls = np.array(['', None, 'http://x', 'https://www.tiktok.com/@criador/video/1234567890'], dtype=object)
+    
+    df = pd.DataFrame({
+        'id': np.arange(n, 0, -1),
+        'user_id': rng.integers(1, max(2, n // 20), n),
+        'platform': rng.choice(np.array(['tiktok', 'youtube', 'instagram', 'TikTok', 'YouTube'], dtype=object), n),
+        'url': urls[rng.integers(0, len(urls), n)],
+        'title': [f"Vídeo {i}" for i in range(n)],
+        'views': views,
+        # Curtidas às vezes acima das views para cobrir engajamento > 100%
+        'likes': (views * rng.random(n) * np.where(rng.random(n) < 0.01, 2.0, 0.12)).astype(np.int64),
+        'comments': (views * rng.random(n) * 0.02).astype(np.int64),
+        'shares': (views * rng.random(n) * 0.01).astype(np.int64),
+    })
+    df['discord_username'] = 'usuario_' + df['user_id'].astype(str)
+    return df
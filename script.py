@@ -9,13 +9,13 @@ def criar_requirements():
     """Cria requirements.txt atualizado"""
     print("📦 Criando requirements.txt...")
     
-    requirements = """streamlit==1.28.1
+    requirements = """streamlit==1.40.0
 plotly==5.17.0
 pandas==2.1.3
 requests==2.31.0
 python-multipart==0.0.6
 numpy==1.24.3
-sqlite3"""
+pyarrow==14.0.1"""
     
     with open('requirements.txt', 'w') as f:
         f.write(requirements)
@@ -118,6 +118,7 @@ def verificar_banco():
             print("   3. Usar banco online")
         else:
             print("✅ Tamanho adequado para deploy!")
+        print("💡 Índices do dashboard: python script.py indices")
     else:
         print("❌ Banco não encontrado!")
         print("💡 Certifique-se que trendx_bot.db está na pasta")
@@ -262,6 +263,310 @@ Thumbs.db
     
     print("✅ .gitignore criado!")
 
+def benchmark_metricas():
+    """Mede os motores vetorizados contra as funções escalares em 10k/100k/1M linhas"""
+    print("⏱️ Benchmark das métricas de usuários...")
+    
+    import time
+    from metricas import (
+        calcular_metricas_usuarios,
+        calcular_metricas_usuarios_referencia,
+        calcular_metricas_videos,
+        calcular_metricas_videos_referencia,
+        gerar_usuarios_sinteticos,
+        gerar_videos_sinteticos,
+    )
+    
+    # Acima disso a referência escalar leva minutos; use --completo para medir mesmo assim
+    limite_referencia = None if '--completo' in sys.argv else 100_000
+    
+    print(f"{'Usuários':>12} | {'Escalar (s)':>12} | {'Vetorizado (s)':>14} | {'Ganho':>8}")
+    for n in [10_000, 100_000, 1_000_000]:
+        df = gerar_usuarios_sinteticos(n)
+        
+        inicio = time.perf_counter()
+        calcular_metricas_usuarios(df)
+        tempo_vetorizado = time.perf_counter() - inicio
+        
+        if limite_referencia is None or n <= limite_referencia:
+            inicio = time.perf_counter()
+            calcular_metricas_usuarios_referencia(df)
+            tempo_escalar = time.perf_counter() - inicio
+            print(f"{n:>12,} | {tempo_escalar:>12.3f} | {tempo_vetorizado:>14.3f} | {tempo_escalar / tempo_vetorizado:>7.0f}x")
+        else:
+            print(f"{n:>12,} | {'—':>12} | {tempo_vetorizado:>14.3f} | {'—':>8}")
+    
+    print("⏱️ Benchmark do pipeline de vídeos (vídeos/s)...")
+    print(f"{'Vídeos':>12} | {'Escalar (v/s)':>14} | {'Vetorizado (v/s)':>16} | {'Ganho':>8}")
+    for n in [10_000, 100_000, 1_000_000]:
+        df = gerar_videos_sinteticos(n)
+        
+        inicio = time.perf_counter()
+        calcular_metricas_videos(df)
+        vazao_vetorizada = n / (time.perf_counter() - inicio)
+        
+        if limite_referencia is None or n <= limite_referencia:
+            inicio = time.perf_counter()
+            calcular_metricas_videos_referencia(df)
+            vazao_escalar = n / (time.perf_counter() - inicio)
+            print(f"{n:>12,} | {vazao_escalar:>14,.0f} | {vazao_vetorizada:>16,.0f} | {vazao_vetorizada / vazao_escalar:>7.0f}x")
+        else:
+            print(f"{n:>12,} | {'—':>14} | {vazao_vetorizada:>16,.0f} | {'—':>8}")
+
+def atualizar_metricas_persistidas():
+    """Grava as métricas derivadas por usuário no trendx_bot_metricas.db
+    
+    Rode após cada sincronização do bot (ou via cron). Com --intervalo SEGUNDOS fica
+    em loop e só regrava quando cached_stats mudou.
+    """
+    import time
+    from banco import abrir_conexao_leitura, caminho_metricas, gravar_metricas_usuarios, versao_usuarios
+    
+    caminho = 'trendx_bot.db'
+    if not os.path.exists(caminho):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    intervalo = None
+    if '--intervalo' in sys.argv:
+        intervalo = float(sys.argv[sys.argv.index('--intervalo') + 1])
+    
+    ultima_versao = None
+    while True:
+        conn = abrir_conexao_leitura(caminho)
+        try:
+            versao = versao_usuarios(conn)
+        finally:
+            conn.close()
+        
+        if versao != ultima_versao:
+            inicio = time.perf_counter()
+            ultima_versao, linhas = gravar_metricas_usuarios(caminho)
+            print(f"✅ {linhas:,} usuários gravados em {caminho_metricas(caminho)} ({time.perf_counter() - inicio:.2f}s)")
+        
+        if intervalo is None:
+            return True
+        time.sleep(intervalo)
+
+def gerar_snapshots():
+    """Exporta usuários e vídeos já enriquecidos para snapshots Arrow ao lado do banco
+    
+    O dashboard abre o snapshot mais recente por memory-map na inicialização e busca no
+    banco só o que mudou depois dele. Sem snapshot, tudo vem do SQLite como antes.
+    """
+    import time
+    from banco import caminho_snapshot, gravar_snapshots
+    
+    caminho = 'trendx_bot.db'
+    if not os.path.exists(caminho):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    inicio = time.perf_counter()
+    gravados = gravar_snapshots(caminho)
+    for nome, linhas in gravados.items():
+        print(f"✅ {linhas:,} linhas em {caminho_snapshot(caminho, nome)}")
+    print(f"⏱️ Snapshots gerados em {time.perf_counter() - inicio:.2f}s")
+    return True
+
+def sincronizar_busca():
+    """Cria/atualiza o índice FTS5 dos títulos usado pela Busca Avançada
+    
+    Só indexa os vídeos novos desde a última rodada; --completa reconstrói do zero
+    (necessário para refletir títulos editados). Com --intervalo SEGUNDOS fica em loop.
+    Depois de criado, o dashboard também o sincroniza na atualização em segundo plano.
+    """
+    import time
+    from banco import abrir_conexao_leitura, caminho_busca, colunas_da_tabela, sincronizar_busca_titulos
+    
+    caminho = 'trendx_bot.db'
+    if not os.path.exists(caminho):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    conn = abrir_conexao_leitura(caminho)
+    try:
+        tem_titulo = 'title' in colunas_da_tabela(conn, 'valid_videos')
+    finally:
+        conn.close()
+    if not tem_titulo:
+        print("❌ valid_videos não tem a coluna title")
+        return False
+    
+    intervalo = None
+    if '--intervalo' in sys.argv:
+        intervalo = float(sys.argv[sys.argv.index('--intervalo') + 1])
+    completa = '--completa' in sys.argv
+    
+    while True:
+        inicio = time.perf_counter()
+        resultado = sincronizar_busca_titulos(caminho, completa=completa)
+        completa = False
+        if resultado['reconstruido'] or resultado['novos']:
+            acao = "reconstruído" if resultado['reconstruido'] else f"+{resultado['novos']:,} títulos"
+            print(f"✅ Índice de busca {acao}: {resultado['total']:,} títulos em {caminho_busca(caminho)} "
+                  f"({time.perf_counter() - inicio:.2f}s)")
+        elif intervalo is None:
+            print(f"☑️ Índice de busca em dia: {resultado['total']:,} títulos")
+        
+        if intervalo is None:
+            return True
+        time.sleep(intervalo)
+
+def sincronizar_chaves():
+    """Cria/atualiza as chaves de ordenação (engajamento e video score) do dashboard
+    
+    Só recalcula vídeos novos, alterados ou excluídos. Sem este arquivo em dia, a lista de
+    vídeos ordenada por essas duas métricas lê todas as linhas filtradas a cada página.
+    Com --intervalo SEGUNDOS fica em loop.
+    """
+    import time
+    from banco import caminho_chaves_ordenacao, sincronizar_chaves_ordenacao
+    
+    caminho = 'trendx_bot.db'
+    if not os.path.exists(caminho):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    intervalo = None
+    if '--intervalo' in sys.argv:
+        intervalo = float(sys.argv[sys.argv.index('--intervalo') + 1])
+    
+    while True:
+        inicio = time.perf_counter()
+        resultado = sincronizar_chaves_ordenacao(caminho)
+        mudancas = resultado['novos'] + resultado['alterados'] + resultado['removidos']
+        if mudancas:
+            print(f"✅ Chaves de ordenação: +{resultado['novos']:,} novos, {resultado['alterados']:,} alterados, "
+                  f"-{resultado['removidos']:,} excluídos; {resultado['total']:,} vídeos em "
+                  f"{caminho_chaves_ordenacao(caminho)} ({time.perf_counter() - inicio:.2f}s)")
+        elif intervalo is None:
+            print(f"☑️ Chaves de ordenação em dia: {resultado['total']:,} vídeos")
+        
+        if intervalo is None:
+            return True
+        time.sleep(intervalo)
+
+def migrar_indices():
+    """Cria os índices das consultas do dashboard, roda ANALYZE e mostra os planos
+    
+    Idempotente: índices já existentes ficam como estão. Cada consulta que o dashboard
+    emite passa por EXPLAIN QUERY PLAN; varreduras completas inesperadas são apontadas.
+    """
+    import time
+    from banco import abrir_conexao_leitura, caminho_chaves_ordenacao, migrar_indices as criar_indices, planos_consultas
+    
+    caminho = 'trendx_bot.db'
+    if not os.path.exists(caminho):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    inicio = time.perf_counter()
+    resultado = criar_indices(caminho)
+    for nome in resultado['criados']:
+        print(f"✅ Índice criado: {nome}")
+    for nome in resultado['existentes']:
+        print(f"☑️ Já existia: {nome}")
+    for nome in resultado['ignorados']:
+        print(f"⏭️ Ignorado (tabela ou coluna ausente): {nome}")
+    print(f"📈 ANALYZE concluído em {time.perf_counter() - inicio:.2f}s")
+    
+    conn = abrir_conexao_leitura(caminho)
+    try:
+        # Com o arquivo de chaves, mostra também as páginas de engajamento/video score lidas dele
+        com_chaves = os.path.exists(caminho_chaves_ordenacao(caminho))
+        planos = planos_consultas(conn, caminho if com_chaves else None)
+    finally:
+        conn.close()
+    
+    inesperadas = 0
+    print("\n🔎 PLANOS DAS CONSULTAS DO DASHBOARD")
+    for plano in planos:
+        if plano['varreduras'] and plano['motivo'] is None and not plano['ordenada']:
+            marcador = "⚠️ VARREDURA COMPLETA"
+            inesperadas += 1
+        elif plano['varreduras'] and plano['motivo'] is None and plano['ordenada']:
+            # Filtros seletivos ainda podem fazer o percurso ir longe antes de encher a página
+            marcador = "🔁 varredura na ordem da página, interrompida no LIMIT"
+        elif plano['varreduras']:
+            marcador = f"ℹ️ varredura esperada ({plano['motivo']})"
+        else:
+            marcador = "✅ indexada"
+        if plano['ordenacao_temporaria']:
+            marcador += " + ordenação temporária"
+        
+        print(f"\n{plano['nome']}: {marcador}")
+        for detalhe in plano['plano']:
+            print(f"   {detalhe}")
+    
+    print(f"\n📋 {len(planos)} consultas, {inesperadas} com varredura completa inesperada")
+    return True
+
+def _contar_elementos(no):
+    """Elementos e blocos de uma árvore do AppTest (cada um é um delta enviado ao navegador)"""
+    filhos = getattr(no, 'children', None)
+    if filhos is None:
+        return 1
+    return 1 + sum(_contar_elementos(filho) for filho in filhos.values())
+
+def medir_paginas():
+    """Tempo por execução e mensagens enviadas ao navegador em cada página do dashboard
+    
+    Roda o dashboard.py com o AppTest do Streamlit (sem navegador) contra o trendx_bot.db
+    da pasta, com os caches já aquecidos. --repeticoes N (padrão 3, vale a mediana);
+    --busca TERMO mede também a Busca Avançada da página de vídeos.
+    """
+    import statistics
+    import time
+    from streamlit.testing.v1 import AppTest
+    
+    if not os.path.exists('trendx_bot.db'):
+        print("❌ Banco não encontrado!")
+        return False
+    
+    repeticoes = int(sys.argv[sys.argv.index('--repeticoes') + 1]) if '--repeticoes' in sys.argv else 3
+    termo = sys.argv[sys.argv.index('--busca') + 1] if '--busca' in sys.argv else None
+    
+    def abrir():
+        app = AppTest.from_file('dashboard.py', default_timeout=600)
+        return app.run()
+    
+    # Primeira execução carrega dados e preenche os caches; fica fora da medição
+    app = abrir()
+    if app.exception:
+        print(f"❌ Erro ao abrir o dashboard: {app.exception[0].value}")
+        return False
+    paginas = list(app.sidebar.radio[0].options)
+    for pagina in paginas:
+        abrir().sidebar.radio[0].set_value(pagina).run()
+    
+    print(f"{'Página':<28} | {'Tempo (ms)':>10} | {'Mensagens':>9}")
+    medicoes = [(pagina, None) for pagina in paginas]
+    if termo:
+        medicoes.append((paginas[-1], termo))
+    for pagina, busca in medicoes:
+        tempos = []
+        for _ in range(repeticoes):
+            app = abrir()
+            app.sidebar.radio[0].set_value(pagina)
+            if busca:
+                app.run()
+                # Com abas sob demanda, a busca só existe com a aba dela escolhida
+                abas_busca = [r for r in app.radio if "🔍 Busca Avançada" in r.options]
+                if abas_busca:
+                    abas_busca[0].set_value("🔍 Busca Avançada").run()
+                app.text_input[0].set_value(busca)
+            inicio = time.perf_counter()
+            app.run()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        
+        if app.exception:
+            print(f"❌ {pagina}: {app.exception[0].value}")
+            return False
+        rotulo = f"{pagina} + busca" if busca else pagina
+        print(f"{rotulo:<28} | {statistics.median(tempos):>10.0f} | {_contar_elementos(app._tree):>9,}")
+    return True
+
 def main():
     """Função principal"""
     print("🚀 PREPARANDO PROJETO PARA DEPLOY")
@@ -297,5 +602,21 @@ def main():
     print("   - Railway")
     print("\n🔗 Guia completo de deploy criado!")
 
+COMANDOS = {
+    'benchmark': benchmark_metricas,
+    'metricas': atualizar_metricas_persistidas,
+    'snapshot': gerar_snapshots,
+    'indices': migrar_indices,
+    'busca': sincronizar_busca,
+    'ordenacao': sincronizar_chaves,
+    'paginas': medir_paginas,
+}
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Sem argumentos: preparação para deploy. Com argumento: comando específico
+    if len(sys.argv) > 1 and sys.argv[1] in COMANDOS:
+        resultado = COMANDOS[sys.argv[1]]()
+        if resultado is False:
+            sys.exit(1)
+    else:
+        main()
\ No newline at end of file
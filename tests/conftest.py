@@ -0,0 +1,54 @@
+# Fixtures compartilhadas: banco SQLite sintético no formato do trendx_bot.db
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metricas import gerar_usuarios_sinteticos, gerar_videos_sinteticos
+
+TABELA_CACHED_STATS = """
+CREATE TABLE cached_stats(
+    user_id INTEGER PRIMARY KEY, discord_username TEXT,
+    total_videos INTEGER, total_views INTEGER, total_likes INTEGER, total_comments INTEGER, total_shares INTEGER,
+    tiktok_views INTEGER, tiktok_videos INTEGER, youtube_views INTEGER, youtube_videos INTEGER,
+    instagram_views INTEGER, instagram_videos INTEGER, updated_at TEXT
+)
+"""
+
+TABELA_VALID_VIDEOS = """
+CREATE TABLE valid_videos(
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, platform TEXT, url TEXT, title TEXT,
+    views INTEGER, likes INTEGER, comments INTEGER, shares INTEGER, created_at TEXT
+)
+"""
+
+COLUNAS_VALID_VIDEOS = ['id', 'user_id', 'platform', 'url', 'title', 'views', 'likes', 'comments', 'shares']
+
+def criar_banco(caminho, n_usuarios=200, n_videos=3000, seed=7):
+    """Cria um trendx_bot.db com cached_stats e valid_videos sintéticos"""
+    usuarios = gerar_usuarios_sinteticos(n_usuarios, seed=seed)
+    # Usuários sem nome ficam fora do dashboard
+    usuarios.loc[::25, 'discord_username'] = ''
+    
+    videos = gerar_videos_sinteticos(n_videos, seed=seed).sort_values('id')
+    videos['user_id'] = (videos['user_id'] - 1) % n_usuarios + 1
+    videos['created_at'] = '2024-01-01'
+    
+    conn = sqlite3.connect(caminho)
+    conn.execute(TABELA_CACHED_STATS)
+    conn.execute(TABELA_VALID_VIDEOS)
+    colunas_usuarios = [linha[1] for linha in conn.execute("PRAGMA table_info(cached_stats)")]
+    usuarios[colunas_usuarios].to_sql('cached_stats', conn, if_exists='append', index=False)
+    videos[COLUNAS_VALID_VIDEOS + ['created_at']].to_sql('valid_videos', conn, if_exists='append', index=False)
+    conn.commit()
+    conn.close()
+    return caminho
+
+@pytest.fixture
+def banco_sintetico(tmp_path):
+    """Caminho de um banco sintético novo, isolado por teste"""
+    return str(criar_banco(tmp_path / 'trendx_bot.db'))
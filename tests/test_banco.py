@@ -0,0 +1,864 @@
+# Camada de dados do banco.py sobre um trendx_bot.db sintético
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import banco
+from banco import (
+    EXPRESSOES_ORDENACAO,
+    INDICES_DASHBOARD,
+    ORDENACOES_PERSISTIDAS,
+    QUERY_USUARIOS,
+    AtualizadorEmSegundoPlano,
+    CacheFiltrosVideos,
+    CarregadorVideosIncremental,
+    IndiceCriadoresVideos,
+    LimiteMemoriaExcedido,
+    MonitorVersaoDados,
+    PermutacoesOrdenadas,
+    PoolConexoesLeitura,
+    abrir_conexao_leitura,
+    anexar_chaves_ordenacao,
+    buscar_titulos_fts,
+    caminho_busca,
+    caminho_chaves_ordenacao,
+    caminho_snapshot,
+    carregar_frames,
+    carregar_usuarios,
+    chaves_ordenacao_em_dia,
+    consultar_pagina_videos,
+    contar_videos_filtrados,
+    filtrar_videos,
+    gravar_metricas_usuarios,
+    gravar_snapshots,
+    ler_metricas_usuarios,
+    ler_snapshot,
+    migrar_indices,
+    montar_filtros_videos,
+    planos_consultas,
+    preparar_usuarios,
+    registrar_funcoes_sql,
+    sincronizar_arquivos_auxiliares,
+    sincronizar_busca_titulos,
+    sincronizar_chaves_ordenacao,
+    versao_usuarios,
+)
+from conftest import criar_banco
+
+def normalizar(df):
+    """Frame comparável entre carga completa e incremental (ordem, categorias e larguras)"""
+    df = df.sort_values('id', ignore_index=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(np.float64)
+    return df
+
+def carga_completa(caminho):
+    with sqlite3.connect(caminho) as conn:
+        return CarregadorVideosIncremental().carregar(conn)
+
+# ========== CARREGADOR INCREMENTAL ==========
+@pytest.fixture
+def carregador(banco_sintetico):
+    carregador = CarregadorVideosIncremental()
+    with sqlite3.connect(banco_sintetico) as conn:
+        carregador.carregar(conn)
+    assert carregador.ultima_atualizacao == 'completa'
+    return carregador
+
+def atualizar(carregador, caminho, *comandos):
+    """Executa os comandos no banco e devolve o frame da próxima leitura do carregador"""
+    with sqlite3.connect(caminho) as conn:
+        for sql, params in comandos:
+            conn.execute(sql, params)
+        conn.commit()
+        return carregador.carregar(conn)
+
+def test_sem_mudancas_reaproveita_o_frame(carregador, banco_sintetico):
+    anterior = carregador.df
+    df = atualizar(carregador, banco_sintetico)
+    assert df is anterior
+    assert carregador.ultima_atualizacao == 'incremental (+0 novos, 0 alterados)'
+
+def test_videos_novos_entram_sem_carga_completa(carregador, banco_sintetico):
+    df = atualizar(
+        carregador, banco_sintetico,
+        ("INSERT INTO valid_videos(user_id, platform, url, title, views, likes, comments, shares) "
+         "VALUES (2, 'tiktok', 'https://www.tiktok.com/@a/video/1', 'novo', 1000, 90, 5, 2)", ()),
+        ("INSERT INTO valid_videos(user_id, platform, url, title, views, likes, comments, shares) "
+         "VALUES (3, 'MySpace', NULL, 'outro', 10, 1, 0, 0)", ()),
+    )
+    assert carregador.ultima_atualizacao == 'incremental (+2 novos, 0 alterados)'
+    assert df['id'].iloc[0] == carregador.max_id
+    pd.testing.assert_frame_equal(normalizar(df), normalizar(carga_completa(banco_sintetico)))
+
+def test_contadores_alterados_sao_recalculados(carregador, banco_sintetico):
+    ids = carregador.df['id'].iloc[[0, 10, 100]].tolist()
+    df = atualizar(
+        carregador, banco_sintetico,
+        ("UPDATE valid_videos SET views = views + 12345, likes = likes * 2 WHERE id = ?", (ids[0],)),
+        ("UPDATE valid_videos SET comments = comments + 1 WHERE id = ?", (ids[1],)),
+        ("UPDATE valid_videos SET shares = 100000 WHERE id = ?", (ids[2],)),
+    )
+    assert carregador.ultima_atualizacao == 'incremental (+0 novos, 3 alterados)'
+    pd.testing.assert_frame_equal(normalizar(df), normalizar(carga_completa(banco_sintetico)))
+
+def test_troca_de_contadores_entre_linhas_e_detectada(carregador, banco_sintetico):
+    # Mesmos totais por coluna: só a soma ponderada por id percebe a troca
+    a, b = carregador.df.sort_values('id')['id'].iloc[[5, 6]].tolist()
+    with sqlite3.connect(banco_sintetico) as conn:
+        views_a, views_b = (conn.execute("SELECT views FROM valid_videos WHERE id = ?", (i,)).fetchone()[0] for i in (a, b))
+    if views_a == views_b:
+        pytest.skip("linhas sorteadas com as mesmas views")
+    
+    df = atualizar(
+        carregador, banco_sintetico,
+        ("UPDATE valid_videos SET views = ? WHERE id = ?", (views_b, a)),
+        ("UPDATE valid_videos SET views = ? WHERE id = ?", (views_a, b)),
+    )
+    assert carregador.ultima_atualizacao == 'incremental (+0 novos, 2 alterados)'
+    pd.testing.assert_frame_equal(normalizar(df), normalizar(carga_completa(banco_sintetico)))
+
+def test_exclusao_forca_carga_completa(carregador, banco_sintetico):
+    removido = int(carregador.df['id'].iloc[50])
+    df = atualizar(carregador, banco_sintetico, ("DELETE FROM valid_videos WHERE id = ?", (removido,)))
+    assert carregador.ultima_atualizacao == 'completa'
+    assert removido not in set(df['id'])
+
+def test_novo_criador_forca_carga_completa(carregador, banco_sintetico):
+    atualizar(
+        carregador, banco_sintetico,
+        ("INSERT INTO cached_stats(user_id, discord_username) VALUES (99999, 'recem_chegado')", ()),
+    )
+    assert carregador.ultima_atualizacao == 'completa'
+
+def test_frame_entregue_nao_muda_por_baixo(carregador, banco_sintetico):
+    anterior = carregador.df
+    copia = anterior.copy()
+    atualizar(carregador, banco_sintetico, ("UPDATE valid_videos SET views = views + 1 WHERE id = ?", (int(anterior['id'].iloc[0]),)))
+    assert carregador.df is not anterior
+    pd.testing.assert_frame_equal(anterior, copia)
+
+# ========== POOL DE CONEXÕES ==========
+def contar_videos(conn):
+    return conn.execute("SELECT COUNT(*) FROM valid_videos").fetchone()[0]
+
+def test_pool_reaproveita_conexoes_ate_o_tamanho(banco_sintetico):
+    pool = PoolConexoesLeitura(banco_sintetico, tamanho=2)
+    conexoes = [pool.emprestar() for _ in range(3)]
+    assert len({id(conn) for conn in conexoes}) == 3
+    for conn in conexoes:
+        conn.close()
+    conexoes[0].close()  # close() repetido não devolve duas vezes
+    assert pool.conexoes_livres() == 2
+    
+    conn = pool.emprestar()
+    assert conn in conexoes[:2]
+    assert contar_videos(conn) == 3000
+    conn.close()
+    pool.fechar()
+    assert pool.conexoes_livres() == 0
+
+def test_conexao_devolvida_em_transacao_e_desfeita(banco_sintetico):
+    pool = PoolConexoesLeitura(banco_sintetico)
+    conn = pool.emprestar()
+    conn.execute("BEGIN")
+    assert contar_videos(conn) == 3000
+    conn.close()
+    assert not conn.in_transaction
+    
+    # Sem o rollback, a próxima sessão continuaria no snapshot de leitura antigo
+    inserir_videos(banco_sintetico, ['depois da devolução'])
+    reaproveitada = pool.emprestar()
+    assert reaproveitada is conn
+    assert contar_videos(reaproveitada) == 3001
+    reaproveitada.close()
+
+def test_pool_descarta_conexoes_do_banco_substituido(banco_sintetico, tmp_path):
+    pool = PoolConexoesLeitura(banco_sintetico)
+    antiga = pool.emprestar()
+    antiga.close()
+    assert pool.conexoes_livres() == 1
+    
+    os.replace(criar_banco(tmp_path / 'restaurado.db', n_videos=10, seed=3), banco_sintetico)
+    nova = pool.emprestar()
+    assert nova is not antiga
+    assert contar_videos(nova) == 10
+    with pytest.raises(sqlite3.ProgrammingError):
+        contar_videos(antiga)
+    nova.close()
+    assert pool.conexoes_livres() == 1
+
+def test_conexoes_de_leitura_recusam_escrita(banco_sintetico):
+    pool = PoolConexoesLeitura(banco_sintetico)
+    conn = pool.emprestar()
+    # mode=ro vale mesmo que alguém desligue o query_only
+    conn.execute("PRAGMA query_only = OFF")
+    with pytest.raises(sqlite3.OperationalError, match='readonly'):
+        conn.execute("DELETE FROM valid_videos")
+    conn.close()
+    with sqlite3.connect(banco_sintetico) as outra:
+        assert contar_videos(outra) == 3000
+
+# ========== MÉTRICAS PERSISTIDAS ==========
+def usuarios_calculados(caminho):
+    with sqlite3.connect(caminho) as conn:
+        return versao_usuarios(conn), preparar_usuarios(pd.read_sql_query(QUERY_USUARIOS, conn))
+
+def test_metricas_gravadas_voltam_iguais(banco_sintetico):
+    versao, linhas = gravar_metricas_usuarios(banco_sintetico)
+    versao_atual, esperado = usuarios_calculados(banco_sintetico)
+    assert versao == versao_atual
+    assert linhas == len(esperado) == 192
+    
+    lido = ler_metricas_usuarios(banco_sintetico, versao)
+    pd.testing.assert_frame_equal(lido, esperado, check_exact=True)
+    # Usuários sem views não têm plataforma principal: continua None, não 'None' nem NaN
+    sem_plataforma = esperado['plataforma_principal'].isna()
+    assert sem_plataforma.any()
+    assert all(valor is None for valor in lido.loc[sem_plataforma, 'plataforma_principal'])
+
+@pytest.mark.parametrize('comando', [
+    # Troca de views entre dois usuários: totais iguais
+    "UPDATE cached_stats SET total_views = CASE user_id WHEN 2 THEN :views_3 ELSE :views_2 END WHERE user_id IN (2, 3)",
+    # Um sobe e outro desce o mesmo tanto: totais iguais
+    "UPDATE cached_stats SET total_likes = total_likes + CASE user_id WHEN 2 THEN 5 ELSE -5 END WHERE user_id IN (2, 3)",
+    "UPDATE cached_stats SET tiktok_videos = tiktok_videos + 1 WHERE user_id = 150",
+    # Mesmo comprimento de nome
+    "UPDATE cached_stats SET discord_username = 'usuario_X' WHERE user_id = 7",
+])
+def test_linha_alterada_invalida_as_metricas_gravadas(banco_sintetico, comando):
+    versao, _ = gravar_metricas_usuarios(banco_sintetico)
+    with sqlite3.connect(banco_sintetico) as conn:
+        views = dict(conn.execute("SELECT user_id, total_views FROM cached_stats WHERE user_id IN (2, 3)").fetchall())
+        assert views[2] != views[3]
+        conn.execute(comando, {'views_2': views[2], 'views_3': views[3]})
+        conn.commit()
+        carregado = carregar_usuarios(conn, banco_sintetico)
+    
+    nova, esperado = usuarios_calculados(banco_sintetico)
+    assert nova != versao
+    assert ler_metricas_usuarios(banco_sintetico, nova) is None
+    assert ler_metricas_usuarios(banco_sintetico, versao) is not None
+    # O dashboard recalcula em vez de servir ranks e scores da versão anterior
+    colunas = ['user_id', 'discord_username', 'total_views', 'total_likes', 'rank_views', 'rank_likes', 'score_performance']
+    pd.testing.assert_frame_equal(
+        carregado[colunas].astype(object).reset_index(drop=True), esperado[colunas].astype(object).reset_index(drop=True)
+    )
+
+# ========== VERSÃO DOS DADOS ==========
+def test_versao_muda_com_commit_de_outra_conexao(banco_sintetico):
+    monitor = MonitorVersaoDados(banco_sintetico)
+    inicial = monitor.versao()
+    assert monitor.versao() == inicial
+    
+    # Contador alterado sem mexer em max(id): só o data_version e o arquivo denunciam
+    with sqlite3.connect(banco_sintetico) as conn:
+        conn.execute("UPDATE valid_videos SET views = views + 1 WHERE id = 10")
+    alterada = monitor.versao()
+    assert alterada != inicial
+    assert monitor.versao() == alterada
+    
+    inserir_videos(banco_sintetico, ['novo'])
+    assert monitor.versao() not in (inicial, alterada)
+
+def test_versao_acompanha_banco_substituido(banco_sintetico, tmp_path):
+    monitor = MonitorVersaoDados(banco_sintetico)
+    inicial = monitor.versao()
+    
+    os.replace(criar_banco(tmp_path / 'restaurado.db', n_videos=10, seed=3), banco_sintetico)
+    substituida = monitor.versao()
+    assert substituida != inicial
+    assert ('valid_videos', 10) in substituida
+
+# ========== ATUALIZAÇÃO EM SEGUNDO PLANO ==========
+class ConstrucaoControlada:
+    """construir() do atualizador: lê os vídeos do banco e só termina quando `liberar` está setado"""
+    
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.carregador = CarregadorVideosIncremental()
+        self.comecou = threading.Event()
+        self.liberar = threading.Event()
+        self.liberar.set()
+        self.falhar = False
+        self.iniciadas = 0
+        self.simultaneas = 0
+        self.max_simultaneas = 0
+        self._lock = threading.Lock()
+    
+    def __call__(self, progresso):
+        with self._lock:
+            self.iniciadas += 1
+            self.simultaneas += 1
+            self.max_simultaneas = max(self.max_simultaneas, self.simultaneas)
+        try:
+            with sqlite3.connect(self.caminho) as conn:
+                df = self.carregador.carregar(conn, progresso)
+            self.comecou.set()
+            assert self.liberar.wait(10)
+            if self.falhar:
+                # Falha depois de o carregador já ter avançado: a cópia nova ficaria pela metade
+                raise RuntimeError('falha simulada')
+            return {'videos': df}
+        finally:
+            with self._lock:
+                self.simultaneas -= 1
+
+@pytest.fixture
+def atualizador(banco_sintetico):
+    construcao = ConstrucaoControlada(banco_sintetico)
+    monitor = MonitorVersaoDados(banco_sintetico)
+    atualizador = AtualizadorEmSegundoPlano(monitor.versao, construcao)
+    atualizador.construcao, atualizador.monitor = construcao, monitor
+    return atualizador
+
+def esperar_atualizacao(atualizador, limite=10):
+    fim = time.time() + limite
+    while atualizador.atualizando:
+        assert time.time() < fim, "atualização não terminou"
+        time.sleep(0.01)
+
+def test_leitores_recebem_a_copia_anterior_durante_a_atualizacao(atualizador, banco_sintetico):
+    construcao = atualizador.construcao
+    inicial = atualizador.obter()
+    assert construcao.iniciadas == 1 and len(inicial.dados['videos']) == 3000
+    
+    construcao.liberar.clear()
+    inserir_videos(banco_sintetico, ['vídeo da nova versão'])
+    assert atualizador.obter() is inicial
+    assert construcao.comecou.wait(10)
+    assert atualizador.atualizando
+    assert atualizador.obter() is inicial
+    
+    construcao.liberar.set()
+    esperar_atualizacao(atualizador)
+    nova = atualizador.obter()
+    assert nova is not inicial
+    assert nova.versao == atualizador.monitor.versao() != inicial.versao
+    assert len(nova.dados['videos']) == 3001
+    assert len(inicial.dados['videos']) == 3000
+
+def test_atualizacoes_nao_rodam_em_paralelo(atualizador, banco_sintetico):
+    construcao = atualizador.construcao
+    atualizador.obter()
+    
+    construcao.liberar.clear()
+    construcao.comecou.clear()
+    inserir_videos(banco_sintetico, ['primeira mudança'])
+    atualizador.obter()
+    assert construcao.comecou.wait(10)
+    
+    # Vários reruns pedindo dados e forçando a atualização enquanto a thread trabalha
+    def pedir():
+        for _ in range(20):
+            atualizador.obter()
+            atualizador.forcar()
+    
+    threads = [threading.Thread(target=pedir) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    inserir_videos(banco_sintetico, ['segunda mudança'])
+    for thread in threads:
+        thread.join()
+    
+    construcao.liberar.set()
+    esperar_atualizacao(atualizador)
+    # Carga inicial + a rodada em andamento + uma só rodada para tudo o que chegou durante ela
+    assert construcao.max_simultaneas == 1
+    assert construcao.iniciadas == 3
+    assert atualizador.copia.versao == atualizador.monitor.versao()
+    assert len(atualizador.copia.dados['videos']) == 3002
+
+def test_falha_na_thread_mantem_a_copia_anterior(atualizador, banco_sintetico):
+    construcao = atualizador.construcao
+    inicial = atualizador.obter()
+    
+    construcao.falhar = True
+    inserir_videos(banco_sintetico, ['vídeo que falha'])
+    assert atualizador.obter() is inicial
+    esperar_atualizacao(atualizador)
+    
+    assert atualizador.copia is inicial
+    assert len(inicial.dados['videos']) == 3000
+    assert atualizador.ultimo_erro == 'RuntimeError: falha simulada'
+    
+    # A versão continua diferente: a próxima visita tenta de novo
+    construcao.falhar = False
+    assert atualizador.obter() is inicial
+    esperar_atualizacao(atualizador)
+    assert atualizador.copia.versao == atualizador.monitor.versao()
+    assert len(atualizador.copia.dados['videos']) == 3001
+    assert atualizador.ultimo_erro is None
+
+# ========== TETO DE MEMÓRIA ==========
+def test_progresso_conta_as_linhas_lidas(banco_sintetico, monkeypatch):
+    monkeypatch.setattr(banco, 'TAMANHO_LOTE_VIDEOS', 700)
+    chamadas = []
+    with sqlite3.connect(banco_sintetico) as conn:
+        df = CarregadorVideosIncremental().carregar(conn, lambda lidas, total: chamadas.append((lidas, total)))
+    
+    assert chamadas == [(700, 3000), (1400, 3000), (2100, 3000), (2800, 3000), (3000, 3000)]
+    assert len(df) == 3000
+
+def test_teto_de_memoria_interrompe_a_carga(banco_sintetico, monkeypatch):
+    monkeypatch.setattr(banco, 'TAMANHO_LOTE_VIDEOS', 700)
+    chamadas = []
+    carregador = CarregadorVideosIncremental(limite_memoria_mb=0.05)
+    with sqlite3.connect(banco_sintetico) as conn:
+        with pytest.raises(LimiteMemoriaExcedido) as erro:
+            carregador.carregar(conn, lambda lidas, total: chamadas.append((lidas, total)))
+    
+    # A projeção do primeiro lote já passa do teto: o resto da tabela nem é lido
+    assert chamadas == []
+    assert erro.value.projetado_mb > erro.value.limite_mb == 0.05
+    assert carregador.df is None
+
+def test_teto_de_memoria_passa_os_videos_para_o_modo_consulta(banco_sintetico):
+    with sqlite3.connect(banco_sintetico) as conn:
+        dados = carregar_frames(conn, banco_sintetico, CarregadorVideosIncremental(limite_memoria_mb=0.05))
+    
+    assert dados['videos'].empty
+    assert 'MB projetados para os vídeos' in dados['limite_videos']
+    assert dados['total_videos_banco'] == 3000
+    assert len(dados['usuarios']) == 192
+
+# ========== ÍNDICES E PLANOS DE CONSULTA ==========
+def esquema_e_dados(caminho):
+    with sqlite3.connect(caminho) as conn:
+        esquema = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_stat%' ORDER BY name").fetchall()
+        dados = conn.execute("SELECT COUNT(*), TOTAL(views), TOTAL(likes) FROM valid_videos").fetchone()
+    return esquema, dados
+
+def planos_sem_indice(caminho):
+    """Consultas que deveriam usar índice mas varrem a tabela fora da ordem do ORDER BY"""
+    conn = abrir_conexao_leitura(caminho)
+    try:
+        planos = planos_consultas(conn)
+    finally:
+        conn.close()
+    return {p['nome']: p for p in planos if p['motivo'] is None and p['varreduras'] and not p['ordenada']}
+
+def test_migrar_indices_e_idempotente(banco_sintetico):
+    esquema_antes, dados_antes = esquema_e_dados(banco_sintetico)
+    primeira = migrar_indices(banco_sintetico)
+    esquema, dados = esquema_e_dados(banco_sintetico)
+    
+    # valid_videos sintético não tem updated_at: esse índice fica de fora
+    assert primeira['ignorados'] == ['idx_valid_videos_updated_at']
+    assert sorted(primeira['criados'] + primeira['ignorados']) == sorted(i.nome for i in INDICES_DASHBOARD)
+    assert dados == dados_antes
+    assert len(esquema) == len(esquema_antes) + len(primeira['criados'])
+    
+    segunda = migrar_indices(banco_sintetico)
+    assert segunda == {'criados': [], 'existentes': primeira['criados'], 'ignorados': primeira['ignorados']}
+    assert esquema_e_dados(banco_sintetico) == (esquema, dados)
+    
+    # A coluna aparece numa versão nova do bot: só o índice que faltava é criado
+    with sqlite3.connect(banco_sintetico) as conn:
+        conn.execute("ALTER TABLE valid_videos ADD COLUMN updated_at TEXT")
+    assert migrar_indices(banco_sintetico)['criados'] == ['idx_valid_videos_updated_at']
+
+def test_indices_atendem_as_consultas_do_dashboard(banco_sintetico):
+    antes = planos_sem_indice(banco_sintetico)
+    assert {'pagina_views_sem_filtro_p1', 'pagina_likes_sem_filtro_p2', 'contagem_criador'} <= set(antes)
+    
+    migrar_indices(banco_sintetico)
+    assert planos_sem_indice(banco_sintetico) == {}
+    
+    conn = abrir_conexao_leitura(banco_sintetico)
+    try:
+        planos = {p['nome']: p for p in planos_consultas(conn)}
+    finally:
+        conn.close()
+    # Páginas sem filtro saem na ordem do índice: param no LIMIT, sem ordenar a tabela
+    for ordenacao in ['id', 'views', 'likes']:
+        for pagina in ['p1', 'p2']:
+            assert planos[f'pagina_{ordenacao}_sem_filtro_{pagina}']['ordenada']
+    # Da página 2 em diante o índice é posicionado no cursor, não percorrido desde o topo
+    for ordenacao in ['views', 'likes']:
+        assert planos[f'pagina_{ordenacao}_sem_filtro_p2']['plano'][0].startswith('SEARCH v USING INDEX')
+    assert any('idx_valid_videos_user_id' in d for d in planos['contagem_criador']['plano'])
+
+# ========== PAGINAÇÃO KEYSET ==========
+def paginar(conn, filtros, ordenacao, limite, caminho_banco_chaves=None):
+    """Percorre todas as páginas seguindo os cursores; devolve a lista de páginas"""
+    paginas = []
+    cursor = None
+    while True:
+        df, cursor = consultar_pagina_videos(conn, filtros, ordenacao, limite, cursor, caminho_banco_chaves)
+        if not df.empty:
+            paginas.append(df)
+        if cursor is None:
+            return paginas
+
+@pytest.mark.parametrize('ordenacao', sorted(EXPRESSOES_ORDENACAO))
+@pytest.mark.parametrize('filtros', [
+    {},
+    {'plataforma': 'tiktok', 'min_views': 100},
+    {'usuario': 'usuario_3'},
+    {'apenas_com_link': True},
+])
+def test_paginas_keyset_seguem_a_ordem_em_memoria(banco_sintetico, ordenacao, filtros):
+    with sqlite3.connect(banco_sintetico) as conn:
+        df = CarregadorVideosIncremental().carregar(conn)
+        condicoes = montar_filtros_videos(**filtros)
+        total = contar_videos_filtrados(conn, condicoes)
+        paginas = paginar(conn, condicoes, ordenacao, 45)
+    
+    mascara = np.ones(len(df), dtype=bool)
+    if 'plataforma' in filtros:
+        mascara &= (df['platform'] == filtros['plataforma']).to_numpy()
+    if 'usuario' in filtros:
+        mascara &= (df['discord_username'] == filtros['usuario']).to_numpy()
+    if 'min_views' in filtros:
+        mascara &= (df['views'] >= filtros['min_views']).to_numpy()
+    if filtros.get('apenas_com_link'):
+        mascara &= df['tem_link'].to_numpy()
+    esperado = df[mascara].sort_values([ordenacao, 'id'], ascending=False)
+    
+    assert total == len(esperado) > 0
+    assert all(len(pagina) == 45 for pagina in paginas[:-1])
+    assert pd.concat(paginas)['id'].tolist() == esperado['id'].tolist()
+
+def test_cursor_nao_muda_com_videos_novos(banco_sintetico):
+    filtros = montar_filtros_videos()
+    with sqlite3.connect(banco_sintetico) as conn:
+        primeira, cursor = consultar_pagina_videos(conn, filtros, 'views', 20)
+        segunda, _ = consultar_pagina_videos(conn, filtros, 'views', 20, cursor)
+        
+        # Um vídeo novo no topo da ordenação desloca o OFFSET, mas não o cursor
+        conn.execute(
+            "INSERT INTO valid_videos(user_id, platform, url, title, views, likes, comments, shares) "
+            "VALUES (2, 'tiktok', NULL, 'viral', ?, 0, 0, 0)", (int(primeira['views'].max()) + 1,)
+        )
+        depois, _ = consultar_pagina_videos(conn, filtros, 'views', 20, cursor)
+    
+    assert depois['id'].tolist() == segunda['id'].tolist()
+    assert not set(primeira['id']) & set(segunda['id'])
+
+# ========== CHAVES DE ORDENAÇÃO PERSISTIDAS ==========
+@pytest.mark.parametrize('ordenacao', ORDENACOES_PERSISTIDAS)
+@pytest.mark.parametrize('filtros', [
+    {},
+    {'plataforma': 'tiktok', 'min_views': 100},
+    {'usuario': 'usuario_3'},
+])
+def test_paginas_pelas_chaves_persistidas_iguais_as_das_funcoes(banco_sintetico, ordenacao, filtros):
+    sincronizar_chaves_ordenacao(banco_sintetico)
+    conn = abrir_conexao_leitura(banco_sintetico)
+    try:
+        condicoes = montar_filtros_videos(**filtros)
+        pelas_funcoes = pd.concat(paginar(conn, condicoes, ordenacao, 45))
+        pelas_chaves = pd.concat(paginar(conn, condicoes, ordenacao, 45, banco_sintetico))
+    finally:
+        conn.close()
+    
+    assert pelas_chaves['id'].tolist() == pelas_funcoes['id'].tolist()
+    assert pelas_chaves[ordenacao].tolist() == pytest.approx(pelas_funcoes[ordenacao].tolist())
+
+def test_sincronizacao_das_chaves_so_recalcula_o_que_mudou(banco_sintetico):
+    assert sincronizar_chaves_ordenacao(banco_sintetico) == {'novos': 3000, 'alterados': 0, 'removidos': 0, 'total': 3000}
+    assert sincronizar_chaves_ordenacao(banco_sintetico) == {'novos': 0, 'alterados': 0, 'removidos': 0, 'total': 3000}
+    
+    with sqlite3.connect(banco_sintetico) as conn:
+        conn.execute("UPDATE valid_videos SET likes = likes + 500 WHERE id IN (10, 20)")
+        conn.execute("DELETE FROM valid_videos WHERE id IN (30, 3000)")
+        conn.execute(
+            "INSERT INTO valid_videos(user_id, platform, url, title, views, likes, comments, shares) "
+            "VALUES (2, 'tiktok', NULL, 'novo', 1000, 900, 10, 5)"
+        )
+    conn = abrir_conexao_leitura(banco_sintetico)
+    try:
+        assert not chaves_ordenacao_em_dia(conn, banco_sintetico)
+        assert sincronizar_chaves_ordenacao(banco_sintetico) == {'novos': 1, 'alterados': 2, 'removidos': 2, 'total': 2999}
+        assert chaves_ordenacao_em_dia(conn, banco_sintetico)
+        
+        # As chaves gravadas são as mesmas das funções trendx_* sobre os contadores atuais
+        registrar_funcoes_sql(conn)
+        anexar_chaves_ordenacao(conn, banco_sintetico)
+        divergentes = conn.execute(
+            "SELECT COUNT(*) FROM valid_videos v JOIN chaves.chaves_ordenacao k ON k.id = v.id "
+            f"WHERE abs(k.engagement_rate - {EXPRESSOES_ORDENACAO['engagement_rate']}) > 1e-9 "
+            f"OR abs(k.video_score - {EXPRESSOES_ORDENACAO['video_score']}) > 1e-9"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert divergentes == 0
+
+def test_chaves_fora_de_dia_sem_arquivo_ou_com_contador_alterado(banco_sintetico):
+    conn = abrir_conexao_leitura(banco_sintetico)
+    try:
+        assert not chaves_ordenacao_em_dia(conn, banco_sintetico)
+        assert sincronizar_arquivos_auxiliares(banco_sintetico) == []
+        assert not os.path.exists(caminho_chaves_ordenacao(banco_sintetico))
+        
+        sincronizar_chaves_ordenacao(banco_sintetico)
+        with sqlite3.connect(banco_sintetico) as escrita:
+            # Mesmo total e mesmo max(id): só a soma de verificação dos contadores denuncia
+            escrita.execute("UPDATE valid_videos SET shares = shares + 1 WHERE id = 1500")
+        assert not chaves_ordenacao_em_dia(conn, banco_sintetico)
+        
+        # Com o arquivo criado, a atualização em segundo plano o mantém em dia
+        assert sincronizar_arquivos_auxiliares(banco_sintetico) == ['ordenacao']
+        assert chaves_ordenacao_em_dia(conn, banco_sintetico)
+    finally:
+        conn.close()
+
+def test_paginas_pelas_chaves_persistidas_usam_o_indice(banco_sintetico):
+    migrar_indices(banco_sintetico)
+    sincronizar_chaves_ordenacao(banco_sintetico)
+    conn = abrir_conexao_leitura(banco_sintetico)
+    try:
+        planos = [p for p in planos_consultas(conn, banco_sintetico) if p['nome'].endswith('_chaves')]
+    finally:
+        conn.close()
+    
+    assert len(planos) == len(ORDENACOES_PERSISTIDAS) * 3 * 2
+    for plano in planos:
+        assert plano['ordenada'] and plano['motivo'] is None, plano
+        ordem = plano['plano'][0]
+        assert 'idx_chaves_ordenacao_' in ordem
+        if plano['nome'].endswith('_p2_chaves'):
+            assert ordem.startswith('SEARCH k'), plano
+
+# ========== SNAPSHOTS ==========
+def test_snapshot_mapeado_sem_copia(banco_sintetico):
+    pytest.importorskip('pyarrow')
+    gravar_snapshots(banco_sintetico)
+    df, cabecalho = ler_snapshot(caminho_snapshot(banco_sintetico, 'videos'))
+    
+    pd.testing.assert_frame_equal(normalizar(df), normalizar(carga_completa(banco_sintetico)))
+    # Numéricas apontam para o arquivo mapeado (somente leitura), não para uma cópia privada
+    for coluna in ['id', 'views', 'engagement_rate']:
+        assert not df[coluna].to_numpy().flags.writeable
+
+def test_carregador_atualiza_a_partir_do_snapshot(banco_sintetico):
+    pytest.importorskip('pyarrow')
+    gravar_snapshots(banco_sintetico)
+    with sqlite3.connect(banco_sintetico) as conn:
+        conn.execute("UPDATE valid_videos SET likes = likes + 50 WHERE id = 10")
+        conn.commit()
+        carregador = CarregadorVideosIncremental(caminho_snapshot(banco_sintetico, 'videos'))
+        df = carregador.carregar(conn)
+    
+    assert carregador.ultima_atualizacao == 'snapshot + incremental (+0 novos, 1 alterados)'
+    pd.testing.assert_frame_equal(normalizar(df), normalizar(carga_completa(banco_sintetico)))
+
+def test_snapshot_sem_pyarrow_avisa_e_cai_no_sqlite(banco_sintetico, monkeypatch, caplog):
+    pytest.importorskip('pyarrow')
+    gravar_snapshots(banco_sintetico)
+    monkeypatch.setattr(banco, 'pa', None)
+    
+    with caplog.at_level(logging.WARNING, logger='banco'):
+        assert ler_snapshot(caminho_snapshot(banco_sintetico, 'videos')) is None
+    assert 'pyarrow não está instalado' in caplog.text
+    with pytest.raises(RuntimeError, match='pyarrow'):
+        gravar_snapshots(banco_sintetico)
+
+# ========== BUSCA POR TÍTULO (FTS5) ==========
+def inserir_videos(caminho, titulos):
+    with sqlite3.connect(caminho) as conn:
+        conn.executemany(
+            "INSERT INTO valid_videos(user_id, platform, url, title, views, likes, comments, shares) "
+            "VALUES (2, 'youtube', NULL, ?, 10, 1, 0, 0)", [(titulo,) for titulo in titulos]
+        )
+        conn.commit()
+
+def buscar(caminho, termo):
+    conn = sqlite3.connect(caminho_busca(caminho))
+    try:
+        return buscar_titulos_fts(conn, termo)[0].tolist()
+    finally:
+        conn.close()
+
+def test_sincronizacao_indexa_so_acima_da_marca_dagua(banco_sintetico):
+    primeira = sincronizar_busca_titulos(banco_sintetico)
+    assert primeira == {'novos': 3000, 'total': 3000, 'reconstruido': True}
+    
+    inserir_videos(banco_sintetico, ['Receita de pão caseiro', 'Pão de queijo mineiro'])
+    segunda = sincronizar_busca_titulos(banco_sintetico, apenas_novos=True)
+    assert segunda == {'novos': 2, 'total': 3002, 'reconstruido': False}
+    assert sincronizar_busca_titulos(banco_sintetico) == {'novos': 0, 'total': 3002, 'reconstruido': False}
+    
+    # Sem acento e sem diferenciar maiúsculas; a última palavra vale como prefixo
+    assert buscar(banco_sintetico, 'PAO') == buscar(banco_sintetico, 'pão')
+    assert len(buscar(banco_sintetico, 'pao')) == 2
+    assert len(buscar(banco_sintetico, 'pao quei')) == 1
+
+def test_exclusao_reconstroi_o_indice(banco_sintetico):
+    sincronizar_busca_titulos(banco_sintetico)
+    inserir_videos(banco_sintetico, ['título apagado depois'])
+    sincronizar_busca_titulos(banco_sintetico)
+    with sqlite3.connect(banco_sintetico) as conn:
+        conn.execute("DELETE FROM valid_videos WHERE title = 'título apagado depois'")
+        conn.commit()
+    
+    # apenas_novos não percebe a exclusão; a sincronização normal (e a do dashboard) reconstrói
+    assert sincronizar_busca_titulos(banco_sintetico, apenas_novos=True)['reconstruido'] is False
+    assert sincronizar_busca_titulos(banco_sintetico) == {'novos': 3000, 'total': 3000, 'reconstruido': True}
+    assert buscar(banco_sintetico, 'apagado') == []
+
+def test_atualizacao_em_segundo_plano_sincroniza_a_busca(banco_sintetico, monkeypatch, caplog):
+    # Sem o arquivo (`python script.py busca` nunca rodou) nada é criado
+    assert sincronizar_arquivos_auxiliares(banco_sintetico) == []
+    assert not os.path.exists(caminho_busca(banco_sintetico))
+    
+    sincronizar_busca_titulos(banco_sintetico)
+    inserir_videos(banco_sintetico, ['Tutorial de violão'])
+    assert buscar(banco_sintetico, 'violao') == []
+    assert sincronizar_arquivos_auxiliares(banco_sintetico) == ['busca']
+    assert len(buscar(banco_sintetico, 'violao')) == 1
+    
+    # Índice ocupado por outro processo: a falha só é registrada, a atualização segue
+    monkeypatch.setattr(banco, 'TIMEOUT_OCUPADO', 0.1)
+    bloqueio = sqlite3.connect(caminho_busca(banco_sintetico))
+    bloqueio.execute("BEGIN IMMEDIATE")
+    try:
+        with caplog.at_level(logging.WARNING, logger='banco'):
+            assert sincronizar_arquivos_auxiliares(banco_sintetico) == []
+    finally:
+        bloqueio.rollback()
+        bloqueio.close()
+    assert 'Índice de busca não sincronizado' in caplog.text
+
+def test_sincronizacoes_simultaneas_nao_duplicam(banco_sintetico):
+    sincronizar_busca_titulos(banco_sintetico)
+    inserir_videos(banco_sintetico, [f'lote concorrente {i}' for i in range(20000)])
+    
+    # Vários workers do dashboard sincronizando a mesma versão ao mesmo tempo
+    barreira = threading.Barrier(4)
+    resultados = []
+    
+    def sincronizar():
+        barreira.wait()
+        resultados.append(sincronizar_busca_titulos(banco_sintetico, apenas_novos=True))
+    
+    threads = [threading.Thread(target=sincronizar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert sorted(resultado['novos'] for resultado in resultados) == [0, 0, 0, 20000]
+    ids = buscar(banco_sintetico, 'concorrente')
+    assert len(ids) == len(set(ids)) == 20000
+    assert sincronizar_busca_titulos(banco_sintetico)['reconstruido'] is False
+
+# ========== FILTROS EM MEMÓRIA ==========
+@pytest.fixture
+def frame_videos(banco_sintetico):
+    return carga_completa(banco_sintetico)
+
+@pytest.fixture
+def filtragens(monkeypatch):
+    """Lista com os filtros de cada chamada real a filtrar_videos (faltas no cache)"""
+    chamadas = []
+    original = banco.filtrar_videos
+    
+    def filtrar(df, **filtros):
+        chamadas.append({k: v for k, v in filtros.items() if k not in ('criadores', 'permutacoes')})
+        return original(df, **filtros)
+    
+    monkeypatch.setattr(banco, 'filtrar_videos', filtrar)
+    return chamadas
+
+def test_cache_filtros_reaproveita_e_descarta_o_menos_usado(frame_videos, filtragens):
+    cache = CacheFiltrosVideos(limite=2)
+    a = {'plataforma': 'tiktok', 'ordenacao': 'views'}
+    b = {'usuario': 'usuario_3', 'ordenacao': 'likes'}
+    c = {'min_views': 1000, 'apenas_com_link': True}
+    
+    posicoes_a = cache.obter(frame_videos, 1, **a)
+    assert cache.obter(frame_videos, 1, **dict(reversed(a.items()))) is posicoes_a
+    assert not posicoes_a.flags.writeable
+    cache.obter(frame_videos, 1, **b)
+    cache.obter(frame_videos, 1, **a)  # a volta a ser o mais recente
+    cache.obter(frame_videos, 1, **c)  # passa do limite: sai b
+    assert filtragens == [a, b, c]
+    
+    assert cache.obter(frame_videos, 1, **a) is posicoes_a
+    cache.obter(frame_videos, 1, **b)
+    assert filtragens == [a, b, c, b]
+    
+    # Mesmo resultado da filtragem direta no pandas
+    esperado = frame_videos[frame_videos['platform'] == 'tiktok'].sort_values('views', ascending=False, kind='stable')
+    assert frame_videos['id'].to_numpy()[posicoes_a].tolist() == esperado['id'].tolist()
+
+def test_cache_filtros_descarta_tudo_com_outra_versao_ou_frame(frame_videos, filtragens):
+    cache = CacheFiltrosVideos()
+    filtros = {'plataforma': 'youtube', 'ordenacao': 'engagement_rate'}
+    anterior = cache.obter(frame_videos, 1, **filtros)
+    criadores = cache.criadores(frame_videos, 1)
+    
+    assert cache.obter(frame_videos, 2, **filtros) is not anterior
+    assert cache.criadores(frame_videos, 2) is not criadores
+    
+    # Frame novo da mesma versão (ex: recarga após erro) também invalida
+    copia = frame_videos.copy()
+    copia.loc[copia['platform'] == 'youtube', 'engagement_rate'] = 0.0
+    nova = cache.obter(copia, 2, **filtros)
+    assert len(filtragens) == 3
+    assert np.array_equal(np.sort(nova), np.sort(anterior))
+    assert copia['engagement_rate'].to_numpy()[nova].max() == 0.0
+
+@pytest.mark.parametrize('categorica', [True, False])
+def test_indice_criadores_igual_a_mascara(frame_videos, categorica):
+    df = frame_videos if categorica else frame_videos.assign(discord_username=frame_videos['discord_username'].astype(object))
+    indice = IndiceCriadoresVideos(df)
+    
+    assert sorted(indice.nomes) == sorted(df['discord_username'].dropna().unique())
+    for criador in indice.nomes:
+        esperado = df[df.discord_username == criador]
+        posicoes = indice.posicoes(criador)
+        assert indice.quantidade(criador) == len(esperado)
+        pd.testing.assert_frame_equal(df.iloc[posicoes], esperado)
+    assert len(indice.posicoes('ninguem')) == indice.quantidade('ninguem') == 0
+    
+    # Totais por criador: mesmos valores das somas e médias de cada fatia
+    totais = indice.totais
+    for criador in indice.nomes[:20]:
+        fatia = df[df.discord_username == criador]
+        assert totais.loc[criador, 'videos'] == len(fatia)
+        assert totais.loc[criador, 'views'] == fatia['views'].sum()
+        assert totais.loc[criador, 'likes'] == fatia['likes'].sum()
+        assert totais.loc[criador, 'engajamento_medio'] == fatia['engagement_rate'].mean()
+
+def test_filtro_por_criador_usa_o_indice_sem_mudar_o_resultado(frame_videos):
+    indice = IndiceCriadoresVideos(frame_videos)
+    for filtros in [
+        {'usuario': 'usuario_3'},
+        {'usuario': 'usuario_3', 'plataforma': 'tiktok', 'ordenacao': 'views'},
+        {'usuario': 'usuario_7', 'min_views': 500, 'ordenacao': 'engagement_rate', 'crescente': True},
+    ]:
+        com_indice = filtrar_videos(frame_videos, criadores=indice, **filtros)
+        assert com_indice.tolist() == filtrar_videos(frame_videos, **filtros).tolist()
+        assert len(com_indice) > 0
+
+# ========== PERMUTAÇÕES ORDENADAS ==========
+@pytest.mark.parametrize('coluna', ['views', 'likes', 'engagement_rate'])
+@pytest.mark.parametrize('ordem_lista', ['id', 'likes', 'video_score'])
+# n abaixo do tamanho da lista: acima disso o próprio nlargest usa uma ordenação instável
+@pytest.mark.parametrize('n', [1, 10, 100, 1000])
+def test_maiores_igual_nlargest_da_lista_filtrada(banco_sintetico, coluna, ordem_lista, n):
+    df = carga_completa(banco_sintetico)
+    # Contadores pequenos: muitos empates no corte do top
+    df['likes'] = df['likes'] % 7
+    mascara = (df['platform'] != 'instagram').to_numpy()
+    
+    df_filtrado = df[mascara].sort_values(ordem_lista, ascending=False, kind='stable')
+    posicoes = df.index.get_indexer(df_filtrado.index)
+    desempate = np.empty(len(df), dtype=np.int64)
+    desempate[posicoes] = np.arange(len(posicoes))
+    
+    obtido = PermutacoesOrdenadas(df).maiores(coluna, n, mascara, desempate)
+    assert df['id'].to_numpy()[obtido].tolist() == df_filtrado.nlargest(n, coluna)['id'].tolist()
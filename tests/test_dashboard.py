@@ -0,0 +1,71 @@
+# Dashboard rodando de ponta a ponta (streamlit.testing) sobre o banco sintético
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+import banco
+from conftest import criar_banco
+
+st = pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard.py')
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    """AppTest do dashboard lendo o trendx_bot.db sintético do diretório do teste"""
+    criar_banco(tmp_path / 'trendx_bot.db')
+    monkeypatch.chdir(tmp_path)
+    # Atualizador, pool e caches são por processo: cada teste começa do zero
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield AppTest.from_file(DASHBOARD, default_timeout=60)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+def test_teto_de_memoria_leva_a_pagina_de_videos_ao_modo_consulta(dashboard, monkeypatch):
+    monkeypatch.setenv('TRENDX_LIMITE_MEMORIA_VIDEOS_MB', '0.05')
+    at = dashboard.run()
+    assert not at.exception
+    assert any('limite de memória' in aviso.value for aviso in at.sidebar.warning)
+    
+    at.sidebar.radio[0].set_value("🎬 Vídeos Completos").run()
+    assert not at.exception
+    assert any('Vídeos não carregados em memória' in aviso.value for aviso in at.warning)
+    assert any('consulta no banco' in info.value for info in at.info)
+
+def test_analise_individual_compara_com_media_e_mediana(dashboard):
+    at = dashboard.run()
+    at.sidebar.radio[0].set_value("👤 Análise Individual").run()
+    at.selectbox[0].set_value('usuario_115').run()
+    assert not at.exception
+    
+    series = [t['name'] for grafico in at.get('plotly_chart') for t in json.loads(grafico.proto.spec)['data']]
+    assert {'Usuário', 'Média Geral', 'Mediana'} <= set(series)
+    # Insight pelos quantis da população, não só pela média
+    assert any('dos usuários ativos' in m.value and '📐' in m.value for m in at.markdown)
+
+def test_busca_no_dashboard_so_consulta_o_indice(dashboard, tmp_path, monkeypatch):
+    banco.sincronizar_busca_titulos(str(tmp_path / 'trendx_bot.db'))
+    at = dashboard.run()
+    at.sidebar.radio[0].set_value("🎬 Vídeos Completos").run()
+    [abas] = [r for r in at.radio if "🔍 Busca Avançada" in r.options]
+    abas.set_value("🔍 Busca Avançada").run()
+    
+    # A sincronização é da atualização em segundo plano: com o índice travado por um
+    # escritor, a página continua lendo em vez de esperar ou cair na busca sem índice
+    monkeypatch.setattr(banco, 'TIMEOUT_OCUPADO', 0.1)
+    escritor = sqlite3.connect(banco.caminho_busca(str(tmp_path / 'trendx_bot.db')))
+    escritor.execute("BEGIN IMMEDIATE")
+    try:
+        at.text_input[0].set_value('video').run()
+    finally:
+        escritor.rollback()
+        escritor.close()
+    assert not at.exception
+    assert any('Encontrados' in aviso.value for aviso in at.success)
+    # "mais relevantes/recentes" só aparece com os ids vindos do índice FTS5
+    assert any('Mostrando os 50 mais re' in info.value for info in at.info)
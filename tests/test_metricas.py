@@ -0,0 +1,100 @@
+# Paridade do motor vetorizado com as funções escalares de referência
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from banco import COLUNAS_CONTADORES_VIDEO, COLUNAS_NUMERICAS_USUARIOS, QUERY_USUARIOS, CarregadorVideosIncremental, carregar_usuarios
+from metricas import (
+    QUANTIS_POPULACAO,
+    CacheEstatisticasPopulacao,
+    EstatisticasPopulacao,
+    calcular_metricas_usuarios,
+    calcular_metricas_usuarios_referencia,
+    calcular_metricas_videos,
+    calcular_metricas_videos_referencia,
+    comparar_metricas,
+    converter_para_numerico_seguro,
+    gerar_usuarios_sinteticos,
+    gerar_videos_sinteticos,
+)
+
+# Leitura do caminho original: o join completo, com título e URL
+QUERY_VIDEOS_ORIGINAL = """
+SELECT v.*, cs.discord_username
+FROM valid_videos v
+LEFT JOIN cached_stats cs ON v.user_id = cs.user_id
+WHERE cs.discord_username IS NOT NULL
+ORDER BY v.id DESC
+"""
+
+@pytest.mark.parametrize('n, seed', [(1, 1), (50, 2), (5000, 3)])
+def test_metricas_usuarios_iguais_a_referencia(n, seed):
+    df = gerar_usuarios_sinteticos(n, seed=seed)
+    assert comparar_metricas(calcular_metricas_usuarios_referencia(df), calcular_metricas_usuarios(df)) == []
+
+@pytest.mark.parametrize('n, seed', [(1, 1), (50, 2), (5000, 3)])
+def test_metricas_videos_iguais_a_referencia(n, seed):
+    df = gerar_videos_sinteticos(n, seed=seed)
+    assert comparar_metricas(calcular_metricas_videos_referencia(df), calcular_metricas_videos(df)) == []
+
+def test_usuarios_do_banco_iguais_ao_calculo_original(banco_sintetico):
+    with sqlite3.connect(banco_sintetico) as conn:
+        bruto = pd.read_sql_query(QUERY_USUARIOS, conn)
+        obtido = carregar_usuarios(conn, banco_sintetico)
+    
+    for col in COLUNAS_NUMERICAS_USUARIOS:
+        bruto[col] = converter_para_numerico_seguro(bruto[col], 0)
+    esperado = calcular_metricas_usuarios_referencia(bruto)
+    
+    assert len(obtido) == len(esperado) > 0
+    assert comparar_metricas(esperado, obtido) == []
+
+def test_videos_do_banco_iguais_ao_calculo_original(banco_sintetico):
+    with sqlite3.connect(banco_sintetico) as conn:
+        bruto = pd.read_sql_query(QUERY_VIDEOS_ORIGINAL, conn)
+        obtido = CarregadorVideosIncremental().carregar(conn)
+    
+    for col in COLUNAS_CONTADORES_VIDEO:
+        bruto[col] = converter_para_numerico_seguro(bruto[col], 0)
+    esperado = calcular_metricas_videos_referencia(bruto)
+    
+    assert obtido['id'].tolist() == bruto['id'].tolist()
+    assert comparar_metricas(esperado, obtido) == []
+
+def test_estatisticas_refeitas_para_frame_recarregado_na_mesma_versao():
+    cache = CacheEstatisticasPopulacao()
+    df = gerar_usuarios_sinteticos(300, seed=4)
+    estatisticas = cache.obter(df, versao='v1')
+    assert cache.obter(df, versao='v1') is estatisticas
+    
+    # "Recarregar Dados": mesma versão, frame novo com as linhas em outra ordem
+    recarregado = df.sample(frac=1, random_state=1).reset_index(drop=True)
+    novas = cache.obter(recarregado, versao='v1')
+    assert novas is not estatisticas
+    for nome in ['usuario_0', 'usuario_150', 'usuario_299']:
+        assert recarregado.iloc[novas.posicao(nome)]['discord_username'] == nome
+
+def test_estatisticas_iguais_ao_calculo_sobre_os_ativos():
+    df = gerar_usuarios_sinteticos(500, seed=5)
+    df = df.join(calcular_metricas_usuarios(df))
+    estatisticas = EstatisticasPopulacao(df)
+    ativos = df[df['total_views'] > 0]
+    
+    assert estatisticas.usuarios_ativos == len(ativos)
+    for coluna in ['total_views', 'taxa_engajamento', 'total_videos']:
+        assert estatisticas.medias[coluna] == pytest.approx(ativos[coluna].mean())
+        assert estatisticas.medianas[coluna] == pytest.approx(ativos[coluna].median())
+        assert list(estatisticas.quantis[coluna]) == QUANTIS_POPULACAO
+    
+    # Qualquer fração, não só as faixas que os insights usam
+    for fracao in [0.1, 0.25, 0.33]:
+        limite = len(ativos) * fracao
+        assert estatisticas.no_topo(int(limite), fracao)
+        assert not estatisticas.no_topo(int(limite) + 1, fracao)
+    
+    taxa = ativos['taxa_engajamento']
+    assert estatisticas.quantil_alcancado('taxa_engajamento', taxa.max()) == 0.9
+    assert estatisticas.quantil_alcancado('taxa_engajamento', taxa.median()) == 0.5
+    assert estatisticas.quantil_alcancado('taxa_engajamento', taxa.min() - 1) is None